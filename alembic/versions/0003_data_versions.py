@@ -0,0 +1,60 @@
+"""Per-table data versions bumped by triggers (cache invalidation)
+
+Revision ID: 0003_data_versions
+Revises: 0002_geo_constraints
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_data_versions"
+down_revision = "0002_geo_constraints"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "data_versions",
+        sa.Column("table_name", sa.String(length=64), primary_key=True),
+        sa.Column("version", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+    op.execute("INSERT INTO data_versions (table_name, version) VALUES ('activities', 0)")
+
+    # Statement-level: one bump per write statement, not per row.
+    # The NOTIFY is delivered on commit only, so rolled back writes never invalidate caches.
+    op.execute(
+        '''
+        CREATE OR REPLACE FUNCTION bump_data_version()
+        RETURNS TRIGGER AS $$
+        DECLARE
+            new_version BIGINT;
+        BEGIN
+            INSERT INTO data_versions (table_name, version)
+            VALUES (TG_TABLE_NAME, 1)
+            ON CONFLICT (table_name) DO UPDATE SET version = data_versions.version + 1
+            RETURNING version INTO new_version;
+
+            PERFORM pg_notify('data_versions', TG_TABLE_NAME || ':' || new_version);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        '''
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_activities_data_version
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE
+        ON activities
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION bump_data_version()
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_activities_data_version ON activities")
+    op.execute("DROP FUNCTION IF EXISTS bump_data_version()")
+    op.drop_table("data_versions")
@@ -0,0 +1,113 @@
+"""Activity closure table maintained by trigger
+
+Revision ID: 0004_activity_closure
+Revises: 0003_data_versions
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004_activity_closure"
+down_revision = "0003_data_versions"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "activity_closure",
+        sa.Column("ancestor_id", sa.Integer(), nullable=False),
+        sa.Column("descendant_id", sa.Integer(), nullable=False),
+        sa.Column("depth", sa.SmallInteger(), nullable=False),
+        sa.ForeignKeyConstraint(["ancestor_id"], ["activities.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["descendant_id"], ["activities.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("ancestor_id", "descendant_id"),
+    )
+    op.create_index("ix_activity_closure_descendant_id", "activity_closure", ["descendant_id"])
+
+    # Deleting an activity is covered by the FK cascade plus the children's
+    # parent_id -> NULL update, which goes through the UPDATE branch below.
+    op.execute(
+        '''
+        CREATE OR REPLACE FUNCTION maintain_activity_closure()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO activity_closure (ancestor_id, descendant_id, depth)
+                VALUES (NEW.id, NEW.id, 0);
+
+                INSERT INTO activity_closure (ancestor_id, descendant_id, depth)
+                SELECT ancestor_id, NEW.id, depth + 1
+                FROM activity_closure
+                WHERE descendant_id = NEW.parent_id;
+
+                RETURN NULL;
+            END IF;
+
+            -- UPDATE OF parent_id: detach the subtree from its old ancestors...
+            DELETE FROM activity_closure
+            WHERE descendant_id IN (SELECT descendant_id FROM activity_closure WHERE ancestor_id = NEW.id)
+              AND ancestor_id IN (
+                  SELECT ancestor_id FROM activity_closure
+                  WHERE descendant_id = NEW.id AND ancestor_id <> NEW.id
+              );
+
+            -- ...and attach it under the new parent's ancestors.
+            IF NEW.parent_id IS NOT NULL THEN
+                INSERT INTO activity_closure (ancestor_id, descendant_id, depth)
+                SELECT sup.ancestor_id, sub.descendant_id, sup.depth + sub.depth + 1
+                FROM activity_closure sup
+                CROSS JOIN activity_closure sub
+                WHERE sup.descendant_id = NEW.parent_id
+                  AND sub.ancestor_id = NEW.id;
+            END IF;
+
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        '''
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_maintain_activity_closure_insert
+        AFTER INSERT
+        ON activities
+        FOR EACH ROW
+        EXECUTE FUNCTION maintain_activity_closure()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_maintain_activity_closure_update
+        AFTER UPDATE OF parent_id
+        ON activities
+        FOR EACH ROW
+        WHEN (OLD.parent_id IS DISTINCT FROM NEW.parent_id)
+        EXECUTE FUNCTION maintain_activity_closure()
+        """
+    )
+
+    # Backfill existing activities
+    op.execute(
+        """
+        INSERT INTO activity_closure (ancestor_id, descendant_id, depth)
+        WITH RECURSIVE tree (ancestor_id, descendant_id, depth) AS (
+            SELECT id, id, 0 FROM activities
+            UNION ALL
+            SELECT t.ancestor_id, a.id, t.depth + 1
+            FROM tree t
+            JOIN activities a ON a.parent_id = t.descendant_id
+        )
+        SELECT ancestor_id, descendant_id, depth FROM tree
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_maintain_activity_closure_update ON activities")
+    op.execute("DROP TRIGGER IF EXISTS trg_maintain_activity_closure_insert ON activities")
+    op.execute("DROP FUNCTION IF EXISTS maintain_activity_closure()")
+    op.drop_index("ix_activity_closure_descendant_id", table_name="activity_closure")
+    op.drop_table("activity_closure")
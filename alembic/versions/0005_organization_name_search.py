@@ -0,0 +1,46 @@
+"""Trigram and full-text indexes for organization name search
+
+Revision ID: 0005_organization_name_search
+Revises: 0004_activity_closure
+Create Date: 2026-10-18
+
+pg_trgm is optional: if the extension cannot be created (not shipped / no
+privilege), the trigram index is skipped and mode=fuzzy is rejected at runtime.
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005_organization_name_search"
+down_revision = "0004_activity_closure"
+branch_labels = None
+depends_on = None
+
+
+def _try_create_extension(name: str) -> bool:
+    bind = op.get_bind()
+    try:
+        # SAVEPOINT keeps the migration transaction usable if the extension is missing
+        with bind.begin_nested():
+            bind.execute(sa.text(f"CREATE EXTENSION IF NOT EXISTS {name}"))
+    except sa.exc.DBAPIError:
+        return False
+    return True
+
+
+def upgrade() -> None:
+    # Must match the expression in app.services.organizations (config is a literal, not a bind param)
+    op.execute(
+        "CREATE INDEX ix_organizations_name_fts ON organizations "
+        "USING gin (to_tsvector('russian'::regconfig, name))"
+    )
+
+    if _try_create_extension("pg_trgm"):
+        # Serves ILIKE '%q%' / 'q%' and the similarity operator (%)
+        op.execute("CREATE INDEX ix_organizations_name_trgm ON organizations USING gin (name gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_organizations_name_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_organizations_name_fts")
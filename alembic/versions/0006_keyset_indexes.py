@@ -0,0 +1,30 @@
+"""Composite indexes matching keyset pagination orders
+
+Revision ID: 0006_keyset_indexes
+Revises: 0005_organization_name_search
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+from alembic import op
+
+revision = "0006_keyset_indexes"
+down_revision = "0005_organization_name_search"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # (building_id, id) and (name, id) serve both the filter and the keyset order,
+    # so page N is an index range scan like page 1. They supersede the single-column indexes.
+    op.create_index("ix_organizations_building_id_id", "organizations", ["building_id", "id"])
+    op.create_index("ix_organizations_name_id", "organizations", ["name", "id"])
+    op.drop_index("ix_organizations_building_id", table_name="organizations")
+    op.drop_index("ix_organizations_name", table_name="organizations")
+
+
+def downgrade() -> None:
+    op.create_index("ix_organizations_name", "organizations", ["name"])
+    op.create_index("ix_organizations_building_id", "organizations", ["building_id"])
+    op.drop_index("ix_organizations_name_id", table_name="organizations")
+    op.drop_index("ix_organizations_building_id_id", table_name="organizations")
@@ -0,0 +1,41 @@
+"""Spatial GiST index on buildings (cube + earthdistance)
+
+Revision ID: 0007_buildings_earth_index
+Revises: 0006_keyset_indexes
+Create Date: 2026-10-18
+
+cube / earthdistance are optional contrib extensions: if they cannot be created,
+the index is skipped and radius search keeps the haversine + lat/lon btree path.
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007_buildings_earth_index"
+down_revision = "0006_keyset_indexes"
+branch_labels = None
+depends_on = None
+
+
+def _try_create_extension(name: str) -> bool:
+    bind = op.get_bind()
+    try:
+        # SAVEPOINT keeps the migration transaction usable if the extension is missing
+        with bind.begin_nested():
+            bind.execute(sa.text(f"CREATE EXTENSION IF NOT EXISTS {name}"))
+    except sa.exc.DBAPIError:
+        return False
+    return True
+
+
+def upgrade() -> None:
+    if _try_create_extension("cube") and _try_create_extension("earthdistance"):
+        # Must match the expression in app.services.organizations: serves earth_box() @> and KNN (<->)
+        op.execute(
+            "CREATE INDEX ix_buildings_earth ON buildings USING gist (ll_to_earth(latitude, longitude))"
+        )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_buildings_earth")
@@ -0,0 +1,33 @@
+"""Track data version of buildings (in-memory building grid)
+
+Revision ID: 0008_buildings_data_version
+Revises: 0007_buildings_earth_index
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+from alembic import op
+
+revision = "0008_buildings_data_version"
+down_revision = "0007_buildings_earth_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("INSERT INTO data_versions (table_name, version) VALUES ('buildings', 0) ON CONFLICT DO NOTHING")
+    # bump_data_version() comes from migration 0003
+    op.execute(
+        """
+        CREATE TRIGGER trg_buildings_data_version
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE
+        ON buildings
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION bump_data_version()
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_buildings_data_version ON buildings")
+    op.execute("DELETE FROM data_versions WHERE table_name = 'buildings'")
@@ -0,0 +1,37 @@
+"""Track data versions of organization tables (HTTP response cache)
+
+Revision ID: 0009_organizations_data_versions
+Revises: 0008_buildings_data_version
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+from alembic import op
+
+revision = "0009_organizations_data_versions"
+down_revision = "0008_buildings_data_version"
+branch_labels = None
+depends_on = None
+
+TABLES = ("organizations", "organization_phones", "organization_activity")
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.execute(f"INSERT INTO data_versions (table_name, version) VALUES ('{table}', 0) ON CONFLICT DO NOTHING")
+        # bump_data_version() comes from migration 0003
+        op.execute(
+            f"""
+            CREATE TRIGGER trg_{table}_data_version
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE
+            ON {table}
+            FOR EACH STATEMENT
+            EXECUTE FUNCTION bump_data_version()
+            """
+        )
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_data_version ON {table}")
+        op.execute(f"DELETE FROM data_versions WHERE table_name = '{table}'")
@@ -0,0 +1,33 @@
+"""Admin endpoints: bulk import of directory dumps (admin key only)."""
+from __future__ import annotations
+
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+
+from app.core.security import verify_admin_key
+from app.db.bulk_import import KINDS, BulkImportError, Source, import_with_engine
+
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(verify_admin_key)])
+
+
+@router.post("/import/{kind}")
+async def bulk_import(
+    kind: str,
+    request: Request,
+    format: str = Query(default="ndjson", pattern="^(csv|ndjson)$"),
+) -> dict[str, Any]:
+    """Imports the request body (CSV or NDJSON, streamed) into ``kind``; see app/db/bulk_import.py.
+
+    One kind per request, in dependency order across requests (buildings before organizations...).
+    The import runs in one transaction; the response is its report.
+    """
+
+    if kind not in KINDS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Unknown kind, expected one of {KINDS}")
+    try:
+        report = await import_with_engine([Source(kind, request.stream(), format)])
+    except BulkImportError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)) from e
+    return report.as_dict()
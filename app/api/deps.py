@@ -5,9 +5,12 @@ from typing import Annotated
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.db.replicas import get_read_session
 from app.db.session import get_session
 
 
 SessionDep = Annotated[AsyncSession, Depends(get_session)]
+# Read-only work: routed to a read replica when configured.
+ReadSessionDep = Annotated[AsyncSession, Depends(get_read_session)]
 
 
@@ -0,0 +1,90 @@
+"""``GET /metrics``: request / DB metrics plus the stats the app already keeps, read at scrape time."""
+from __future__ import annotations
+
+from typing import Iterator
+
+from fastapi import APIRouter, Response
+
+from app.api.response_cache import get_response_cache, response_flights
+from app.core.api_keys import get_key_registry
+from app.core.config import get_settings
+from app.core.metrics import CONTENT_TYPE, Family, registry
+from app.db.replicas import get_replica_router
+from app.db.session import pool_stats
+from app.services.building_index import building_index_stats
+from app.services.singleflight import service_flights
+
+
+router = APIRouter()
+
+
+def _gauge(name: str, help: str, value: float, **labels: str) -> Family:
+    return Family(name, "gauge", help, [(labels, value)])
+
+
+def _counter(name: str, help: str, value: float, **labels: str) -> Family:
+    return Family(name, "counter", help, [(labels, value)])
+
+
+@registry.add_collector
+def _pool() -> Iterator[Family]:
+    stats = pool_stats()
+    yield _counter("db_pool_checkouts_total", "Connection checkouts (all pools).", stats["checkouts"])
+    yield _counter("db_pool_checkout_wait_seconds_total", "Time waiting in pool.connect().", stats["total_wait_s"])
+    yield _gauge("db_pool_checkout_wait_max_seconds", "Longest wait in pool.connect().", stats["max_wait_s"])
+    yield _counter("db_pool_timeouts_total", "Checkouts that timed out.", stats["timeouts"])
+    # Only a QueuePool (not NullPool, as in tests) has a size.
+    for key, help in (
+        ("size", "Configured pool size of the primary."),
+        ("in_use", "Checked out connections of the primary."),
+        ("checked_in", "Idle connections of the primary."),
+        ("overflow", "Overflow connections of the primary (negative until the pool is filled)."),
+    ):
+        if key in stats:
+            yield _gauge(f"db_pool_{key}", help, stats[key])
+
+    router = get_replica_router()
+    if router is not None:
+        stats = router.stats()
+        yield _counter("db_replica_primary_fallbacks_total", "Reads sent to the primary.", stats["primary_fallbacks"])
+        for name, key, help in (
+            ("db_replica_in_flight", "in_flight", "Sessions open on the replica."),
+            ("db_replica_ejected", "ejected", "1 while the replica is ejected."),
+            ("db_replica_lag_seconds", "lag_s", "Last measured replay lag."),
+        ):
+            yield Family(name, "gauge", help, [({"replica": r["url"]}, float(r[key])) for r in stats["replicas"]])
+
+
+@registry.add_collector
+def _caches() -> Iterator[Family]:
+    if get_settings().response_cache_enabled:
+        stats = get_response_cache().stats_snapshot()
+        for key in ("hits", "shared_hits", "misses", "not_modified"):
+            yield _counter(f"response_cache_{key}_total", f"Response cache {key.replace('_', ' ')}.", stats[key])
+        yield _gauge("response_cache_entries", "Entries in the local response cache.", stats["entries"])
+
+    flights = {"service": service_flights.stats_snapshot(), "response": response_flights.stats_snapshot()}
+    for name, kind, key, help in (
+        ("single_flight_executed_total", "counter", "executed", "Calls executed by a leader."),
+        ("single_flight_shared_total", "counter", "shared", "Calls that got a leader's result."),
+        ("single_flight_in_flight", "gauge", "in_flight", "Keys being executed."),
+    ):
+        yield Family(name, kind, help, [({"scope": scope}, stats[key]) for scope, stats in flights.items()])
+
+    stats = building_index_stats()
+    yield _counter("building_index_lookups_total", "Building grid lookups.", stats["lookups"])
+    yield _counter("building_index_builds_total", "Building grid (re)builds.", stats["builds"])
+    yield _counter("building_index_build_seconds_total", "Time (re)building the grid.", stats["total_build_ms"] / 1000)
+
+
+@registry.add_collector
+def _api_keys() -> Iterator[Family]:
+    keys = get_key_registry()
+    yield _gauge("api_keys_loaded", "API keys in the registry.", len(keys))
+    yield _counter("api_keys_reloads_total", "Keys file (re)loads.", keys.reloads)
+    yield _counter("api_keys_reload_errors_total", "Keys file loads that failed.", keys.reload_errors)
+
+
+@router.get("/metrics", tags=["meta"], include_in_schema=False)
+async def metrics() -> Response:
+    return Response(registry.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,34 @@
+"""Profiling reports of requests sent with ``X-Profile: 1`` (admin key only)."""
+from __future__ import annotations
+
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+
+from app.core.profiling import get_profile_store
+from app.core.security import verify_admin_key
+
+
+router = APIRouter(prefix="/debug/profiles", tags=["meta"], dependencies=[Depends(verify_admin_key)])
+
+
+@router.get("")
+async def list_profiles() -> list[dict[str, Any]]:
+    """Reports kept by this worker, newest first."""
+
+    return get_profile_store().list()
+
+
+@router.get("/{profile_id}", response_model=None)
+async def get_profile(
+    profile_id: str,
+    format: str = Query(default="json", pattern="^(json|folded)$", description="folded: stacks for flame graphs"),
+) -> dict[str, Any] | Response:
+    """The report (timings, SQL log, folded stacks) or only its folded stacks."""
+
+    report = get_profile_store().get(profile_id)
+    if report is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    if format == "folded":
+        return Response(report["folded"], media_type="text/plain; charset=utf-8")
+    return report
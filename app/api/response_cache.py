@@ -0,0 +1,210 @@
+"""HTTP response cache for idempotent read endpoints.
+
+Entries are keyed by route, normalized query params and the data versions of the
+tables the response is built from, so any committed write (trigger-bumped
+version) makes old entries unreachable; TTL / LRU only bound memory. The same key
+gives a strong ETag, and ``If-None-Match`` is answered with 304 before the
+response is built.
+"""
+from __future__ import annotations
+
+import hashlib
+import importlib
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Awaitable, Callable, Protocol
+from urllib.parse import urlencode
+
+import orjson
+from fastapi import Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import Settings, get_settings
+from app.db.versions import get_data_versions
+from app.services.singleflight import SingleFlight, uncoalesced
+
+
+# Tables an organization document is built from.
+ORGANIZATION_TABLES = ("organizations", "organization_phones", "organization_activity", "buildings", "activities")
+
+# Response headers kept with the cached body.
+_CACHED_HEADERS = ("content-type", "x-next-cursor")
+
+response_flights = SingleFlight()
+
+
+class CacheBackend(Protocol):
+    async def get(self, key: str) -> bytes | None: ...
+
+    async def set(self, key: str, value: bytes, ttl_s: float) -> None: ...
+
+
+class MemoryCache:
+    """In-process LRU with per-entry TTL."""
+
+    def __init__(self, *, max_entries: int, clock: Callable[[], float] = time.monotonic) -> None:
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._max_entries = max_entries
+        self._clock = clock
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl_s: float) -> None:
+        self._entries[key] = (self._clock() + ttl_s, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+
+@dataclass(slots=True)
+class ResponseCacheStats:
+    hits: int = 0
+    shared_hits: int = 0
+    misses: int = 0
+    not_modified: int = 0
+
+
+class ResponseCache:
+    """Local LRU in front of an optional shared backend (e.g. Redis, for several workers)."""
+
+    def __init__(self, local: MemoryCache, shared: CacheBackend | None, *, ttl_s: float) -> None:
+        self.local = local
+        self.shared = shared
+        self.ttl_s = ttl_s
+        self.stats = ResponseCacheStats()
+
+    async def get(self, key: str) -> bytes | None:
+        value = await self.local.get(key)
+        if value is not None:
+            self.stats.hits += 1
+            return value
+        if self.shared is not None:
+            value = await self.shared.get(key)
+            if value is not None:
+                self.stats.shared_hits += 1
+                await self.local.set(key, value, self.ttl_s)
+                return value
+        self.stats.misses += 1
+        return None
+
+    async def set(self, key: str, value: bytes) -> None:
+        await self.local.set(key, value, self.ttl_s)
+        if self.shared is not None:
+            await self.shared.set(key, value, self.ttl_s)
+
+    def stats_snapshot(self) -> dict[str, int]:
+        return {**asdict(self.stats), "entries": len(self.local)}
+
+
+def _load_shared_backend(settings: Settings) -> CacheBackend | None:
+    """``response_cache_backend`` is "module:factory"; the factory gets the settings."""
+
+    if not settings.response_cache_backend:
+        return None
+    module_name, _, attr = settings.response_cache_backend.partition(":")
+    factory = getattr(importlib.import_module(module_name), attr)
+    return factory(settings)
+
+
+@lru_cache
+def get_response_cache() -> ResponseCache:
+    settings = get_settings()
+    return ResponseCache(
+        MemoryCache(max_entries=settings.response_cache_max_entries),
+        _load_shared_backend(settings),
+        ttl_s=settings.response_cache_ttl_s,
+    )
+
+
+def _cache_key(request: Request, versions: tuple[int, ...], variant: str) -> str:
+    # Re-encoded, so a "&" or "=" inside a value cannot pass for a separator.
+    params = urlencode(sorted(request.query_params.multi_items()))
+    return f"{request.url.path}?{params}|{variant}|{','.join(map(str, versions))}"
+
+
+def _etag(key: str) -> str:
+    return '"' + hashlib.blake2b(key.encode(), digest_size=16).hexdigest() + '"'
+
+
+def _if_none_match(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    # No "*" shortcut: it is answered before build(), which may still end in a 404 / 422.
+    return etag in (t.strip() for t in header.split(","))
+
+
+def _pack(response: Response) -> bytes:
+    headers = {name: response.headers[name] for name in _CACHED_HEADERS if name in response.headers}
+    return orjson.dumps(headers) + b"\n" + bytes(response.body)
+
+
+def _unpack(value: bytes) -> tuple[dict[str, str], bytes]:
+    headers, _, body = value.partition(b"\n")
+    return orjson.loads(headers), body
+
+
+async def cached_response(
+    request: Request,
+    session: AsyncSession,
+    *,
+    tables: tuple[str, ...],
+    build: Callable[[], Awaitable[Response]],
+    variant: str = "",
+) -> Response:
+    """Serves ``build()``'s response from the cache, keyed by the data versions of ``tables``.
+
+    ``variant`` must differ between byte-different renderings of the same data.
+    Only 200 responses are stored; errors raised by ``build`` pass through.
+    """
+
+    if not get_settings().response_cache_enabled:
+        return await build()
+
+    versions = await get_data_versions().get_many(session, tables)
+    key = _cache_key(request, versions, variant)
+    etag = _etag(key)
+    cache_headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    cache = get_response_cache()
+
+    if _if_none_match(request, etag):
+        cache.stats.not_modified += 1
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+
+    cached = await cache.get(key)
+    if cached is not None:
+        headers, body = _unpack(cached)
+        return Response(body, headers={**headers, **cache_headers})
+
+    async def build_and_store() -> tuple[int, bytes]:
+        # Coalesced on ``key`` (versions included) below, not on the versionless service keys.
+        with uncoalesced():
+            response = await build()
+        packed = _pack(response)
+        if response.status_code == status.HTTP_200_OK:
+            await cache.set(key, packed)
+        return response.status_code, packed
+
+    # Concurrent misses for the same key share one build and its serialized body.
+    if get_settings().single_flight_enabled:
+        status_code, packed = await response_flights.do(key, build_and_store)
+    else:
+        status_code, packed = await build_and_store()
+    headers, body = _unpack(packed)
+    if status_code == status.HTTP_200_OK:
+        headers.update(cache_headers)
+    return Response(body, status_code=status_code, headers=headers)
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from typing import Any, AsyncIterator, Callable, TypeVar
+
+import orjson
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+from app.core.metrics import serialization
+
+
+T = TypeVar("T")
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+JSON_MEDIA_TYPE = "application/json"
+
+
+def stream_media_type(request: Request, *, stream: bool) -> str | None:
+    """Streaming is opt-in: ``Accept: application/x-ndjson`` or ``?stream=true`` (chunked JSON array)."""
+
+    if NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        return NDJSON_MEDIA_TYPE
+    if stream:
+        return JSON_MEDIA_TYPE
+    return None
+
+
+async def _ndjson_chunks(batches: AsyncIterator[list[T]], to_json: Callable[[T], Any]) -> AsyncIterator[bytes]:
+    async for batch in batches:
+        if batch:
+            with serialization():
+                chunk = b"".join(orjson.dumps(to_json(item)) + b"\n" for item in batch)
+            yield chunk
+
+
+async def _json_array_chunks(batches: AsyncIterator[list[T]], to_json: Callable[[T], Any]) -> AsyncIterator[bytes]:
+    # Same bytes as a regular JSON array response, just sent batch by batch.
+    sep = b"["
+    async for batch in batches:
+        if batch:
+            with serialization():
+                chunk = sep + b",".join(orjson.dumps(to_json(item)) for item in batch)
+            yield chunk
+            sep = b","
+    yield b"[]" if sep == b"[" else b"]"
+
+
+def streaming_response(
+    batches: AsyncIterator[list[T]], *, to_json: Callable[[T], Any], media_type: str
+) -> StreamingResponse:
+    """Serializes batches as they arrive, so memory stays bounded by one batch."""
+
+    chunks = _ndjson_chunks if media_type == NDJSON_MEDIA_TYPE else _json_array_chunks
+    return StreamingResponse(chunks(batches, to_json), media_type=media_type)
@@ -1,17 +1,31 @@
 from __future__ import annotations
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
 
-from app.api.deps import SessionDep
+from app.api.deps import ReadSessionDep
+from app.api.response_cache import cached_response
 from app.schemas.activity import ActivityTreeNode
-from app.services.activities import list_activity_tree
+from app.services.activities import MAX_TREE_DEPTH, activity_tree_json
 
 
 router = APIRouter(prefix="/activities")
 
 
 @router.get("/tree", response_model=list[ActivityTreeNode])
-async def get_activity_tree(session: SessionDep) -> list[ActivityTreeNode]:
+async def get_activity_tree(
+    session: ReadSessionDep,
+    request: Request,
+    root_id: int | None = Query(default=None, description="Return only this activity and its subtree"),
+    max_depth: int = Query(
+        default=MAX_TREE_DEPTH, ge=1, le=MAX_TREE_DEPTH, description="Levels to return, counting the roots as 1"
+    ),
+) -> Response:
     """Get activity tree limited to 3 levels."""
 
-    return await list_activity_tree(session)
+    async def build() -> Response:
+        data = await activity_tree_json(session, root_id=root_id, max_depth=max_depth)
+        if data is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Activity not found")
+        return Response(data, media_type="application/json")
+
+    return await cached_response(request, session, tables=("activities",), build=build)
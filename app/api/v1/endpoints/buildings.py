@@ -1,18 +1,33 @@
 from __future__ import annotations
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Request, Response
+from fastapi.responses import ORJSONResponse
 
-from app.api.deps import SessionDep
+from app.api.deps import ReadSessionDep
+from app.api.response_cache import cached_response
+from app.core.config import get_settings
+from app.core.metrics import serialization
 from app.schemas.building import BuildingOut
-from app.services.buildings import list_buildings
+from app.schemas.serializers import building_json
+from app.services.buildings import list_buildings, list_buildings_json
 
 
 router = APIRouter(prefix="/buildings")
 
 
 @router.get("", response_model=list[BuildingOut])
-async def get_buildings(session: SessionDep) -> list[BuildingOut]:
+async def get_buildings(session: ReadSessionDep, request: Request) -> Response:
     """List all buildings."""
 
-    buildings = await list_buildings(session)
-    return [BuildingOut.model_validate(b) for b in buildings]
+    raw_json = get_settings().db_json_responses
+
+    async def build() -> Response:
+        if raw_json:
+            return Response(await list_buildings_json(session), media_type="application/json")
+        buildings = await list_buildings(session)
+        with serialization():
+            return ORJSONResponse([building_json(b) for b in buildings])
+
+    return await cached_response(
+        request, session, tables=("buildings",), build=build, variant="db" if raw_json else ""
+    )
@@ -1,75 +1,197 @@
 from __future__ import annotations
 
-from typing import Literal
+from typing import Callable, Literal, TypeVar
 
-from fastapi import APIRouter, HTTPException, Query, status
+import orjson
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from fastapi.responses import ORJSONResponse
 
-from app.api.deps import SessionDep
-from app.schemas.organization import OrganizationOut, OrganizationOutWithDistance
-from app.services.activities import activity_exists
-from app.services.buildings import building_exists
+from app.api.deps import ReadSessionDep
+from app.api.response_cache import ORGANIZATION_TABLES, cached_response
+from app.api.streaming import stream_media_type, streaming_response
+from app.core.config import get_settings
+from app.core.metrics import serialization
+from app.schemas.organization import OrganizationBatchOut, OrganizationOut, OrganizationOutWithDistance
+from app.schemas.serializers import organization_json, organization_with_distance_json
+from app.services.json_docs import json_array_bytes
+from app.services.pagination import InvalidCursor, Page
+from app.services.read_models import OrganizationView
 from app.services.organizations import (
+    SearchMode,
     get_organization,
+    get_organizations_by_ids,
     list_organizations_by_activity,
     list_organizations_by_building,
     list_organizations_by_geo,
     search_organizations_by_name,
+    stream_organizations_by_activity,
+    stream_organizations_by_building,
+    stream_organizations_by_geo,
+    stream_search_organizations_by_name,
 )
 
 
+T = TypeVar("T")
+
 router = APIRouter(prefix="/organizations")
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+CursorQuery = Query(
+    default=None, description=f"Opaque cursor from the {NEXT_CURSOR_HEADER} header of the previous page"
+)
+
+
+StreamQuery = Query(
+    default=False,
+    description="Stream the whole result set as a chunked JSON array (limit/cursor are ignored). "
+    "Send Accept: application/x-ndjson to stream NDJSON instead.",
+)
+
+
+def _raw_json() -> bool:
+    return get_settings().db_json_responses
+
+
+def _variant(raw_json: bool) -> str:
+    # Postgres and orjson render the same document with different bytes (strong ETags)
+    return "db" if raw_json else ""
+
+
+def _page_response(page: Page[T], to_json: Callable[[T], dict], *, raw_json: bool) -> Response:
+    # Returned directly, so FastAPI skips response_model validation (it still documents the shape).
+    headers = {NEXT_CURSOR_HEADER: page.next_cursor} if page.next_cursor is not None else None
+    with serialization():
+        if raw_json:
+            # Items are JSON documents built by Postgres
+            return Response(json_array_bytes(page.items), media_type="application/json", headers=headers)
+        return ORJSONResponse([to_json(item) for item in page.items], headers=headers)
+
+
+def _org_with_distance_json(row: tuple[OrganizationView, float | None]) -> dict:
+    return organization_with_distance_json(*row)
+
 
 @router.get("/by-building/{building_id}", response_model=list[OrganizationOut])
-async def organizations_by_building(building_id: int, session: SessionDep) -> list[OrganizationOut]:
+async def organizations_by_building(
+    building_id: int,
+    session: ReadSessionDep,
+    request: Request,
+    limit: int = Query(default=200, ge=1, le=500),
+    cursor: str | None = CursorQuery,
+    stream: bool = StreamQuery,
+) -> Response:
     """List organizations in a specific building."""
 
-    orgs = await list_organizations_by_building(session, building_id=building_id)
-    if not orgs and not await building_exists(session, building_id=building_id):
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Building not found")
-    return [OrganizationOut.model_validate(o) for o in orgs]
+    media_type = stream_media_type(request, stream=stream)
+    if media_type is not None:
+        batches = await stream_organizations_by_building(session, building_id=building_id)
+        if batches is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Building not found")
+        return streaming_response(batches, to_json=organization_json, media_type=media_type)
+
+    raw_json = _raw_json()
+
+    async def build() -> Response:
+        try:
+            page = await list_organizations_by_building(
+                session, building_id=building_id, limit=limit, cursor=cursor, raw_json=raw_json
+            )
+        except InvalidCursor as e:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)) from e
+        if page is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Building not found")
+        return _page_response(page, organization_json, raw_json=raw_json)
+
+    return await cached_response(
+        request, session, tables=ORGANIZATION_TABLES, build=build, variant=_variant(raw_json)
+    )
 
 
 @router.get("/by-activity/{activity_id}", response_model=list[OrganizationOut])
 async def organizations_by_activity(
     activity_id: int,
-    session: SessionDep,
+    session: ReadSessionDep,
+    request: Request,
     include_descendants: bool = Query(default=True, description="Include all nested activities (subtree search)"),
-) -> list[OrganizationOut]:
+    limit: int = Query(default=200, ge=1, le=500),
+    cursor: str | None = CursorQuery,
+    stream: bool = StreamQuery,
+) -> Response:
     """List organizations for a given activity."""
 
-    orgs = await list_organizations_by_activity(session, activity_id=activity_id, include_descendants=include_descendants)
-    if not orgs and not await activity_exists(session, activity_id=activity_id):
+    media_type = stream_media_type(request, stream=stream)
+    if media_type is not None:
+        batches = await stream_organizations_by_activity(
+            session, activity_id=activity_id, include_descendants=include_descendants
+        )
+        if batches is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Activity not found")
+        return streaming_response(batches, to_json=organization_json, media_type=media_type)
+
+    try:
+        page = await list_organizations_by_activity(
+            session,
+            activity_id=activity_id,
+            include_descendants=include_descendants,
+            limit=limit,
+            cursor=cursor,
+            raw_json=_raw_json(),
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)) from e
+    if page is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Activity not found")
-    return [OrganizationOut.model_validate(o) for o in orgs]
+    return _page_response(page, organization_json, raw_json=_raw_json())
 
 
 @router.get("/search", response_model=list[OrganizationOut])
 async def search_organizations(
-    session: SessionDep,
-    q: str = Query(min_length=1, description="Search by organization name (ILIKE %q%)"),
+    session: ReadSessionDep,
+    request: Request,
+    q: str = Query(min_length=1, description="Search by organization name"),
+    mode: SearchMode = Query(
+        default="substring",
+        description="prefix: name starts with q; substring: ILIKE %q%; "
+        "fuzzy: trigram similarity (typos); fulltext: word match ranked by relevance",
+    ),
     limit: int = Query(default=50, ge=1, le=200),
-) -> list[OrganizationOut]:
+    cursor: str | None = CursorQuery,
+    stream: bool = StreamQuery,
+) -> Response:
     """Search organizations by name."""
 
-    orgs = await search_organizations_by_name(session, q=q, limit=limit)
-    return [OrganizationOut.model_validate(o) for o in orgs]
+    media_type = stream_media_type(request, stream=stream)
+    try:
+        if media_type is not None:
+            batches = await stream_search_organizations_by_name(session, q=q, mode=mode)
+            return streaming_response(batches, to_json=organization_json, media_type=media_type)
+        page = await search_organizations_by_name(
+            session, q=q, limit=limit, mode=mode, cursor=cursor, raw_json=_raw_json()
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)) from e
+    return _page_response(page, organization_json, raw_json=_raw_json())
 
 
 @router.get("/geo", response_model=list[OrganizationOutWithDistance])
 async def organizations_geo(
-    session: SessionDep,
-    mode: Literal["radius", "bbox"] = Query(description="Search mode: radius or bbox"),
-    lat: float | None = Query(default=None, description="Reference latitude (mode=radius)"),
-    lon: float | None = Query(default=None, description="Reference longitude (mode=radius)"),
+    session: ReadSessionDep,
+    request: Request,
+    mode: Literal["radius", "bbox", "knn"] = Query(description="Search mode: radius, bbox or knn (k nearest)"),
+    lat: float | None = Query(default=None, description="Reference latitude (mode=radius/knn)"),
+    lon: float | None = Query(default=None, description="Reference longitude (mode=radius/knn)"),
     radius_m: float | None = Query(default=None, gt=0, description="Radius in meters (mode=radius)"),
     min_lat: float | None = Query(default=None, description="BBox min latitude (mode=bbox)"),
     max_lat: float | None = Query(default=None, description="BBox max latitude (mode=bbox)"),
     min_lon: float | None = Query(default=None, description="BBox min longitude (mode=bbox)"),
     max_lon: float | None = Query(default=None, description="BBox max longitude (mode=bbox)"),
+    k: int | None = Query(default=None, ge=1, le=500, description="Number of nearest organizations (mode=knn)"),
     limit: int = Query(default=200, ge=1, le=500),
-) -> list[OrganizationOutWithDistance]:
-    """Search organizations in a given radius or bounding box around the point."""
+    cursor: str | None = CursorQuery,
+    stream: bool = StreamQuery,
+) -> Response:
+    """Search organizations in a given radius or bounding box around the point, or the k nearest ones."""
 
     # Conditional required params (tests expect 422 instead of 500)
     if mode == "radius":
@@ -84,33 +206,99 @@ async def organizations_geo(
                 status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
                 detail="min_lat, max_lat, min_lon and max_lon are required for mode=bbox",
             )
+    elif mode == "knn":
+        if lat is None or lon is None or k is None:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="lat, lon and k are required for mode=knn",
+            )
 
+    geo_params = dict(
+        mode=mode,
+        lat=lat,
+        lon=lon,
+        radius_m=radius_m,
+        min_lat=min_lat,
+        max_lat=max_lat,
+        min_lon=min_lon,
+        max_lon=max_lon,
+        k=k,
+    )
+    media_type = stream_media_type(request, stream=stream)
     try:
-        rows = await list_organizations_by_geo(
-            session,
-            mode=mode,
-            lat=lat,
-            lon=lon,
-            radius_m=radius_m,
-            min_lat=min_lat,
-            max_lat=max_lat,
-            min_lon=min_lon,
-            max_lon=max_lon,
-            limit=limit,
+        if media_type is not None:
+            batches = await stream_organizations_by_geo(session, **geo_params)
+            return streaming_response(batches, to_json=_org_with_distance_json, media_type=media_type)
+        page = await list_organizations_by_geo(
+            session, **geo_params, limit=limit, cursor=cursor, raw_json=_raw_json()
         )
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)) from e
 
-    out: list[OrganizationOutWithDistance] = []
-    for org, dist in rows:
-        out.append(OrganizationOutWithDistance.model_validate(org).model_copy(update={"distance_m": dist}))
-    return out
+    return _page_response(page, _org_with_distance_json, raw_json=_raw_json())
+
+
+def _parse_ids(ids: str) -> list[int]:
+    """Comma-separated ids, deduplicated in order of first appearance."""
+
+    try:
+        parsed = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="ids must be comma-separated integers"
+        ) from e
+    unique = list(dict.fromkeys(parsed))
+    max_ids = get_settings().organizations_batch_max_ids
+    if not unique or len(unique) > max_ids:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"ids must contain 1..{max_ids} organization ids"
+        )
+    return unique
+
+
+# Declared before /{org_id}, so "batch" is not parsed as an id.
+@router.get("/batch", response_model=OrganizationBatchOut)
+async def read_organizations_batch(
+    session: ReadSessionDep,
+    request: Request,
+    ids: str = Query(description="Comma-separated organization ids, e.g. 1,2,3"),
+) -> Response:
+    """Get many organizations by id in one request (requested order kept, missing ids reported)."""
+
+    org_ids = _parse_ids(ids)
+    raw_json = _raw_json()
+
+    async def build() -> Response:
+        found = await get_organizations_by_ids(session, ids=org_ids, raw_json=raw_json)
+        missing = [i for i in org_ids if i not in found]
+        with serialization():
+            if raw_json:
+                docs = [found[i] for i in org_ids if i in found]
+                body = b'{"items":' + json_array_bytes(docs) + b',"missing":' + orjson.dumps(missing) + b"}"
+                return Response(body, media_type="application/json")
+            items = [organization_json(found[i]) for i in org_ids if i in found]
+            return ORJSONResponse({"items": items, "missing": missing})
+
+    return await cached_response(
+        request, session, tables=ORGANIZATION_TABLES, build=build, variant=_variant(raw_json)
+    )
+
 
 @router.get("/{org_id}", response_model=OrganizationOut)
-async def read_organization(org_id: int, session: SessionDep) -> OrganizationOut:
+async def read_organization(org_id: int, session: ReadSessionDep, request: Request) -> Response:
     """Get a single organization by id (includes building, phones, activities)."""
 
-    org = await get_organization(session, org_id=org_id)
-    if org is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Organization not found")
-    return OrganizationOut.model_validate(org)
\ No newline at end of file
+    raw_json = _raw_json()
+
+    async def build() -> Response:
+        org = await get_organization(session, org_id=org_id, raw_json=raw_json)
+        if org is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Organization not found")
+        if raw_json:
+            return Response(org, media_type="application/json")
+        with serialization():
+            return ORJSONResponse(organization_json(org))
+
+    return await cached_response(
+        request, session, tables=ORGANIZATION_TABLES, build=build, variant=_variant(raw_json)
+    )
\ No newline at end of file
@@ -0,0 +1,171 @@
+"""Admission control per API key: token-bucket rate limit and a cap on requests in flight.
+
+Excess requests are answered at once, before they touch the DB pool: ``429`` when
+the key's bucket is empty, ``503`` when the key already has ``max_concurrent``
+requests in flight, both with ``Retry-After``. A slot is held until the response
+body is sent, streaming included. The limits come from the settings, or from the
+key's entry in the keys file (``rate_limit_rps``, ``rate_limit_burst``,
+``max_concurrent``); 0 disables a limit.
+
+The in-memory backend limits each worker on its own. For limits shared by
+workers, ``rate_limit_backend`` names a "module:factory" whose factory(settings)
+returns an object implementing ``AdmissionBackend`` (e.g. on Redis).
+"""
+from __future__ import annotations
+
+import importlib
+import math
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Protocol
+
+import orjson
+from starlette.datastructures import Headers
+
+from app.core.api_keys import ApiKey, get_key_registry
+from app.core.config import Settings, get_settings
+from app.core.metrics import REQUESTS_REJECTED
+
+
+class AdmissionBackend(Protocol):
+    async def take(self, key: str, *, rate: float, burst: float) -> float:
+        """Takes a token; returns 0 if there was one, else seconds until there is."""
+
+    async def acquire_slot(self, key: str, *, limit: int) -> bool: ...
+
+    async def release_slot(self, key: str) -> None: ...
+
+
+class MemoryBackend:
+    def __init__(self, *, clock: Callable[[], float] = time.monotonic) -> None:
+        # key -> (tokens, refilled_at)
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._in_flight: dict[str, int] = {}
+        self._clock = clock
+
+    async def take(self, key: str, *, rate: float, burst: float) -> float:
+        now = self._clock()
+        tokens, refilled_at = self._buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - refilled_at) * rate)
+        if tokens < 1:
+            self._buckets[key] = (tokens, now)
+            return (1 - tokens) / rate
+        self._buckets[key] = (tokens - 1, now)
+        return 0.0
+
+    async def acquire_slot(self, key: str, *, limit: int) -> bool:
+        in_flight = self._in_flight.get(key, 0)
+        if in_flight >= limit:
+            return False
+        self._in_flight[key] = in_flight + 1
+        return True
+
+    async def release_slot(self, key: str) -> None:
+        self._in_flight[key] -= 1
+
+    def in_flight(self, key: str) -> int:
+        return self._in_flight.get(key, 0)
+
+
+@dataclass(frozen=True, slots=True)
+class Rejection:
+    status: int
+    retry_after_s: float
+    detail: str
+
+
+class AdmissionControl:
+    def __init__(self, backend: AdmissionBackend, *, rps: float, burst: int, max_concurrent: int) -> None:
+        self.backend = backend
+        self.rps = rps
+        self.burst = burst
+        self.max_concurrent = max_concurrent
+
+    def _limits(self, api_key: ApiKey) -> tuple[float, float, int]:
+        rps = self.rps if api_key.rate_limit_rps is None else api_key.rate_limit_rps
+        burst = self.burst if api_key.rate_limit_burst is None else api_key.rate_limit_burst
+        max_concurrent = self.max_concurrent if api_key.max_concurrent is None else api_key.max_concurrent
+        # Without an explicit burst, allow one second worth of requests at once.
+        return rps, burst or max(1.0, rps), max_concurrent
+
+    async def admit(self, api_key: ApiKey) -> Rejection | None:
+        """None if admitted; then ``release`` must be called when the request is done."""
+
+        rps, burst, max_concurrent = self._limits(api_key)
+        # The slot first: a request refused with 503 must not use up a token.
+        if max_concurrent > 0 and not await self.backend.acquire_slot(api_key.identity, limit=max_concurrent):
+            return Rejection(503, 1.0, "Too many concurrent requests")
+        if rps > 0:
+            wait_s = await self.backend.take(api_key.identity, rate=rps, burst=burst)
+            if wait_s > 0:
+                if max_concurrent > 0:
+                    await self.backend.release_slot(api_key.identity)
+                return Rejection(429, wait_s, "Rate limit exceeded")
+        return None
+
+    async def release(self, api_key: ApiKey) -> None:
+        if self._limits(api_key)[2] > 0:
+            await self.backend.release_slot(api_key.identity)
+
+
+def _load_backend(settings: Settings) -> AdmissionBackend:
+    """``rate_limit_backend`` is "module:factory"; the factory gets the settings."""
+
+    if not settings.rate_limit_backend:
+        return MemoryBackend()
+    module_name, _, attr = settings.rate_limit_backend.partition(":")
+    factory = getattr(importlib.import_module(module_name), attr)
+    return factory(settings)
+
+
+@lru_cache
+def get_admission_control() -> AdmissionControl:
+    settings = get_settings()
+    return AdmissionControl(
+        _load_backend(settings),
+        rps=settings.rate_limit_rps,
+        burst=settings.rate_limit_burst,
+        max_concurrent=settings.max_concurrent_per_key,
+    )
+
+
+class AdmissionMiddleware:
+    """Applies admission control to requests under ``prefix`` carrying a known API key.
+
+    Requests without a valid key pass through: verify_api_key answers them with 401.
+    """
+
+    def __init__(self, app: Any, *, prefix: str) -> None:
+        self.app = app
+        self.prefix = prefix
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.prefix):
+            await self.app(scope, receive, send)
+            return
+        api_key = get_key_registry().lookup(Headers(scope=scope).get("x-api-key"))
+        if api_key is None:
+            await self.app(scope, receive, send)
+            return
+
+        control = get_admission_control()
+        rejection = await control.admit(api_key)
+        if rejection is not None:
+            REQUESTS_REJECTED.inc(str(rejection.status), api_key.identity)
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": rejection.status,
+                    "headers": [
+                        (b"content-type", b"application/json"),
+                        (b"retry-after", str(max(1, math.ceil(rejection.retry_after_s))).encode()),
+                    ],
+                }
+            )
+            await send({"type": "http.response.body", "body": orjson.dumps({"detail": rejection.detail})})
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            await control.release(api_key)
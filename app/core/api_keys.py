@@ -0,0 +1,194 @@
+"""API key registry: sha256 digests of the issued keys, each with an identity.
+
+Keys are random tokens, so a fast unsalted hash is enough (there is nothing to
+brute-force); only digests are kept in memory and in the keys file. A lookup is
+one sha256 and one dict access, however many keys are issued, and the matched
+digest is compared again with ``hmac.compare_digest``.
+
+Sources:
+
+- ``API_KEY`` (plaintext setting, identity "default"), for single-key setups;
+- ``API_KEYS_FILE``: JSON list of ``{"identity": ..., "sha256": <hex digest>}``,
+  optionally with the key's admission limits (``rate_limit_rps``, ``rate_limit_burst``,
+  ``max_concurrent``).
+  It is re-read when its mtime / size change, checked at most every
+  ``api_keys_reload_s`` seconds, so keys can be issued and revoked without a
+  restart. A file that fails to parse is logged once and the previous keys stay;
+  deleting the file revokes all its keys.
+
+Issue a key (prints the key once and the entry for the file):
+
+    python -m app.core.api_keys issue mobile-app
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import hmac
+import logging
+import secrets
+import sys
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, TypeVar
+
+import orjson
+
+from app.core.config import get_settings
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_IDENTITY = "default"
+
+T = TypeVar("T", int, float)
+
+
+def hash_key(key: str) -> bytes:
+    return hashlib.sha256(key.encode()).digest()
+
+
+@dataclass(frozen=True, slots=True)
+class ApiKey:
+    identity: str
+    digest: bytes
+    # Per-key admission limits (app/core/admission.py); None: the settings' defaults.
+    rate_limit_rps: float | None = None
+    rate_limit_burst: int | None = None
+    max_concurrent: int | None = None
+
+
+def _limit(entry: dict, name: str, parse: Callable[[object], T]) -> T | None:
+    value = entry.get(name)
+    if value is None:
+        return None
+    parsed = parse(value)
+    if parsed < 0:
+        raise ValueError(f"Negative {name} for {entry.get('identity')!r}")
+    return parsed
+
+
+def _load_file(path: Path) -> dict[bytes, ApiKey]:
+    keys = {}
+    for entry in orjson.loads(path.read_bytes()):
+        key = ApiKey(
+            identity=str(entry["identity"]),
+            digest=bytes.fromhex(entry["sha256"]),
+            rate_limit_rps=_limit(entry, "rate_limit_rps", float),
+            rate_limit_burst=_limit(entry, "rate_limit_burst", int),
+            max_concurrent=_limit(entry, "max_concurrent", int),
+        )
+        if len(key.digest) != hashlib.sha256().digest_size:
+            raise ValueError(f"Bad sha256 digest for {key.identity!r}")
+        keys[key.digest] = key
+    return keys
+
+
+# (mtime_ns, size) of the keys file; None: there is no file.
+FileState = tuple[int, int] | None
+
+# Matches no file state.
+_NEVER: FileState = (-1, -1)
+# The file exists but could not be stat()ed.
+_UNKNOWN: FileState = (-2, -2)
+
+
+def _file_state(path: Path) -> FileState:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class KeyRegistry:
+    def __init__(
+        self,
+        *,
+        static: dict[bytes, ApiKey],
+        path: str = "",
+        reload_s: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._static = static
+        self._path = Path(path) if path else None
+        self._reload_s = reload_s
+        self._clock = clock
+        self._keys = dict(static)
+        self._file_state: FileState = _NEVER
+        # State of the last file that failed to load: logged once, not retried until it changes.
+        self._failed_state: FileState = _NEVER
+        self._checked_at = -float("inf")
+        self.reloads = 0
+        self.reload_errors = 0
+        self._maybe_reload()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _maybe_reload(self) -> None:
+        now = self._clock()
+        if self._path is None or now - self._checked_at < self._reload_s:
+            return
+        self._checked_at = now
+        state: FileState = _UNKNOWN
+        try:
+            state = _file_state(self._path)
+            if state == self._file_state or state == self._failed_state:
+                return
+            # A deleted file revokes all its keys (API_KEY stays valid).
+            keys = {} if state is None else _load_file(self._path)
+        except (OSError, ValueError, KeyError, TypeError):
+            self.reload_errors += 1
+            if state != self._failed_state:
+                logger.exception("Could not load API keys from %s; keeping %d keys", self._path, len(self._keys))
+            self._failed_state = state
+            return
+        # One assignment: concurrent lookups see the old or the new dict, never a mix.
+        self._keys = {**keys, **self._static}
+        self._file_state = state
+        self._failed_state = _NEVER
+        self.reloads += 1
+
+    def lookup(self, key: str | None) -> ApiKey | None:
+        if not key:
+            return None
+        self._maybe_reload()
+        digest = hash_key(key)
+        found = self._keys.get(digest)
+        if found is None or not hmac.compare_digest(found.digest, digest):
+            return None
+        return found
+
+
+@lru_cache
+def get_key_registry() -> KeyRegistry:
+    settings = get_settings()
+    static = {}
+    if settings.api_key:
+        digest = hash_key(settings.api_key)
+        static[digest] = ApiKey(DEFAULT_IDENTITY, digest)
+    return KeyRegistry(static=static, path=settings.api_keys_file, reload_s=settings.api_keys_reload_s)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Issue an API key")
+    sub = parser.add_subparsers(dest="command", required=True)
+    issue = sub.add_parser("issue", help="Generate a key; print it and its keys-file entry")
+    issue.add_argument("identity")
+    hashed = sub.add_parser("hash", help="Print the keys-file entry for an existing key (read from stdin)")
+    hashed.add_argument("identity")
+    args = parser.parse_args()
+
+    if args.command == "issue":
+        key = secrets.token_urlsafe(32)
+        print(f"key:   {key}")
+    else:
+        key = sys.stdin.readline().strip()
+    print("entry:", orjson.dumps({"identity": args.identity, "sha256": hash_key(key).hex()}).decode())
+
+
+if __name__ == "__main__":
+    main()
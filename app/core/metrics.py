@@ -0,0 +1,303 @@
+"""Process metrics in the Prometheus text exposition format (no client library needed).
+
+- ``MetricsMiddleware``: request latency per route template, requests in flight, and
+  per request the number / time of DB queries and the time spent serializing bodies;
+- ``instrument_engine``: cursor execute events time every query of an engine;
+- ``serialization()``: timer around building a response body in the endpoints;
+- collectors: callables read at scrape time (pool, cache and single-flight stats).
+
+Metrics are per worker process; Prometheus aggregates the workers.
+"""
+from __future__ import annotations
+
+import bisect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50)
+
+# Label of requests that matched no route (keeps scanners from creating a series per path).
+UNMATCHED_ROUTE = "<unmatched>"
+# Other (made-up) methods are labelled "OTHER", for the same reason.
+_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+@dataclass(slots=True)
+class Family:
+    """A metric family produced by a collector at scrape time."""
+
+    name: str
+    kind: str  # "gauge" | "counter"
+    help: str
+    samples: list[tuple[dict[str, str], float]]
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for labels, value in self.samples:
+            yield f"{self.name}{_labels(tuple(labels), tuple(labels.values()))} {_number(value)}"
+
+
+@dataclass(slots=True)
+class Counter:
+    name: str
+    help: str
+    labelnames: tuple[str, ...] = ()
+    values: dict[tuple[str, ...], float] = field(default_factory=dict)
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in self.values.items():
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+
+
+@dataclass(slots=True)
+class Gauge:
+    name: str
+    help: str
+    value: float = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} gauge"
+        yield f"{self.name} {_number(self.value)}"
+
+
+@dataclass(slots=True)
+class _HistogramSeries:
+    # counts[i]: observations in (buckets[i-1], buckets[i]]; the last one is +Inf.
+    counts: list[int]
+    sum: float = 0.0
+    count: int = 0
+
+
+@dataclass(slots=True)
+class Histogram:
+    name: str
+    help: str
+    labelnames: tuple[str, ...] = ()
+    buckets: tuple[float, ...] = LATENCY_BUCKETS
+    series: dict[tuple[str, ...], _HistogramSeries] = field(default_factory=dict)
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = _HistogramSeries([0] * (len(self.buckets) + 1))
+        series.counts[bisect.bisect_left(self.buckets, value)] += 1
+        series.sum += value
+        series.count += 1
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, series in self.series.items():
+            cumulative = 0
+            for le, n in zip((*self.buckets, float("inf")), series.counts):
+                cumulative += n
+                le_label = f'le="{_number(le)}"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, le_label)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(series.sum)}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {series.count}"
+
+
+Collector = Callable[[], Iterable[Family]]
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: list[Counter | Gauge | Histogram] = []
+        self._collectors: list[Collector] = []
+
+    def register(self, metric: Any) -> Any:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Collector) -> Collector:
+        self._collectors.append(collector)
+        return collector
+
+    def render(self) -> bytes:
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for family in collector():
+                lines.extend(family.render())
+        return ("\n".join(lines) + "\n").encode()
+
+
+registry = Registry()
+
+REQUEST_SECONDS = registry.register(
+    Histogram(
+        "http_request_duration_seconds", "Request latency until the last body byte.", ("method", "route", "status")
+    )
+)
+REQUESTS_IN_FLIGHT = registry.register(Gauge("http_requests_in_flight", "Requests being handled."))
+REQUEST_DB_QUERIES = registry.register(
+    Histogram("http_request_db_queries", "DB queries per request.", ("route",), COUNT_BUCKETS)
+)
+REQUEST_DB_SECONDS = registry.register(
+    Histogram("http_request_db_seconds", "Time in DB queries per request.", ("route",), QUERY_BUCKETS)
+)
+REQUEST_SERIALIZE_SECONDS = registry.register(
+    Histogram(
+        "http_request_serialize_seconds", "Time building response bodies per request.", ("route",), QUERY_BUCKETS
+    )
+)
+REQUESTS_BY_KEY = registry.register(
+    Counter("http_requests_by_api_key_total", "Authenticated requests per API key identity.", ("identity",))
+)
+REQUESTS_REJECTED = registry.register(
+    Counter("http_requests_rejected_total", "Requests refused by admission control.", ("status", "identity"))
+)
+DB_QUERY_SECONDS = registry.register(
+    Histogram("db_query_duration_seconds", "Duration of single DB queries.", ("operation",), QUERY_BUCKETS)
+)
+DB_QUERY_ERRORS = registry.register(Counter("db_query_errors_total", "DB queries that raised.", ("operation",)))
+
+
+@dataclass(slots=True)
+class RequestTimings:
+    queries: int = 0
+    db_s: float = 0.0
+    serialize_s: float = 0.0
+
+
+# Set by the middleware; the engine events and serialization() add to it.
+_request_timings: ContextVar[RequestTimings | None] = ContextVar("request_timings", default=None)
+
+
+def current_timings() -> RequestTimings | None:
+    return _request_timings.get()
+
+
+@contextmanager
+def serialization() -> Iterator[None]:
+    """Times building a response body (row -> dict conversion and JSON encoding)."""
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.serialize_s += time.perf_counter() - started
+
+
+def _operation(statement: str) -> str:
+    word = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return word if word in ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH") else "OTHER"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - context._metrics_started
+    DB_QUERY_SECONDS.observe(elapsed, _operation(statement))
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.queries += 1
+        timings.db_s += elapsed
+
+
+def _handle_error(exception_context) -> None:
+    DB_QUERY_ERRORS.inc(_operation(exception_context.statement or ""))
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Times every query of ``engine`` (the events run in the caller's context, so per request too)."""
+
+    sync_engine = engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+def _route(scope: dict) -> str:
+    # FastAPI puts the matched route into the scope; its path is the template ("/organizations/{org_id}").
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (BaseHTTPMiddleware would add a task and a body copy per request)."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: dict) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        timings = RequestTimings()
+        token = _request_timings.set(timings)
+        REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            REQUESTS_IN_FLIGHT.dec()
+            _request_timings.reset(token)
+            route = _route(scope)
+            method = scope["method"] if scope["method"] in _METHODS else "OTHER"
+            REQUEST_SECONDS.observe(elapsed, method, route, str(status_code))
+            REQUEST_DB_QUERIES.observe(timings.queries, route)
+            if timings.queries:
+                REQUEST_DB_SECONDS.observe(timings.db_s, route)
+            if timings.serialize_s:
+                REQUEST_SERIALIZE_SECONDS.observe(timings.serialize_s, route)
+            # Set by verify_api_key (request.state lives in the scope).
+            identity = scope.get("state", {}).get("api_key_identity")
+            if identity is not None:
+                REQUESTS_BY_KEY.inc(identity)
@@ -0,0 +1,271 @@
+"""Opt-in profiling of single requests (``X-Profile: 1`` plus the admin key).
+
+A sampler thread takes the event loop thread's stack every ``profiling_interval_ms``
+and keeps the samples whose stack passes through the profiled request's middleware
+frame, so concurrent requests do not leak into the report. Samples are weighted by
+the time since the previous one (the sampler only gets the GIL at switch intervals
+while the loop is busy) and rendered as folded stacks ("a;b;c <microseconds>"),
+which flamegraph.pl, speedscope and inferno read. Time spent waiting on I/O is not
+sampled: the SQL log (engine events) shows where it went.
+
+Not covered: work done in other tasks, e.g. the body of a streaming response.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import secrets
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from types import FrameType
+from typing import Any
+
+import orjson
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import get_settings
+from app.core.security import is_admin_key
+
+
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+# Statement parameters are cut to this many characters in the SQL log.
+_MAX_PARAMS_CHARS = 500
+
+
+@dataclass(slots=True)
+class SqlEntry:
+    statement: str
+    parameters: str
+    duration_ms: float
+    started_at_ms: float  # since the request started
+    executemany: bool
+
+
+@dataclass(slots=True)
+class Profile:
+    id: str
+    method: str
+    path: str
+    query: str
+    started_at: str
+    interval_ms: float
+    status: int = 0
+    wall_ms: float = 0.0
+    sampled_ms: float = 0.0
+    samples: int = 0
+    sql: list[SqlEntry] = field(default_factory=list)
+    folded: str = ""
+    _started: float = field(default_factory=time.perf_counter, repr=False)
+
+    @property
+    def sql_ms(self) -> float:
+        return sum(q.duration_ms for q in self.sql)
+
+    def report(self) -> dict[str, Any]:
+        data = asdict(self)
+        del data["_started"]
+        data["sql_ms"] = self.sql_ms
+        data["sql_count"] = len(self.sql)
+        return data
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    for marker in ("site-packages/", "/app/"):
+        _, found, rest = filename.rpartition(marker)
+        if found:
+            filename = ("app/" if marker == "/app/" else "") + rest
+            break
+    # ";" separates frames in the folded format.
+    return f"{code.co_qualname} ({filename}:{code.co_firstlineno})".replace(";", ",")
+
+
+class Sampler:
+    """Samples the stack of ``thread_id`` above ``root`` (a frame of the profiled request)."""
+
+    def __init__(self, root: FrameType, *, interval_s: float) -> None:
+        self.root = root
+        self.interval_s = interval_s
+        self.thread_id = threading.get_ident()
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self.sampled_s = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def _stack(self) -> str | None:
+        frame = sys._current_frames().get(self.thread_id)
+        labels = []
+        while frame is not None:
+            if frame is self.root:
+                labels.append(_frame_label(frame))
+                return ";".join(reversed(labels))
+            labels.append(_frame_label(frame))
+            frame = frame.f_back
+        return None  # the loop is idle or running another request
+
+    def _run(self) -> None:
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval_s):
+            now = time.perf_counter()
+            stack = self._stack()
+            if stack is not None:
+                self.stacks[stack] += max(1, round((now - last) * 1e6))
+                self.samples += 1
+                self.sampled_s += now - last
+            last = now
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {weight}\n" for stack, weight in self.stacks.most_common())
+
+
+class ProfileStore:
+    """The last ``keep`` reports of this worker, plus an optional directory (shared by workers)."""
+
+    def __init__(self, *, keep: int, directory: str = "") -> None:
+        self._reports: OrderedDict[str, Profile] = OrderedDict()
+        self._keep = keep
+        self._directory = Path(directory) if directory else None
+
+    async def add(self, profile: Profile) -> None:
+        self._reports[profile.id] = profile
+        while len(self._reports) > self._keep:
+            self._reports.popitem(last=False)
+        if self._directory is not None:
+            # File writes off the event loop; the in-memory part above stays on it.
+            await asyncio.to_thread(self._write, profile)
+
+    def _write(self, profile: Profile) -> None:
+        self._directory.mkdir(parents=True, exist_ok=True)
+        (self._directory / f"{profile.id}.json").write_bytes(orjson.dumps(profile.report()))
+        (self._directory / f"{profile.id}.folded").write_text(profile.folded)
+
+    def get(self, profile_id: str) -> dict[str, Any] | None:
+        profile = self._reports.get(profile_id)
+        if profile is not None:
+            return profile.report()
+        if self._directory is None:
+            return None
+        # Reports of other workers (ids are plain file names).
+        path = self._directory / f"{os.path.basename(profile_id)}.json"
+        return orjson.loads(path.read_bytes()) if path.is_file() else None
+
+    def list(self) -> list[dict[str, Any]]:
+        return [
+            {"id": p.id, "method": p.method, "path": p.path, "status": p.status, "wall_ms": p.wall_ms}
+            for p in reversed(self._reports.values())
+        ]
+
+
+@lru_cache
+def get_profile_store() -> ProfileStore:
+    settings = get_settings()
+    return ProfileStore(keep=settings.profiling_keep, directory=settings.profiling_dir)
+
+
+# Set while a profiled request runs; the engine events append to its SQL log.
+_active_profile: ContextVar[Profile | None] = ContextVar("active_profile", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _active_profile.get() is not None:
+        context._profile_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    profile = _active_profile.get()
+    started = getattr(context, "_profile_started", None)
+    if profile is None or started is None:
+        return
+    profile.sql.append(
+        SqlEntry(
+            statement=statement,
+            parameters=repr(parameters)[:_MAX_PARAMS_CHARS],
+            duration_ms=(time.perf_counter() - started) * 1000,
+            started_at_ms=(started - profile._started) * 1000,
+            executemany=executemany,
+        )
+    )
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    sync_engine = engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _header(scope: dict, name: bytes) -> str | None:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class ProfilingMiddleware:
+    """Profiles requests sent with ``X-Profile: 1`` and a valid ``X-Admin-Key``.
+
+    Other requests, including ones asking for a profile without the admin key, are
+    served as usual and not profiled.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if (
+            scope["type"] != "http"
+            or _header(scope, PROFILE_HEADER.encode()) != "1"
+            or not is_admin_key(_header(scope, b"x-admin-key"))
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        settings = get_settings()
+        profile = Profile(
+            id=f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{secrets.token_hex(4)}",
+            method=scope["method"],
+            path=scope["path"],
+            query=scope.get("query_string", b"").decode("latin-1"),
+            started_at=datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            interval_ms=settings.profiling_interval_ms,
+        )
+
+        async def send_with_id(message: dict) -> None:
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                headers = [*message.get("headers", ()), (PROFILE_ID_HEADER.lower().encode(), profile.id.encode())]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        sampler = Sampler(sys._getframe(), interval_s=settings.profiling_interval_ms / 1000)
+        token = _active_profile.set(profile)
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            # stop() joins the sampler thread (up to one interval): not on the event loop.
+            await asyncio.to_thread(sampler.stop)
+            _active_profile.reset(token)
+            profile.wall_ms = (time.perf_counter() - profile._started) * 1000
+            profile.sampled_ms = sampler.sampled_s * 1000
+            profile.samples = sampler.samples
+            profile.folded = sampler.folded()
+            await get_profile_store().add(profile)
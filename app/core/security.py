@@ -2,21 +2,42 @@ from __future__ import annotations
 
 import secrets
 
-from fastapi import Header, HTTPException, status
+from fastapi import Header, HTTPException, Request, status
 
+from app.core.api_keys import ApiKey, get_key_registry
 from app.core.config import get_settings
 
 
-def verify_api_key(x_api_key: str | None = Header(default=None, alias="X-API-Key")) -> None:
-    """Static API key auth.
+async def verify_api_key(request: Request, x_api_key: str | None = Header(default=None, alias="X-API-Key")) -> ApiKey:
+    """API key auth against the key registry (app/core/api_keys.py).
 
-    Client must send header: X-API-Key: <key>
+    Client must send header: X-API-Key: <key>. The key's identity is put on
+    ``request.state.api_key_identity`` (rate limits, metrics).
+    Async, so the check runs on the event loop instead of a threadpool hop.
     """
 
-    settings = get_settings()
-    expected = settings.api_key
-    if not x_api_key or not secrets.compare_digest(x_api_key, expected):
+    api_key = get_key_registry().lookup(x_api_key)
+    if api_key is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid API key",
         )
+    request.state.api_key_identity = api_key.identity
+    return api_key
+
+
+def is_admin_key(value: str | None) -> bool:
+    """Whether ``value`` is the admin key (never true while ``admin_api_key`` is unset)."""
+
+    expected = get_settings().admin_api_key
+    return bool(expected and value and secrets.compare_digest(value, expected))
+
+
+def verify_admin_key(x_admin_key: str | None = Header(default=None, alias="X-Admin-Key")) -> None:
+    """Admin-only endpoints (profiling reports): header X-Admin-Key: <admin key>."""
+
+    if not is_admin_key(x_admin_key):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid admin key",
+        )
@@ -0,0 +1,658 @@
+"""Bulk import of directory dumps (CSV or NDJSON) through COPY and set-based upserts.
+
+Input is read as a stream and parsed in batches. Each batch is loaded into a
+temporary staging table with COPY (asyncpg ``copy_records_to_table``), and the
+staged rows are merged into the real tables with a few INSERT ... ON CONFLICT
+statements, so the cost per row is that of COPY plus index maintenance. Rows
+keep their ids, and a later record with the same id wins. An import runs in
+one transaction: it applies fully or not at all.
+
+Kinds and fields (CSV: a header row with these names; empty value = NULL):
+
+- ``buildings``: id, address, latitude, longitude
+- ``activities``: id, name, parent_id
+- ``organizations``: id, name, building_id; NDJSON records may also carry
+  ``phones`` (list of strings) and ``activity_ids`` (list of ids)
+- ``phones``: organization_id, phone
+- ``organization_activities``: organization_id, activity_id
+
+Phones and activity links are added; existing ones are kept. References must
+exist in the database or in the same import, otherwise the import fails and
+names the first offending ids.
+
+Activities are inserted level by level (roots of the imported tree first),
+because the ``set_activity_level`` trigger reads the parent's level and the
+closure trigger the parent's ancestors, whatever order the dump has.
+
+    python -m app.db.bulk_import --buildings buildings.csv --activities activities.ndjson \\
+        --organizations organizations.ndjson.gz
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import gzip
+import logging
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Iterable, Literal
+
+import asyncpg
+import orjson
+
+from app.db.session import get_engine
+
+
+logger = logging.getLogger(__name__)
+
+Kind = Literal["buildings", "activities", "organizations", "phones", "organization_activities"]
+Format = Literal["csv", "ndjson"]
+
+# Dependency order: an import of several kinds runs them in this order.
+KINDS: tuple[Kind, ...] = ("buildings", "activities", "organizations", "phones", "organization_activities")
+
+DEFAULT_BATCH_SIZE = 50_000
+
+# Reported offending ids per error.
+_EXAMPLES = 5
+
+
+class BulkImportError(Exception):
+    """Invalid input or references; the import was rolled back."""
+
+
+def _int(value: Any) -> int:
+    if isinstance(value, bool):
+        raise ValueError("expected an integer")
+    return int(value)
+
+
+def _float(value: Any) -> float:
+    if isinstance(value, bool):
+        raise ValueError("expected a number")
+    return float(value)
+
+
+def _str(value: Any) -> str:
+    if not isinstance(value, str):
+        raise ValueError("expected a string")
+    if "\x00" in value:
+        # Postgres text cannot hold NUL; COPY would fail with a driver error instead.
+        raise ValueError("contains a NUL character")
+    return value
+
+
+@dataclass(frozen=True, slots=True)
+class _Table:
+    """A staging table: fields parsed from the input plus the record number (``line``)."""
+
+    name: str
+    fields: tuple[tuple[str, Callable[[Any], Any], bool], ...]  # (name, parse, nullable)
+    sql_types: tuple[str, ...]
+
+    @property
+    def columns(self) -> tuple[str, ...]:
+        return (*(f[0] for f in self.fields), "line")
+
+    def create_sql(self) -> str:
+        cols = ", ".join(f"{name} {sql_type}" for name, sql_type in zip(self.columns, (*self.sql_types, "bigint")))
+        return f"CREATE TEMP TABLE {self.name} ({cols}) ON COMMIT DROP"
+
+
+_BUILDINGS = _Table(
+    "import_buildings",
+    (("id", _int, False), ("address", _str, False), ("latitude", _float, False), ("longitude", _float, False)),
+    ("integer", "text", "double precision", "double precision"),
+)
+_ACTIVITIES = _Table(
+    "import_activities",
+    (("id", _int, False), ("name", _str, False), ("parent_id", _int, True)),
+    ("integer", "text", "integer"),
+)
+_ORGANIZATIONS = _Table(
+    "import_organizations",
+    (("id", _int, False), ("name", _str, False), ("building_id", _int, False)),
+    ("integer", "text", "integer"),
+)
+_PHONES = _Table(
+    "import_phones",
+    (("organization_id", _int, False), ("phone", _str, False)),
+    ("integer", "text"),
+)
+_LINKS = _Table(
+    "import_organization_activities",
+    (("organization_id", _int, False), ("activity_id", _int, False)),
+    ("integer", "integer"),
+)
+
+_TABLES: dict[Kind, _Table] = {
+    "buildings": _BUILDINGS,
+    "activities": _ACTIVITIES,
+    "organizations": _ORGANIZATIONS,
+    "phones": _PHONES,
+    "organization_activities": _LINKS,
+}
+
+_DROP_STAGING = f"DROP TABLE IF EXISTS {', '.join(t.name for t in _TABLES.values())}, import_activity_waves"
+
+
+@dataclass(slots=True)
+class StageReport:
+    table: str
+    rows: int = 0  # distinct rows merged
+    inserted: int = 0
+    updated: int = 0
+    seconds: float = 0.0
+
+
+@dataclass(slots=True)
+class ImportReport:
+    records: int = 0
+    seconds: float = 0.0
+    stages: list[StageReport] = field(default_factory=list)
+
+    @property
+    def records_per_s(self) -> float:
+        return self.records / self.seconds if self.seconds else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "records": self.records,
+            "seconds": round(self.seconds, 3),
+            "records_per_s": round(self.records_per_s, 1),
+            "tables": [
+                {
+                    "table": s.table,
+                    "rows": s.rows,
+                    "inserted": s.inserted,
+                    "updated": s.updated,
+                    "unchanged": s.rows - s.inserted - s.updated,
+                    "seconds": round(s.seconds, 3),
+                }
+                for s in self.stages
+            ],
+        }
+
+
+# (kind, records read so far, seconds since the import started)
+Progress = Callable[[str, int, float], None]
+
+
+# --- Parsing -------------------------------------------------------------------------------------
+
+
+async def _line_batches(chunks: AsyncIterable[bytes]) -> AsyncIterator[list[str]]:
+    """Complete lines, a list per input chunk (fewer async steps than a line at a time)."""
+
+    tail = b""
+    number = 0
+    async for chunk in chunks:
+        *lines, tail = (tail + chunk).split(b"\n")
+        if lines:
+            yield [_decode(line, number + i) for i, line in enumerate(lines, 1)]
+            number += len(lines)
+    if tail.strip():
+        yield [_decode(tail, number + 1)]
+
+
+def _decode(line: bytes, number: int) -> str:
+    try:
+        return line.decode("utf-8").rstrip("\r")
+    except UnicodeDecodeError as e:
+        raise BulkImportError(f"line {number}: not valid UTF-8: {e.reason} at byte {e.start}") from e
+
+
+async def _ndjson_records(chunks: AsyncIterable[bytes]) -> AsyncIterator[list[dict[str, Any]]]:
+    number = 0
+    async for lines in _line_batches(chunks):
+        records = []
+        for line in lines:
+            number += 1
+            if not line.strip():
+                continue
+            try:
+                record = orjson.loads(line)
+            except orjson.JSONDecodeError as e:
+                raise BulkImportError(f"record {number}: invalid JSON: {e}") from e
+            if not isinstance(record, dict):
+                raise BulkImportError(f"record {number}: expected a JSON object")
+            records.append(record)
+        yield records
+
+
+async def _csv_records(chunks: AsyncIterable[bytes]) -> AsyncIterator[list[dict[str, Any]]]:
+    header: list[str] | None = None
+    number = 0
+    pending = ""  # a record whose quoted field spans lines
+    async for lines in _line_batches(chunks):
+        complete = []
+        for line in lines:
+            pending = f"{pending}\n{line}" if pending else line
+            if pending.count('"') % 2 == 0:
+                complete.append(pending)
+                pending = ""
+        records = []
+        reader = csv.reader(complete)
+        while True:
+            try:
+                row = next(reader, None)
+            except csv.Error as e:
+                raise BulkImportError(f"record {number + 1}: invalid CSV: {e}") from e
+            if row is None:
+                break
+            if not row:
+                continue
+            if header is None:
+                header = [name.strip() for name in row]
+                continue
+            number += 1
+            records.append({name: value if value != "" else None for name, value in zip(header, row)})
+        yield records
+    if pending:
+        raise BulkImportError("unterminated quoted field at the end of the CSV input")
+
+
+def _row(table: _Table, record: dict[str, Any], number: int) -> tuple:
+    values = []
+    for name, parse, nullable in table.fields:
+        value = record.get(name)
+        if value is None:
+            if not nullable:
+                raise BulkImportError(f"record {number}: {name} is required")
+            values.append(None)
+            continue
+        try:
+            values.append(parse(value))
+        except (TypeError, ValueError) as e:
+            raise BulkImportError(f"record {number}: bad {name} {value!r}: {e}") from e
+    values.append(number)
+    return tuple(values)
+
+
+def _nested(record: dict[str, Any], name: str, parse: Callable[[Any], Any], number: int) -> list:
+    values = record.get(name) or []
+    if not isinstance(values, list):
+        raise BulkImportError(f"record {number}: {name} must be a list")
+    try:
+        return [parse(v) for v in values]
+    except (TypeError, ValueError) as e:
+        raise BulkImportError(f"record {number}: bad {name}: {e}") from e
+
+
+# --- Staging and merging -------------------------------------------------------------------------
+
+
+async def _copy(conn: asyncpg.Connection, table: _Table, rows: list[tuple]) -> None:
+    if rows:
+        await conn.copy_records_to_table(table.name, records=rows, columns=table.columns)
+
+
+async def _check_missing(conn: asyncpg.Connection, sql: str, message: str) -> None:
+    missing = await conn.fetch(f"{sql} LIMIT {_EXAMPLES}")
+    if missing:
+        raise BulkImportError(f"{message}: {', '.join(str(r[0]) for r in missing)}")
+
+
+async def _merge(conn: asyncpg.Connection, table: str, sql: str, *args: Any) -> StageReport:
+    """Runs an ``INSERT ... RETURNING (xmax = 0)`` and counts inserted / updated rows."""
+
+    started = time.perf_counter()
+    counts = await conn.fetchrow(
+        f"WITH merged AS ({sql}) SELECT count(*) FILTER (WHERE inserted) AS inserted, count(*) AS changed FROM merged",
+        *args,
+    )
+    return StageReport(
+        table=table, inserted=counts["inserted"], updated=counts["changed"] - counts["inserted"],
+        seconds=time.perf_counter() - started,
+    )
+
+
+async def _sync_sequence(conn: asyncpg.Connection, table: str) -> None:
+    # Imported rows keep their ids; later inserts through the API must not reuse them.
+    await conn.execute(
+        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), GREATEST((SELECT max(id) FROM {table}), 1))"
+    )
+
+
+async def _merge_buildings(conn: asyncpg.Connection) -> list[StageReport]:
+    rows = await conn.fetchval("SELECT count(DISTINCT id) FROM import_buildings")
+    report = await _merge(
+        conn,
+        "buildings",
+        """
+        INSERT INTO buildings (id, address, latitude, longitude)
+        SELECT DISTINCT ON (id) id, address, latitude, longitude FROM import_buildings ORDER BY id, line DESC
+        ON CONFLICT (id) DO UPDATE
+        SET address = EXCLUDED.address, latitude = EXCLUDED.latitude, longitude = EXCLUDED.longitude
+        WHERE (buildings.address, buildings.latitude, buildings.longitude)
+            IS DISTINCT FROM (EXCLUDED.address, EXCLUDED.latitude, EXCLUDED.longitude)
+        RETURNING (xmax = 0) AS inserted
+        """,
+    )
+    report.rows = rows
+    await _sync_sequence(conn, "buildings")
+    return [report]
+
+
+async def _merge_activities(conn: asyncpg.Connection) -> list[StageReport]:
+    await conn.execute(
+        """
+        CREATE TEMP TABLE import_activity_waves ON COMMIT DROP AS
+        WITH RECURSIVE latest AS (
+            SELECT DISTINCT ON (id) id, name, parent_id FROM import_activities ORDER BY id, line DESC
+        ),
+        waves AS (
+            -- Wave 1: roots, and children of activities that are already in the database.
+            SELECT l.id, 1 AS wave FROM latest l
+            WHERE l.parent_id IS NULL OR NOT EXISTS (SELECT 1 FROM latest p WHERE p.id = l.parent_id)
+            UNION ALL
+            SELECT l.id, w.wave + 1 FROM latest l JOIN waves w ON l.parent_id = w.id
+            WHERE w.wave < 16
+        )
+        SELECT l.id, l.name, l.parent_id, w.wave FROM latest l JOIN waves w USING (id)
+        """
+    )
+    await _check_missing(
+        conn,
+        """
+        SELECT DISTINCT w.parent_id FROM import_activity_waves w
+        WHERE w.wave = 1 AND w.parent_id IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM activities a WHERE a.id = w.parent_id)
+        """,
+        "activities reference missing parent_id",
+    )
+    await _check_missing(
+        conn,
+        """
+        SELECT DISTINCT i.id FROM import_activities i
+        WHERE NOT EXISTS (SELECT 1 FROM import_activity_waves w WHERE w.id = i.id)
+        """,
+        "activities form a cycle (or are nested deeper than any valid tree)",
+    )
+
+    report = StageReport(table="activities")
+    report.rows = await conn.fetchval("SELECT count(*) FROM import_activity_waves")
+    waves = await conn.fetchval("SELECT max(wave) FROM import_activity_waves") or 0
+    for wave in range(1, waves + 1):
+        # One statement per level: the triggers see the parents inserted by the previous one.
+        step = await _merge(
+            conn,
+            "activities",
+            """
+            INSERT INTO activities (id, name, parent_id)
+            SELECT id, name, parent_id FROM import_activity_waves WHERE wave = $1
+            ON CONFLICT (id) DO UPDATE
+            SET name = EXCLUDED.name, parent_id = EXCLUDED.parent_id
+            WHERE (activities.name, activities.parent_id) IS DISTINCT FROM (EXCLUDED.name, EXCLUDED.parent_id)
+            RETURNING (xmax = 0) AS inserted
+            """,
+            wave,
+        )
+        report.inserted += step.inserted
+        report.updated += step.updated
+        report.seconds += step.seconds
+    await _sync_sequence(conn, "activities")
+    return [report]
+
+
+async def _merge_organizations(conn: asyncpg.Connection) -> list[StageReport]:
+    await _check_missing(
+        conn,
+        """
+        SELECT DISTINCT i.building_id FROM import_organizations i
+        WHERE NOT EXISTS (SELECT 1 FROM buildings b WHERE b.id = i.building_id)
+        """,
+        "organizations reference missing building_id",
+    )
+    rows = await conn.fetchval("SELECT count(DISTINCT id) FROM import_organizations")
+    report = await _merge(
+        conn,
+        "organizations",
+        """
+        INSERT INTO organizations (id, name, building_id)
+        SELECT DISTINCT ON (id) id, name, building_id FROM import_organizations ORDER BY id, line DESC
+        ON CONFLICT (id) DO UPDATE
+        SET name = EXCLUDED.name, building_id = EXCLUDED.building_id
+        WHERE (organizations.name, organizations.building_id) IS DISTINCT FROM (EXCLUDED.name, EXCLUDED.building_id)
+        RETURNING (xmax = 0) AS inserted
+        """,
+    )
+    report.rows = rows
+    await _sync_sequence(conn, "organizations")
+    return [report]
+
+
+async def _merge_phones(conn: asyncpg.Connection) -> list[StageReport]:
+    await _check_missing(
+        conn,
+        """
+        SELECT DISTINCT i.organization_id FROM import_phones i
+        WHERE NOT EXISTS (SELECT 1 FROM organizations o WHERE o.id = i.organization_id)
+        """,
+        "phones reference missing organization_id",
+    )
+    rows = await conn.fetchval("SELECT count(*) FROM (SELECT DISTINCT organization_id, phone FROM import_phones) p")
+    report = await _merge(
+        conn,
+        "organization_phones",
+        """
+        INSERT INTO organization_phones (organization_id, phone)
+        SELECT DISTINCT organization_id, phone FROM import_phones
+        ON CONFLICT ON CONSTRAINT uq_org_phone DO NOTHING
+        RETURNING true AS inserted
+        """,
+    )
+    report.rows = rows
+    return [report]
+
+
+async def _merge_links(conn: asyncpg.Connection) -> list[StageReport]:
+    await _check_missing(
+        conn,
+        """
+        SELECT DISTINCT i.organization_id FROM import_organization_activities i
+        WHERE NOT EXISTS (SELECT 1 FROM organizations o WHERE o.id = i.organization_id)
+        """,
+        "organization activities reference missing organization_id",
+    )
+    await _check_missing(
+        conn,
+        """
+        SELECT DISTINCT i.activity_id FROM import_organization_activities i
+        WHERE NOT EXISTS (SELECT 1 FROM activities a WHERE a.id = i.activity_id)
+        """,
+        "organization activities reference missing activity_id",
+    )
+    rows = await conn.fetchval(
+        "SELECT count(*) FROM (SELECT DISTINCT organization_id, activity_id FROM import_organization_activities) l"
+    )
+    report = await _merge(
+        conn,
+        "organization_activity",
+        """
+        INSERT INTO organization_activity (organization_id, activity_id)
+        SELECT DISTINCT organization_id, activity_id FROM import_organization_activities
+        ON CONFLICT DO NOTHING
+        RETURNING true AS inserted
+        """,
+    )
+    report.rows = rows
+    return [report]
+
+
+# --- Pipeline ------------------------------------------------------------------------------------
+
+
+@dataclass(slots=True)
+class Source:
+    kind: Kind
+    chunks: AsyncIterable[bytes]
+    format: Format
+
+
+async def _stage(
+    conn: asyncpg.Connection, source: Source, *, batch_size: int, progress: Progress, started: float, offset: int
+) -> int:
+    table = _TABLES[source.kind]
+    records = _csv_records(source.chunks) if source.format == "csv" else _ndjson_records(source.chunks)
+    nested = source.kind == "organizations" and source.format == "ndjson"
+    rows: list[tuple] = []
+    phones: list[tuple] = []
+    links: list[tuple] = []
+    number = 0
+
+    async def flush() -> None:
+        await _copy(conn, table, rows)
+        await _copy(conn, _PHONES, phones)
+        await _copy(conn, _LINKS, links)
+        rows.clear()
+        phones.clear()
+        links.clear()
+        progress(source.kind, offset + number, time.perf_counter() - started)
+
+    async for batch in records:
+        for record in batch:
+            number += 1
+            row = _row(table, record, number)
+            rows.append(row)
+            if nested:
+                org_id = row[0]
+                phones.extend((org_id, phone, number) for phone in _nested(record, "phones", _str, number))
+                links.extend((org_id, a, number) for a in _nested(record, "activity_ids", _int, number))
+        if len(rows) >= batch_size:
+            await flush()
+    await flush()
+    return number
+
+
+_MERGES: dict[Kind, Callable[[asyncpg.Connection], Any]] = {
+    "buildings": _merge_buildings,
+    "activities": _merge_activities,
+    "organizations": _merge_organizations,
+    "phones": _merge_phones,
+    "organization_activities": _merge_links,
+}
+
+
+def _log_progress(kind: str, records: int, elapsed_s: float) -> None:
+    logger.info("import %s: %d records staged, %.0f records/s", kind, records, records / elapsed_s if elapsed_s else 0)
+
+
+async def import_sources(
+    conn: asyncpg.Connection,
+    sources: Iterable[Source],
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    progress: Progress = _log_progress,
+    analyze: bool = True,
+) -> ImportReport:
+    """Imports ``sources`` (in dependency order) in one transaction on an asyncpg connection."""
+
+    by_kind = {source.kind: source for source in sources}
+    report = ImportReport()
+    started = time.perf_counter()
+    try:
+        async with conn.transaction():
+            for table in _TABLES.values():
+                await conn.execute(table.create_sql())
+            # Nested phones / activity ids of organizations are merged with the flat inputs.
+            merges: list[Kind] = []
+            for kind in KINDS:
+                if kind in by_kind:
+                    report.records += await _stage(
+                        conn, by_kind[kind], batch_size=batch_size, progress=progress, started=started,
+                        offset=report.records,
+                    )
+                    merges.append(kind)
+            if "organizations" in merges:
+                merges += [kind for kind in ("phones", "organization_activities") if kind not in merges]
+            for kind in KINDS:
+                if kind in merges:
+                    stages = await _MERGES[kind](conn)
+                    report.stages.extend(stages)
+                    for stage in stages:
+                        progress(f"{stage.table} merged", report.records, time.perf_counter() - started)
+            # ON COMMIT DROP only fires at the outermost commit (a caller's transaction may wrap this one).
+            await conn.execute(_DROP_STAGING)
+            if analyze:
+                for stage in report.stages:
+                    await conn.execute(f"ANALYZE {stage.table}")
+    except asyncpg.PostgresError as e:
+        # Constraint violations, too long values, the activity depth limit...
+        raise BulkImportError(f"{type(e).__name__}: {e}") from e
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+async def import_with_engine(sources: Iterable[Source], **kwargs: Any) -> ImportReport:
+    """Runs ``import_sources`` on a connection of the app's engine."""
+
+    async with get_engine().connect() as conn:
+        raw = await conn.get_raw_connection()
+        report = await import_sources(raw.driver_connection, sources, **kwargs)
+        # The transaction was committed on the driver connection; nothing to do on the SQLAlchemy side.
+        await conn.rollback()
+        return report
+
+
+# --- CLI -----------------------------------------------------------------------------------------
+
+
+def detect_format(path: str) -> Format:
+    name = path.removesuffix(".gz")
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    raise SystemExit(f"Cannot tell the format of {path}: use .csv or .ndjson / .jsonl (optionally .gz)")
+
+
+async def file_chunks(path: str, chunk_size: int = 1 << 20) -> AsyncIterator[bytes]:
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(Path(path), "rb") as f:
+        while chunk := f.read(chunk_size):
+            yield chunk
+            await asyncio.sleep(0)
+
+
+def main() -> None:
+    from app.db.session import dispose_engine
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    for kind in KINDS:
+        parser.add_argument(f"--{kind.replace('_', '-')}", dest=kind, metavar="FILE")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Records per COPY")
+    parser.add_argument("--no-analyze", action="store_true", help="Skip ANALYZE of the imported tables")
+    args = parser.parse_args()
+
+    sources = [
+        Source(kind, file_chunks(path), detect_format(path))
+        for kind in KINDS
+        if (path := getattr(args, kind)) is not None
+    ]
+    if not sources:
+        parser.error("nothing to import")
+
+    def progress(kind: str, records: int, elapsed_s: float) -> None:
+        rate = records / elapsed_s if elapsed_s else 0
+        print(f"[{elapsed_s:7.1f}s] {kind}: {records} records ({rate:,.0f}/s)", flush=True)
+
+    async def run() -> ImportReport:
+        try:
+            return await import_with_engine(
+                sources, batch_size=args.batch_size, progress=progress, analyze=not args.no_analyze
+            )
+        finally:
+            await dispose_engine()
+
+    try:
+        report = asyncio.run(run())
+    except BulkImportError as e:
+        raise SystemExit(f"Import failed, nothing was changed: {e}") from e
+    print(orjson.dumps(report.as_dict(), option=orjson.OPT_INDENT_2).decode())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+# Extensions are installed by migrations, so the answer is stable for the process lifetime.
+_installed: dict[str, bool] = {}
+
+_EXTENSION_STMT = text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = :name)")
+
+
+async def has_extension(session: AsyncSession, name: str) -> bool:
+    """Whether a Postgres extension is installed (checked once per process)."""
+
+    installed = _installed.get(name)
+    if installed is None:
+        res = await session.execute(_EXTENSION_STMT, {"name": name})
+        installed = _installed[name] = bool(res.scalar_one())
+    return installed
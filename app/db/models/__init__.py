@@ -1,5 +1,6 @@
-from app.db.models.activity import Activity
+from app.db.models.activity import Activity, activity_closure
 from app.db.models.building import Building
+from app.db.models.data_version import data_versions
 from app.db.models.organization import Organization, OrganizationPhone, organization_activity
 
 __all__ = [
@@ -7,5 +8,7 @@ __all__ = [
     "Building",
     "Organization",
     "OrganizationPhone",
+    "activity_closure",
+    "data_versions",
     "organization_activity",
 ]
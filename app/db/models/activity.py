@@ -1,11 +1,22 @@
 from __future__ import annotations
 
-from sqlalchemy import ForeignKey, Integer, SmallInteger, String, UniqueConstraint
+from sqlalchemy import Column, ForeignKey, Integer, SmallInteger, String, Table, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
 
 
+# Every (ancestor, descendant) pair of the tree, including (id, id, 0).
+# Maintained by the maintain_activity_closure() trigger (migration 0004).
+activity_closure = Table(
+    "activity_closure",
+    Base.metadata,
+    Column("ancestor_id", ForeignKey("activities.id", ondelete="CASCADE"), primary_key=True),
+    Column("descendant_id", ForeignKey("activities.id", ondelete="CASCADE"), primary_key=True, index=True),
+    Column("depth", SmallInteger, nullable=False),
+)
+
+
 class Activity(Base):
     __tablename__ = "activities"
 
@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from sqlalchemy import BigInteger, Column, String, Table
+
+from app.db.base import Base
+
+
+# One row per tracked table; bumped by the bump_data_version() statement trigger.
+data_versions = Table(
+    "data_versions",
+    Base.metadata,
+    Column("table_name", String(64), primary_key=True),
+    Column("version", BigInteger, nullable=False, server_default="0"),
+)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from sqlalchemy import Column, ForeignKey, Integer, String, Table, UniqueConstraint
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, Table, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -18,9 +18,9 @@ class Organization(Base):
     __tablename__ = "organizations"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    name: Mapped[str] = mapped_column(String(256), nullable=False, index=True)
+    name: Mapped[str] = mapped_column(String(256), nullable=False)
 
-    building_id: Mapped[int] = mapped_column(ForeignKey("buildings.id", ondelete="RESTRICT"), nullable=False, index=True)
+    building_id: Mapped[int] = mapped_column(ForeignKey("buildings.id", ondelete="RESTRICT"), nullable=False)
     building = relationship("Building", back_populates="organizations")
 
     phones = relationship("OrganizationPhone", back_populates="organization", cascade="all,delete-orphan")
@@ -31,6 +31,12 @@ class Organization(Base):
         back_populates="organizations",
     )
 
+    # Composite indexes match the keyset pagination orders (migration 0006)
+    __table_args__ = (
+        Index("ix_organizations_building_id_id", "building_id", "id"),
+        Index("ix_organizations_name_id", "name", "id"),
+    )
+
 
 class OrganizationPhone(Base):
     __tablename__ = "organization_phones"
@@ -0,0 +1,194 @@
+"""Read-replica routing for read-only sessions.
+
+Reads go to a replica picked by round-robin or least-connections. A replica that
+cannot be connected to, or lags more than ``replica_max_lag_s``, is ejected for
+``replica_recheck_s`` seconds; with no usable replica reads fall back to the primary.
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import math
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, AsyncContextManager, AsyncGenerator, AsyncIterator, Callable, Literal
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.core.config import get_settings
+from app.db.session import create_engine_for, get_sessionmaker
+
+
+logger = logging.getLogger(__name__)
+
+# Replay lag in seconds; 0 when the replica has replayed everything it received
+# (an idle primary does not advance the replay timestamp) and on a primary.
+_LAG_STMT = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+# Errors meaning "this replica is unusable right now" (refused / unreachable / timed out).
+_UNAVAILABLE = (OSError, DBAPIError, asyncio.TimeoutError)
+
+Balancing = Literal["round_robin", "least_connections"]
+
+# Session.info key of replica sessions: the replica's URL.
+REPLICA_INFO_KEY = "replica_url"
+
+
+@dataclass(slots=True, eq=False)
+class Replica:
+    url: str
+    engine: AsyncEngine
+    sessionmaker: async_sessionmaker[AsyncSession]
+    in_flight: int = 0
+    ejected_until: float = 0.0
+    lag_s: float = 0.0
+    lag_checked_at: float = -math.inf
+
+    @classmethod
+    def connect(cls, url: str, *, connect_timeout_s: float) -> Replica:
+        engine = create_engine_for(url, timeout=connect_timeout_s)
+        return cls(
+            url=url,
+            engine=engine,
+            sessionmaker=async_sessionmaker(
+                bind=engine, class_=AsyncSession, expire_on_commit=False, info={REPLICA_INFO_KEY: url}
+            ),
+        )
+
+
+@dataclass(slots=True, eq=False)
+class ReplicaRouter:
+    replicas: list[Replica]
+    balancing: Balancing = "round_robin"
+    max_lag_s: float | None = None
+    recheck_s: float = 5.0
+    clock: Callable[[], float] = time.monotonic
+    primary_fallbacks: int = 0
+    _rr: itertools.count = field(default_factory=itertools.count)
+
+    def _ordered(self) -> list[Replica]:
+        now = self.clock()
+        healthy = [r for r in self.replicas if r.ejected_until <= now]
+        if self.balancing == "least_connections":
+            return sorted(healthy, key=lambda r: r.in_flight)
+        if not healthy:
+            return healthy
+        start = next(self._rr) % len(healthy)
+        return healthy[start:] + healthy[:start]
+
+    def eject(self, replica: Replica, reason: str) -> None:
+        replica.ejected_until = self.clock() + self.recheck_s
+        logger.warning("Ejecting read replica %s for %.1fs: %s", _safe_url(replica.url), self.recheck_s, reason)
+
+    async def _lag_ok(self, replica: Replica, session: AsyncSession) -> bool:
+        if self.max_lag_s is None:
+            return True
+        now = self.clock()
+        if now - replica.lag_checked_at >= self.recheck_s:
+            replica.lag_s = float(await session.scalar(_LAG_STMT) or 0.0)
+            replica.lag_checked_at = now
+        return replica.lag_s <= self.max_lag_s
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[AsyncSession]:
+        """A session on the first usable replica, or on the primary."""
+
+        for replica in self._ordered():
+            session = replica.sessionmaker()
+            try:
+                # Connect now, so an unreachable replica is skipped before the request uses it.
+                await session.connection()
+                lag_ok = await self._lag_ok(replica, session)
+            except _UNAVAILABLE as e:
+                await session.close()
+                self.eject(replica, repr(e))
+                continue
+            if not lag_ok:
+                await session.close()
+                self.eject(replica, f"replication lag {replica.lag_s:.1f}s")
+                continue
+
+            replica.in_flight += 1
+            try:
+                async with session:
+                    yield session
+            finally:
+                replica.in_flight -= 1
+            return
+
+        self.primary_fallbacks += 1
+        async with get_sessionmaker()() as session:
+            yield session
+
+    def stats(self) -> dict[str, Any]:
+        now = self.clock()
+        return {
+            "primary_fallbacks": self.primary_fallbacks,
+            "replicas": [
+                {
+                    "url": _safe_url(r.url),
+                    "in_flight": r.in_flight,
+                    "ejected": r.ejected_until > now,
+                    "lag_s": r.lag_s,
+                }
+                for r in self.replicas
+            ],
+        }
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+def replica_url(session: AsyncSession) -> str | None:
+    """URL of the replica ``session`` reads from; None for a primary session."""
+
+    return session.info.get(REPLICA_INFO_KEY)
+
+
+def _safe_url(url: str) -> str:
+    return make_url(url).render_as_string(hide_password=True)
+
+
+@lru_cache
+def get_replica_router() -> ReplicaRouter | None:
+    settings = get_settings()
+    urls = [u.strip() for u in settings.database_replica_urls.split(",") if u.strip()]
+    if not urls:
+        return None
+    return ReplicaRouter(
+        [Replica.connect(url, connect_timeout_s=settings.replica_connect_timeout_s) for url in urls],
+        balancing=settings.replica_balancing,
+        max_lag_s=settings.replica_max_lag_s,
+        recheck_s=settings.replica_recheck_s,
+    )
+
+
+def read_session() -> AsyncContextManager[AsyncSession]:
+    """Session for read-only work: a replica when configured, otherwise the primary."""
+
+    router = get_replica_router()
+    if router is None:
+        return get_sessionmaker()()
+    return router.session()
+
+
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    async with read_session() as session:
+        yield session
+
+
+async def dispose_replicas() -> None:
+    router = get_replica_router()
+    if router is not None:
+        await router.dispose()
+    get_replica_router.cache_clear()
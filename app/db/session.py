@@ -1,13 +1,79 @@
 from __future__ import annotations
 
 import os
+import time
+from dataclasses import asdict, dataclass
 from functools import lru_cache
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator
 
+from sqlalchemy import exc
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
 from app.core.config import get_settings
+from app.core import metrics, profiling
+
+
+@dataclass(slots=True)
+class PoolStats:
+    checkouts: int = 0
+    # Time callers spent in pool.connect(): queueing for a free connection,
+    # opening a new one (overflow) and the pre-ping, if enabled.
+    total_wait_s: float = 0.0
+    max_wait_s: float = 0.0
+    timeouts: int = 0
+
+
+_pool_stats = PoolStats()
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records checkout wait time and timeouts."""
+
+    def connect(self) -> Any:
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            _pool_stats.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            _pool_stats.checkouts += 1
+            _pool_stats.total_wait_s += waited
+            _pool_stats.max_wait_s = max(_pool_stats.max_wait_s, waited)
+
+
+def create_engine_for(database_url: str, **connect_args: Any) -> AsyncEngine:
+    """Engine with the pool / liveness settings from Settings (shared by the primary and replicas)."""
+
+    settings = get_settings()
+    kwargs: dict = {
+        # Liveness: pre-ping costs a round trip per checkout; without it, rely on pool_recycle
+        # (and on retrying the request) to drop connections closed by the server.
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        # Cache of prepared statements per connection (0 disables it, e.g. behind pgbouncer).
+        "connect_args": {"prepared_statement_cache_size": settings.db_statement_cache_size, **connect_args},
+    }
+
+    # pytest sets PYTEST_CURRENT_TEST; plus a safety-net for DB names containing "test"
+    if os.getenv("PYTEST_CURRENT_TEST") or "test" in database_url.lower():
+        kwargs["poolclass"] = NullPool
+    else:
+        kwargs.update(
+            poolclass=InstrumentedPool,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout_s,
+            pool_recycle=settings.db_pool_recycle_s,
+        )
+
+    engine = create_async_engine(database_url, **kwargs)
+    if settings.metrics_enabled:
+        metrics.instrument_engine(engine)
+    if settings.profiling_enabled:
+        profiling.instrument_engine(engine)
+    return engine
 
 
 @lru_cache
@@ -17,14 +83,23 @@ def get_engine() -> AsyncEngine:
     Keep it lazy so tests / migrations can set DATABASE_URL before first use.
     """
 
-    settings = get_settings()
-    kwargs: dict = {"pool_pre_ping": True}
+    return create_engine_for(get_settings().database_url)
 
-    # pytest sets PYTEST_CURRENT_TEST; plus a safety-net for DB names containing "test"
-    if os.getenv("PYTEST_CURRENT_TEST") or "test" in settings.database_url.lower():
-        kwargs["poolclass"] = NullPool
 
-    return create_async_engine(settings.database_url, **kwargs)
+def pool_stats() -> dict[str, Any]:
+    """Checkout counters (all pools of the process) plus the current state of the primary's pool."""
+
+    stats: dict[str, Any] = asdict(_pool_stats)
+    pool = get_engine().pool
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            in_use=pool.checkedout(),
+            # Negative while the pool is not filled up to pool_size yet.
+            overflow=pool.overflow(),
+        )
+    return stats
 
 
 @lru_cache
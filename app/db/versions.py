@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import logging
+from functools import lru_cache
+
+import asyncpg
+from sqlalchemy import bindparam, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.db.models import data_versions
+from app.db.replicas import replica_url
+
+
+logger = logging.getLogger(__name__)
+
+# Must match the channel used by bump_data_version() (migration 0003).
+DATA_VERSIONS_CHANNEL = "data_versions"
+
+_VERSION_STMT = select(data_versions.c.version).where(data_versions.c.table_name == bindparam("table_name"))
+_VERSIONS_STMT = select(data_versions.c.table_name, data_versions.c.version).where(
+    data_versions.c.table_name.in_(bindparam("table_names", expanding=True))
+)
+
+
+def asyncpg_dsn(database_url: str) -> str:
+    # asyncpg understands "postgresql://", but not "postgresql+asyncpg://"
+    return database_url.replace("postgresql+asyncpg://", "postgresql://", 1)
+
+
+class DataVersionTracker:
+    """Process-local view of the ``data_versions`` table.
+
+    While the LISTEN connection is up, versions are kept current from NOTIFY
+    payloads and reading them costs no round trip. Otherwise every read falls
+    back to a primary-key lookup in the caller's session.
+
+    Replica sessions always read the replica's own ``data_versions``: the NOTIFYs
+    come from the primary, and a lagging replica would otherwise return old rows
+    that callers cache under the new version.
+    """
+
+    def __init__(self) -> None:
+        self._versions: dict[str, int] = {}
+        self._conn: asyncpg.Connection | None = None
+
+    @property
+    def listening(self) -> bool:
+        return self._conn is not None and not self._conn.is_closed()
+
+    def _current(self, session: AsyncSession) -> bool:
+        # The NOTIFY values describe the primary's data.
+        return self.listening and replica_url(session) is None
+
+    async def get(self, session: AsyncSession, table: str) -> int:
+        if self._current(session):
+            return self._versions.get(table, 0)
+        res = await session.execute(_VERSION_STMT, {"table_name": table})
+        return int(res.scalar_one_or_none() or 0)
+
+    async def get_many(self, session: AsyncSession, tables: tuple[str, ...]) -> tuple[int, ...]:
+        """Versions of ``tables``, in order (one query when not listening or on a replica)."""
+
+        if self._current(session):
+            return tuple(self._versions.get(t, 0) for t in tables)
+        res = await session.execute(_VERSIONS_STMT, {"table_names": list(tables)})
+        found = {name: int(version) for name, version in res.all()}
+        return tuple(found.get(t, 0) for t in tables)
+
+    async def start(self) -> None:
+        """Open the LISTEN connection and load current versions."""
+
+        if self.listening:
+            return
+        conn = await asyncpg.connect(asyncpg_dsn(get_settings().database_url))
+        try:
+            # Subscribe before reading so no bump is lost in between.
+            await conn.add_listener(DATA_VERSIONS_CHANNEL, self._on_notify)
+            conn.add_termination_listener(self._on_terminate)
+            rows = await conn.fetch("SELECT table_name, version FROM data_versions")
+        except Exception:
+            await conn.close()
+            raise
+        for row in rows:
+            self._set(row["table_name"], int(row["version"]))
+        self._conn = conn
+
+    async def stop(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None and not conn.is_closed():
+            await conn.close()
+
+    def _set(self, table: str, version: int) -> None:
+        # Versions only grow; NOTIFYs may race with the initial load.
+        if version > self._versions.get(table, -1):
+            self._versions[table] = version
+
+    def _on_notify(self, conn: asyncpg.Connection, pid: int, channel: str, payload: str) -> None:
+        table, _, version = payload.rpartition(":")
+        try:
+            self._set(table, int(version))
+        except ValueError:
+            logger.warning("Ignoring malformed %s payload: %r", DATA_VERSIONS_CHANNEL, payload)
+
+    def _on_terminate(self, conn: asyncpg.Connection) -> None:
+        logger.warning("data_versions listener connection lost; falling back to polling")
+        self._conn = None
+
+
+@lru_cache
+def get_data_versions() -> DataVersionTracker:
+    return DataVersionTracker()
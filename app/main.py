@@ -1,13 +1,27 @@
 from __future__ import annotations
 
+import logging
 from contextlib import asynccontextmanager
+from typing import Any
+
 from fastapi import FastAPI
 from fastapi.responses import ORJSONResponse
 
+from app.api.admin import router as admin_router
+from app.api.metrics import router as metrics_router
+from app.api.profiling import router as profiling_router
 from app.api.v1.router import api_router
+from app.core.admission import AdmissionMiddleware
 from app.core.config import get_settings
+from app.core.metrics import MetricsMiddleware
+from app.core.profiling import ProfilingMiddleware
+from app.db.replicas import dispose_replicas, get_replica_router
 from app.db.seed import seed_demo_data
-from app.db.session import dispose_engine
+from app.db.session import dispose_engine, pool_stats
+from app.db.versions import get_data_versions
+
+
+logger = logging.getLogger(__name__)
 
 
 def create_app() -> FastAPI:
@@ -18,8 +32,16 @@ def create_app() -> FastAPI:
         # startup
         if settings.seed_data:
             await seed_demo_data()
+        if settings.data_versions_listen:
+            try:
+                await get_data_versions().start()
+            except Exception:
+                # Caches still work, they just check the version with a query per read.
+                logger.exception("Could not start data_versions listener")
         yield
         # shutdown
+        await get_data_versions().stop()
+        await dispose_replicas()
         await dispose_engine()
 
     app = FastAPI(
@@ -30,11 +52,37 @@ def create_app() -> FastAPI:
     )
 
     app.include_router(api_router, prefix=settings.api_v1_prefix)
+    # Answers 403 until admin_api_key is set.
+    app.include_router(admin_router)
+
+    if settings.rate_limit_rps > 0 or settings.max_concurrent_per_key > 0 or settings.api_keys_file:
+        # Inside the metrics middleware, so rejected requests are measured too.
+        app.add_middleware(AdmissionMiddleware, prefix=settings.api_v1_prefix)
+
+    if settings.metrics_enabled:
+        # Outside api_router: scraped without an API key (restrict it at the proxy / network level).
+        app.add_middleware(MetricsMiddleware)
+        app.include_router(metrics_router)
+
+    if settings.profiling_enabled:
+        # Added last, so it is the outermost middleware and its stacks cover the whole request.
+        app.add_middleware(ProfilingMiddleware)
+        app.include_router(profiling_router)
 
     @app.get("/health", tags=["meta"])
     async def health() -> dict[str, str]:
         return {"status": "ok"}
 
+    @app.get("/health/pool", tags=["meta"])
+    async def health_pool() -> dict[str, Any]:
+        """DB pool state of this worker: checkout wait time, in-use and overflow connections."""
+
+        stats = pool_stats()
+        router = get_replica_router()
+        if router is not None:
+            stats.update(router.stats())
+        return stats
+
     return app
 
 
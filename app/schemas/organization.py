@@ -25,3 +25,8 @@ class OrganizationOut(BaseModel):
 
 class OrganizationOutWithDistance(OrganizationOut):
     distance_m: float | None = None
+
+
+class OrganizationBatchOut(BaseModel):
+    items: list[OrganizationOut] = Field(description="Found organizations, in the requested order")
+    missing: list[int] = Field(description="Requested ids that do not exist")
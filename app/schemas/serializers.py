@@ -0,0 +1,32 @@
+"""Hand-written row -> JSON-ready dict converters for the hot read paths.
+
+They produce exactly what ``<Schema>.model_validate(obj).model_dump()`` would,
+without Pydantic validation and copies. Pydantic schemas stay the source of
+truth for OpenAPI (``response_model``); tests keep both in sync.
+They accept any object exposing the schema's attributes.
+"""
+from __future__ import annotations
+
+from typing import Any
+
+
+def building_json(b: Any) -> dict[str, Any]:
+    return {"id": b.id, "address": b.address, "latitude": b.latitude, "longitude": b.longitude}
+
+
+def organization_json(o: Any) -> dict[str, Any]:
+    return {
+        "id": o.id,
+        "name": o.name,
+        "building": building_json(o.building),
+        "phones": [{"id": p.id, "phone": p.phone} for p in o.phones],
+        "activities": [
+            {"id": a.id, "name": a.name, "parent_id": a.parent_id, "level": a.level} for a in o.activities
+        ],
+    }
+
+
+def organization_with_distance_json(o: Any, distance_m: float | None) -> dict[str, Any]:
+    data = organization_json(o)
+    data["distance_m"] = distance_m
+    return data
@@ -1,58 +1,153 @@
 from __future__ import annotations
 
 from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any
 
+import orjson
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models import Activity
-from app.schemas.activity import ActivityTreeNode
+from app.db.versions import get_data_versions
+from app.services.singleflight import single_flight
+
+
+# Levels are 1..3 (enforced by a DB trigger), so the full tree is at most 3 deep.
+MAX_TREE_DEPTH = 3
+
+
+@dataclass(frozen=True, slots=True)
+class ActivityIndex:
+    """Immutable in-memory snapshot of the activity tree.
+
+    Built at ``version`` of the ``activities`` table; replaced as a whole when the
+    version changes, so readers never see a half-updated tree.
+    """
+
+    version: int
+    parents: dict[int, int | None]
+    levels: dict[int, int]
+    names: dict[int, str]
+    children: dict[int | None, tuple[int, ...]]
+    # Subtree of every node, including the node itself.
+    descendants: dict[int, frozenset[int]]
+    # Serialized tree slices by (root_id, max_depth), filled on first use.
+    _tree_json: dict[tuple[int | None, int], bytes] = field(default_factory=dict, compare=False, repr=False)
+
+    @classmethod
+    def build(cls, version: int, rows: list[tuple[int, int | None, int, str]]) -> ActivityIndex:
+        """``rows`` are (id, parent_id, level, name), ordered by (level, id)."""
+
+        parents: dict[int, int | None] = {}
+        levels: dict[int, int] = {}
+        names: dict[int, str] = {}
+        children_map: dict[int | None, list[int]] = defaultdict(list)
+        for activity_id, parent_id, level, name in rows:
+            parents[activity_id] = parent_id
+            levels[activity_id] = int(level)
+            names[activity_id] = name
+            children_map[parent_id].append(activity_id)
+
+        # Iterative post-order walk from the roots: children are finished before parents.
+        descendants: dict[int, frozenset[int]] = {}
+        stack: list[tuple[int, bool]] = [(a, False) for a in children_map.get(None, [])]
+        while stack:
+            node, expanded = stack.pop()
+            if expanded:
+                subtree = {node}
+                for child in children_map.get(node, []):
+                    subtree |= descendants[child]
+                descendants[node] = frozenset(subtree)
+                continue
+            stack.append((node, True))
+            stack.extend((c, False) for c in children_map.get(node, []))
+
+        return cls(
+            version=version,
+            parents=parents,
+            levels=levels,
+            names=names,
+            children={k: tuple(v) for k, v in children_map.items()},
+            descendants=descendants,
+        )
+
+    def _tree_node(self, activity_id: int, depth: int) -> dict[str, Any]:
+        children = self.children.get(activity_id, ()) if depth > 1 else ()
+        return {
+            "id": activity_id,
+            "name": self.names[activity_id],
+            "level": self.levels[activity_id],
+            "children": [self._tree_node(c, depth - 1) for c in children],
+        }
+
+    def tree_json(self, *, root_id: int | None = None, max_depth: int = MAX_TREE_DEPTH) -> bytes | None:
+        """``list[ActivityTreeNode]`` as JSON bytes: all roots, or just ``root_id`` (None if unknown).
+
+        ``max_depth`` counts levels from the returned roots (1 = roots without children).
+        Each slice is serialized once per index version.
+        """
+
+        key = (root_id, max_depth)
+        cached = self._tree_json.get(key)
+        if cached is not None:
+            return cached
+        if root_id is None:
+            roots = self.children.get(None, ())
+        elif root_id in self.parents:
+            roots = (root_id,)
+        else:
+            return None
+        data = orjson.dumps([self._tree_node(r, max_depth) for r in roots])
+        self._tree_json[key] = data
+        return data
+
+
+# Process-wide cache. Concurrent reloads are harmless (last writer wins), so no lock.
+_activity_index: ActivityIndex | None = None
+
+
+@single_flight
+async def get_activity_index(session: AsyncSession) -> ActivityIndex:
+    """Returns the cached activity tree index, reloading it if the table changed."""
+
+    global _activity_index
+
+    version = await get_data_versions().get(session, "activities")
+    index = _activity_index
+    if index is not None and index.version == version:
+        return index
+
+    stmt = select(Activity.id, Activity.parent_id, Activity.level, Activity.name).order_by(
+        Activity.level, Activity.id
+    )
+    res = await session.execute(stmt)
+    index = ActivityIndex.build(version, [tuple(r) for r in res.all()])
+    _activity_index = index
+    return index
 
 
 async def get_descendant_activity_ids(
     session: AsyncSession, activity_id: int, include_self: bool = True
 ) -> list[int]:
-    """Returns IDs of the activity subtree (recursive CTE)."""
+    """Returns IDs of the activity subtree (from the cached index)."""
 
-    # Recursive CTE: start node
-    cte = select(Activity.id).where(Activity.id == activity_id).cte(recursive=True, name="activity_tree")
-    # Recursive member: children
-    cte = cte.union_all(
-        select(Activity.id).where(Activity.parent_id == cte.c.id)
-    )
-
-    stmt = select(cte.c.id)
-    res = await session.execute(stmt)
-    ids = [int(i) for i in res.scalars().all()]
+    index = await get_activity_index(session)
+    ids = sorted(index.descendants.get(activity_id, ()))
 
     if not include_self:
         ids = [i for i in ids if i != activity_id]
     return ids
 
 async def activity_exists(session: AsyncSession, *, activity_id: int) -> bool:
-    stmt = select(Activity.id).where(Activity.id == activity_id)
-    res = await session.execute(stmt)
-    return res.scalar_one_or_none() is not None
+    index = await get_activity_index(session)
+    return activity_id in index.parents
 
-async def list_activity_tree(session: AsyncSession) -> list[ActivityTreeNode]:
-    """Returns activity tree limited to 3 levels."""
+@single_flight
+async def activity_tree_json(
+    session: AsyncSession, *, root_id: int | None = None, max_depth: int = MAX_TREE_DEPTH
+) -> bytes | None:
+    """Returns the activity tree (or the ``root_id`` subtree) as pre-serialized JSON, None if unknown root."""
 
-    stmt = select(Activity).order_by(Activity.level, Activity.id)
-    res = await session.execute(stmt)
-    rows: list[Activity] = list(res.scalars().all())
-
-    # Index by parent
-    children_map: dict[int | None, list[Activity]] = defaultdict(list)
-    for a in rows:
-        children_map[a.parent_id].append(a)
-
-    def build(parent_id: int | None, *, max_level: int = 3) -> list[ActivityTreeNode]:
-        nodes: list[ActivityTreeNode] = []
-        for a in children_map.get(parent_id, []):
-            node = ActivityTreeNode(id=a.id, name=a.name, level=int(a.level), children=[])
-            if int(a.level) < max_level:
-                node.children = build(a.id, max_level=max_level)
-            nodes.append(node)
-        return nodes
-
-    return build(None, max_level=3)
+    index = await get_activity_index(session)
+    return index.tree_json(root_id=root_id, max_depth=max_depth)
@@ -4,12 +4,24 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models import Building
+from app.services.json_docs import building_json_doc, json_array
+from app.services.read_models import BuildingView
 
 
-async def list_buildings(session: AsyncSession) -> list[Building]:
-    stmt = select(Building).order_by(Building.id)
+_BUILDINGS = select(Building.id, Building.address, Building.latitude, Building.longitude).order_by(Building.id)
+
+
+async def list_buildings(session: AsyncSession) -> list[BuildingView]:
+    res = await session.execute(_BUILDINGS)
+    return [BuildingView(*row) for row in res.all()]
+
+
+async def list_buildings_json(session: AsyncSession) -> str:
+    """Whole ``list[BuildingOut]`` response array, built by Postgres."""
+
+    stmt = json_array(select(building_json_doc().label("doc"), Building.id), Building.id)
     res = await session.execute(stmt)
-    return list(res.scalars().all())
+    return res.scalar_one()
 
 
 async def building_exists(session: AsyncSession, *, building_id: int) -> bool:
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import math
+
+
+# Mean Earth radius used for every reported distance_m (SQL and in-memory paths).
+EARTH_RADIUS_M = 6371000.0
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in meters; same formula as the SQL expression in services.organizations."""
+
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+    a = math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon / 2) ** 2
+    return EARTH_RADIUS_M * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def bbox_around(*, lat: float, lon: float, radius_m: float) -> tuple[float, float, float, float]:
+    """(min_lat, max_lat, min_lon, max_lon) that contains every point within ``radius_m``.
+
+    Longitude span is the exact one for a spherical cap; near a pole or across the
+    antimeridian it falls back to the full longitude range (no wrapped boxes).
+    """
+
+    angular = radius_m / EARTH_RADIUS_M
+    lat_delta = math.degrees(angular)
+    min_lat, max_lat = lat - lat_delta, lat + lat_delta
+    if min_lat <= -90.0 or max_lat >= 90.0:
+        return max(-90.0, min_lat), min(90.0, max_lat), -180.0, 180.0
+
+    lon_delta = math.degrees(math.asin(min(1.0, math.sin(angular) / math.cos(math.radians(lat)))))
+    min_lon, max_lon = lon - lon_delta, lon + lon_delta
+    if min_lon < -180.0 or max_lon > 180.0:
+        return min_lat, max_lat, -180.0, 180.0
+    return min_lat, max_lat, min_lon, max_lon
@@ -0,0 +1,107 @@
+"""SQL expressions that build response JSON inside Postgres.
+
+Documents have the same shape and key order as the Pydantic schemas
+(``json_build_object``, not ``jsonb``: jsonb would reorder keys).
+Outer documents are cast to ``text``: SQLAlchemy's asyncpg dialect registers a
+decoding codec for ``json``, and the point is to forward the string as bytes.
+"""
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy import Select, Text, cast, func, literal_column, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql import ColumnElement
+
+from app.db.models import Activity, Building, Organization, OrganizationPhone, organization_activity
+
+
+EMPTY_JSON_ARRAY = literal_column("'[]'::json")
+
+
+def building_json_doc(building: Any = Building) -> ColumnElement[str]:
+    return func.json_build_object(
+        "id", building.id,
+        "address", building.address,
+        "latitude", building.latitude,
+        "longitude", building.longitude,
+    )
+
+
+def organization_json_doc(*, distance_m: ColumnElement[float] | None = None) -> ColumnElement[str]:
+    """OrganizationOut document for the current ``organizations`` row (correlated subqueries).
+
+    With ``distance_m`` it becomes an OrganizationOutWithDistance document.
+    """
+
+    # Aliased: geo statements already join ``buildings``, which would swallow the FROM via auto-correlation.
+    b = aliased(Building)
+    building = (
+        select(building_json_doc(b))
+        .where(b.id == Organization.building_id)
+        .correlate(Organization)
+        .scalar_subquery()
+    )
+    phones = (
+        select(
+            func.coalesce(
+                func.json_agg(
+                    aggregate_order_by(
+                        func.json_build_object("id", OrganizationPhone.id, "phone", OrganizationPhone.phone),
+                        OrganizationPhone.id,
+                    )
+                ),
+                EMPTY_JSON_ARRAY,
+            )
+        )
+        .where(OrganizationPhone.organization_id == Organization.id)
+        .scalar_subquery()
+    )
+    activities = (
+        select(
+            func.coalesce(
+                func.json_agg(
+                    aggregate_order_by(
+                        func.json_build_object(
+                            "id", Activity.id,
+                            "name", Activity.name,
+                            "parent_id", Activity.parent_id,
+                            "level", Activity.level,
+                        ),
+                        Activity.id,
+                    )
+                ),
+                EMPTY_JSON_ARRAY,
+            )
+        )
+        .join(organization_activity, organization_activity.c.activity_id == Activity.id)
+        .where(organization_activity.c.organization_id == Organization.id)
+        .scalar_subquery()
+    )
+
+    fields: list[Any] = [
+        "id", Organization.id,
+        "name", Organization.name,
+        "building", building,
+        "phones", phones,
+        "activities", activities,
+    ]
+    if distance_m is not None:
+        fields += ["distance_m", distance_m]
+    return cast(func.json_build_object(*fields), Text)
+
+
+def json_array(docs: Select[Any], *order_by: ColumnElement[Any]) -> Select[tuple[str]]:
+    """Aggregates a statement whose first column is a document into one JSON array, in ``order_by`` order."""
+
+    ordered = docs.add_columns(func.row_number().over(order_by=order_by).label("ord")).subquery()
+    doc = ordered.c[0]
+    array = func.coalesce(func.json_agg(aggregate_order_by(doc, ordered.c.ord)), EMPTY_JSON_ARRAY)
+    return select(cast(array, Text))
+
+
+def json_array_bytes(docs: list[str]) -> bytes:
+    """Joins per-row documents into a response array without parsing them."""
+
+    return ("[" + ",".join(docs) + "]").encode()
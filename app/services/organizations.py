@@ -1,72 +1,454 @@
 from __future__ import annotations
 
 import math
-from typing import Literal
-
-from sqlalchemy import Select, func, select
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, AsyncIterator, Awaitable, Callable, Literal, Sequence, TypeVar
+
+from sqlalchemy import (
+    Float,
+    Integer,
+    Row,
+    Select,
+    String,
+    Subquery,
+    and_,
+    any_,
+    bindparam,
+    func,
+    literal_column,
+    or_,
+    select,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.sql import ColumnElement
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import outerjoin
+from sqlalchemy.types import TypeEngine
+
+from app.core.config import get_settings
+from app.db.extensions import has_extension
+from app.db.models import Activity, Building, Organization, activity_closure, organization_activity
+from app.db.replicas import read_session
+from app.services.activities import activity_exists
+from app.services.building_index import get_building_grid
+from app.services.buildings import building_exists
+from app.services.geo import EARTH_RADIUS_M, bbox_around
+from app.services.json_docs import organization_json_doc
+from app.services.pagination import Page, decode_cursor, encode_cursor
+from app.services.read_models import EXTRA_COLUMNS_AT, OrganizationView, load_organizations, organization_rows
+from app.services.singleflight import single_flight
+
+
+T = TypeVar("T")
+
+# Rows per server-side cursor fetch (and per streamed chunk).
+STREAM_BATCH_SIZE = 500
+
+# Statements are built once per query shape (module level or lru_cache) with named
+# bind parameters; a request only binds values. That skips building the expression
+# tree and SQLAlchemy's cache-key traversal (memoized on a reused statement) on every
+# call, and keeps the SQL text, which asyncpg's prepared statement cache is keyed by,
+# the same for all values.
+
+_IDS = bindparam("ids", type_=ARRAY(Integer))
+_ORG_BY_ID = organization_rows(select(Organization)).where(Organization.id == bindparam("org_id"))
+_ORG_DOC_BY_ID = select(organization_json_doc()).where(Organization.id == bindparam("org_id"))
+# = ANY(array) rather than IN (...): one statement for any number of ids.
+_ORGS_BY_IDS = organization_rows(select(Organization)).where(Organization.id == any_(_IDS))
+_ORG_DOCS_BY_IDS = select(organization_json_doc(), Organization.id).where(Organization.id == any_(_IDS))
+
+
+@single_flight
+async def get_organization(
+    session: AsyncSession, *, org_id: int, raw_json: bool = False
+) -> OrganizationView | str | None:
+    """Returns the organization, or its JSON document built by Postgres when ``raw_json``."""
+
+    if raw_json:
+        res = await session.execute(_ORG_DOC_BY_ID, {"org_id": org_id})
+        return res.scalar_one_or_none()
+    row = (await session.execute(_ORG_BY_ID, {"org_id": org_id})).first()
+    if row is None:
+        return None
+    return (await load_organizations(session, [row]))[0]
+
+
+@single_flight
+async def get_organizations_by_ids(
+    session: AsyncSession, *, ids: list[int], raw_json: bool = False
+) -> dict[int, OrganizationView] | dict[int, str]:
+    """Fetches many organizations in one round trip (plus one for phones and one for activities).
+
+    Returns found ones by id (JSON documents when ``raw_json``); order and missing ids are up to the caller.
+    """
+
+    if not ids:
+        return {}
+    if raw_json:
+        res = await session.execute(_ORG_DOCS_BY_IDS, {"ids": ids})
+        return {org_id: doc for doc, org_id in res.all()}
+    res = await session.execute(_ORGS_BY_IDS, {"ids": ids})
+    return {org.id: org for org in await load_organizations(session, res.all())}
+
+
+_BIND_TYPES: dict[type, TypeEngine[Any]] = {int: Integer(), float: Float(), str: String()}
+
+
+@dataclass(frozen=True, slots=True)
+class _KeysetQuery:
+    """Statements of one keyset-paged query shape.
+
+    ``first`` fetches the first page, ``after`` the page after a cursor's key
+    (bound as ``key_0``, ``key_1``, ...); both take the row count as ``limit``.
+    Keys start at column ``keys_at``: after the json document, or after the
+    read-model columns that ``load_organizations`` turns into one OrganizationView.
+    """
+
+    kind: str
+    key_types: tuple[type, ...]
+    first: Select[Any]
+    after: Select[Any]
+    keys_at: int
+    has_parent: bool = False
+
+
+def _keyset_query(
+    stmt: Select[tuple[Organization]],
+    *,
+    kind: str,
+    keys: tuple[ColumnElement[Any], ...],
+    key_types: tuple[type, ...],
+    descending: bool = False,
+    raw_json: bool = False,
+    distance_m: ColumnElement[float] | None = None,
+    parent: tuple[type[Activity] | type[Building], str] | None = None,
+) -> _KeysetQuery:
+    """Keyset paging of ``stmt`` ordered by ``keys`` (the last key must be unique).
+
+    Page items are ``(OrganizationView | json document, *keys)``, plus a trailing
+    ``distance_m`` for views when given. With ``descending`` the first key is ordered DESC
+    and the rest ASC (relevance ranking).
+
+    With ``parent=(Model, param)`` the page is LEFT JOINed from the parent row whose id
+    is bound as ``param`` (``stmt`` must be a plain filtered ``select(Organization)``;
+    its filter becomes the join condition), so the same round trip tells a missing
+    parent from an empty page.
+    """
+
+    last = [bindparam(f"key_{i}", type_=_BIND_TYPES[t]) for i, t in enumerate(key_types)]
+    if descending:
+        first, *rest = keys
+        after = or_(first < last[0], and_(first == last[0], tuple_(*rest) > tuple_(*last[1:])))
+    else:
+        after = tuple_(*keys) > tuple_(*last)
+    order = (keys[0].desc(), *keys[1:]) if descending else keys
+
+    def finish(stmt: Select[tuple[Organization]]) -> Select[Any]:
+        if parent is not None:
+            model, param = parent
+            stmt = (
+                select(Organization)
+                .select_from(outerjoin(model, Organization, stmt.whereclause))
+                .where(model.id == bindparam(param))
+            )
+        if raw_json:
+            stmt = stmt.with_only_columns(
+                organization_json_doc(distance_m=distance_m), *keys, maintain_column_froms=True
+            )
+        else:
+            stmt = organization_rows(stmt, *keys, *([] if distance_m is None else [distance_m]))
+        return stmt.order_by(*order).limit(bindparam("limit", type_=Integer))
+
+    return _KeysetQuery(
+        kind,
+        key_types,
+        finish(stmt),
+        finish(stmt.where(after)),
+        keys_at=1 if raw_json else EXTRA_COLUMNS_AT,
+        has_parent=parent is not None,
+    )
 
-from app.db.models import Building, Organization, organization_activity
-from app.services.activities import get_descendant_activity_ids
 
+async def _keyset_page(
+    session: AsyncSession, query: _KeysetQuery, *, params: dict[str, Any], limit: int, cursor: str | None
+) -> Page[tuple[Any, ...]] | None:
+    """Fetches one page of ``query``; None if it has a parent and the parent does not exist."""
+
+    stmt = query.first
+    params = {**params, "limit": limit + 1}
+    if cursor is not None:
+        last = decode_cursor(cursor, query.kind, *query.key_types)
+        stmt = query.after
+        params.update((f"key_{i}", value) for i, value in enumerate(last))
+
+    res = await session.execute(stmt, params)
+    rows = list(res.all())
+    keys_at = query.keys_at
+    if query.has_parent:
+        if not rows:
+            return None
+        if rows[0][keys_at] is None:
+            # The parent row alone: nothing matched the join condition
+            return Page(items=[])
+    n_keys = len(query.key_types)
+    page = Page.from_rows(
+        rows, limit=limit, cursor_for=lambda r: encode_cursor(query.kind, *r[keys_at : keys_at + n_keys])
+    )
+    if keys_at == 1:
+        return page
+    views = await load_organizations(session, page.items)
+    return Page(items=[(view, *row[keys_at:]) for view, row in zip(views, page.items)], next_cursor=page.next_cursor)
 
-def _org_base_query() -> Select[tuple[Organization]]:
-    return (
-        select(Organization)
-        .options(
-            selectinload(Organization.building),
-            selectinload(Organization.phones),
-            selectinload(Organization.activities),
-        )
+
+def _id_query(
+    stmt: Select[tuple[Organization]],
+    *,
+    raw_json: bool,
+    parent: tuple[type[Activity] | type[Building], str] | None = None,
+) -> _KeysetQuery:
+    """Keyset paging ordered by Organization.id."""
+
+    return _keyset_query(stmt, kind="id", keys=(Organization.id,), key_types=(int,), raw_json=raw_json, parent=parent)
+
+
+async def _id_page(
+    session: AsyncSession, query: _KeysetQuery, *, params: dict[str, Any], limit: int, cursor: str | None
+) -> Page[Any] | None:
+    page = await _keyset_page(session, query, params=params, limit=limit, cursor=cursor)
+    if page is None:
+        return None
+    return Page(items=[row[0] for row in page.items], next_cursor=page.next_cursor)
+
+
+async def _stream_rows(
+    stmt: Select[Any],
+    params: dict[str, Any],
+    convert: Callable[[AsyncSession, Sequence[Row[Any]]], Awaitable[list[T]]],
+) -> AsyncIterator[list[T]]:
+    """Streams ``stmt`` from a server-side cursor in batches of STREAM_BATCH_SIZE rows.
+
+    Runs on its own (read) session: the request-scoped one is closed before a
+    streaming response body is sent. ``convert`` may query that session per batch.
+
+    The public ``stream_*`` functions are all coroutines taking the request's session:
+    they validate the filters (raising, or returning None for a missing parent, like
+    their ``list_*`` counterparts) before the response starts, then return this iterator.
+    """
+
+    async with read_session() as session:
+        result = await session.stream(stmt.execution_options(yield_per=STREAM_BATCH_SIZE), params)
+        async for batch in result.partitions():
+            yield await convert(session, batch)
+
+
+def _stream_organizations(
+    stmt: Select[tuple[Organization]], params: dict[str, Any]
+) -> AsyncIterator[list[OrganizationView]]:
+    """Streams OrganizationViews of ``stmt`` (ordered by id)."""
+
+    return _stream_rows(organization_rows(stmt).order_by(Organization.id), params, load_organizations)
+
+
+async def _empty_stream() -> AsyncIterator[list[Any]]:
+    return
+    yield
+
+
+def _by_building_filter() -> Select[tuple[Organization]]:
+    return select(Organization).where(Organization.building_id == bindparam("building_id"))
+
+
+@lru_cache
+def _by_building_query(*, raw_json: bool) -> _KeysetQuery:
+    return _id_query(_by_building_filter(), raw_json=raw_json, parent=(Building, "building_id"))
+
+
+@single_flight
+async def list_organizations_by_building(
+    session: AsyncSession, *, building_id: int, limit: int = 200, cursor: str | None = None, raw_json: bool = False
+) -> Page[OrganizationView] | Page[str] | None:
+    """One page of the building's organizations; None if the building does not exist."""
+
+    return await _id_page(
+        session,
+        _by_building_query(raw_json=raw_json),
+        params={"building_id": building_id},
+        limit=limit,
+        cursor=cursor,
     )
 
 
-async def get_organization(session: AsyncSession, *, org_id: int) -> Organization | None:
-    stmt = _org_base_query().where(Organization.id == org_id)
-    res = await session.execute(stmt)
-    return res.scalar_one_or_none()
+async def stream_organizations_by_building(
+    session: AsyncSession, *, building_id: int
+) -> AsyncIterator[list[OrganizationView]] | None:
+    """Every organization of the building, in batches; None if the building does not exist."""
 
+    if not await building_exists(session, building_id=building_id):
+        return None
+    return _stream_organizations(_by_building_filter(), {"building_id": building_id})
 
-async def list_organizations_by_building(session: AsyncSession, *, building_id: int) -> list[Organization]:
-    stmt = _org_base_query().where(Organization.building_id == building_id).order_by(Organization.id)
-    res = await session.execute(stmt)
-    return list(res.scalars().all())
+
+def _by_activity_filter(*, include_descendants: bool) -> Select[tuple[Organization]]:
+    # Semi-join instead of JOIN + DISTINCT: an org tagged with several activities
+    # of the subtree is matched once, and no id list is shipped to the DB.
+    activity_id = bindparam("activity_id", type_=Integer)
+    matches = select(organization_activity.c.organization_id).where(
+        organization_activity.c.organization_id == Organization.id
+    )
+    if include_descendants:
+        matches = matches.join(
+            activity_closure, activity_closure.c.descendant_id == organization_activity.c.activity_id
+        ).where(activity_closure.c.ancestor_id == activity_id)
+    else:
+        matches = matches.where(organization_activity.c.activity_id == activity_id)
+    return select(Organization).where(matches.exists())
+
+
+@lru_cache
+def _by_activity_query(*, include_descendants: bool, raw_json: bool) -> _KeysetQuery:
+    stmt = _by_activity_filter(include_descendants=include_descendants)
+    return _id_query(stmt, raw_json=raw_json, parent=(Activity, "activity_id"))
 
 
+@single_flight
 async def list_organizations_by_activity(
+    session: AsyncSession,
+    *,
+    activity_id: int,
+    include_descendants: bool = True,
+    limit: int = 200,
+    cursor: str | None = None,
+    raw_json: bool = False,
+) -> Page[OrganizationView] | Page[str] | None:
+    """One page of the activity's organizations; None if the activity does not exist."""
+
+    return await _id_page(
+        session,
+        _by_activity_query(include_descendants=include_descendants, raw_json=raw_json),
+        params={"activity_id": activity_id},
+        limit=limit,
+        cursor=cursor,
+    )
+
+
+async def stream_organizations_by_activity(
     session: AsyncSession, *, activity_id: int, include_descendants: bool = True
-) -> list[Organization]:
-    ids = [activity_id]
-    if include_descendants:
-        ids = await get_descendant_activity_ids(session, activity_id=activity_id, include_self=True)
-
-    stmt = (
-        _org_base_query()
-        .join(organization_activity, organization_activity.c.organization_id == Organization.id)
-        .where(organization_activity.c.activity_id.in_(ids))
-        .distinct()
-        .order_by(Organization.id)
+) -> AsyncIterator[list[OrganizationView]] | None:
+    """Every organization of the activity (or its subtree), in batches; None if the activity does not exist."""
+
+    if not await activity_exists(session, activity_id=activity_id):
+        return None
+    stmt = _by_activity_filter(include_descendants=include_descendants)
+    return _stream_organizations(stmt, {"activity_id": activity_id})
+
+
+SearchMode = Literal["prefix", "substring", "fuzzy", "fulltext"]
+
+# Literal (not a bind param), so the planner matches ix_organizations_name_fts.
+_TS_CONFIG = literal_column("'russian'::regconfig")
+
+
+@lru_cache
+def _search_filter(mode: SearchMode) -> tuple[Select[tuple[Organization]], ColumnElement[float] | None]:
+    """Returns the filtered statement (query bound as ``q``) and its relevance score (None for name-ordered modes)."""
+
+    stmt = select(Organization)
+    q = bindparam("q", type_=String)
+    if mode in ("prefix", "substring"):
+        return stmt.where(Organization.name.ilike(q, escape="\\")), None
+
+    if mode == "fuzzy":
+        return stmt.where(Organization.name.op("%")(q)), func.similarity(Organization.name, q)
+
+    if mode == "fulltext":
+        document = func.to_tsvector(_TS_CONFIG, Organization.name)
+        query = func.plainto_tsquery(_TS_CONFIG, q)
+        return stmt.where(document.op("@@")(query)), func.ts_rank(document, query)
+
+    raise ValueError("Unknown search mode")
+
+
+async def _search_params(session: AsyncSession, *, q: str, mode: SearchMode) -> dict[str, Any]:
+    """Validates the mode; returns the bind params of ``_search_filter(mode)``."""
+
+    if mode in ("prefix", "substring"):
+        escaped = _escape_like(q)
+        return {"q": f"{escaped}%" if mode == "prefix" else f"%{escaped}%"}
+    if mode == "fuzzy" and not await has_extension(session, "pg_trgm"):
+        raise ValueError("mode=fuzzy is not available: pg_trgm extension is not installed")
+    if mode not in ("fuzzy", "fulltext"):
+        raise ValueError("Unknown search mode")
+    return {"q": q}
+
+
+@lru_cache
+def _search_query(*, mode: SearchMode, raw_json: bool) -> _KeysetQuery:
+    stmt, score = _search_filter(mode)
+    if score is None:
+        return _keyset_query(
+            stmt,
+            kind="name",
+            keys=(Organization.name, Organization.id),
+            key_types=(str, int),
+            raw_json=raw_json,
+        )
+    return _keyset_query(
+        stmt,
+        kind=mode,
+        keys=(score, Organization.id),
+        key_types=(float, int),
+        descending=True,
+        raw_json=raw_json,
     )
-    res = await session.execute(stmt)
-    return list(res.scalars().all())
 
 
-async def search_organizations_by_name(session: AsyncSession, *, q: str, limit: int = 50) -> list[Organization]:
+@single_flight
+async def search_organizations_by_name(
+    session: AsyncSession,
+    *,
+    q: str,
+    limit: int = 50,
+    mode: SearchMode = "substring",
+    cursor: str | None = None,
+    raw_json: bool = False,
+) -> Page[OrganizationView] | Page[str]:
+    """Searches organizations by name.
+
+    - prefix / substring: ILIKE 'q%' / '%q%', ordered by (name, id)
+    - fuzzy: trigram similarity (requires pg_trgm), best matches first
+    - fulltext: to_tsvector @@ plainto_tsquery, ranked by ts_rank
+
+    Ranked modes page by (score desc, id).
+    """
+
     q_stripped = q.strip()
     if not q_stripped:
-        return []
-    escaped = _escape_like(q_stripped)
-    q_like = f"%{escaped}%"
-    stmt = (
-        _org_base_query()
-        .where(Organization.name.ilike(q_like, escape="\\"))
-        .order_by(Organization.name)
-        .limit(limit)
+        return Page(items=[])
+
+    params = await _search_params(session, q=q_stripped, mode=mode)
+    page = await _keyset_page(
+        session, _search_query(mode=mode, raw_json=raw_json), params=params, limit=limit, cursor=cursor
     )
-    res = await session.execute(stmt)
-    return list(res.scalars().all())
+    return Page(items=[row[0] for row in page.items], next_cursor=page.next_cursor)
+
+
+async def stream_search_organizations_by_name(
+    session: AsyncSession, *, q: str, mode: SearchMode = "substring"
+) -> AsyncIterator[list[OrganizationView]]:
+    """Like search_organizations_by_name, but streams every match in batches.
+
+    Filters are validated here (using ``session``), before the stream starts.
+    """
+
+    q_stripped = q.strip()
+    if not q_stripped:
+        return _empty_stream()
+    params = await _search_params(session, q=q_stripped, mode=mode)
+    stmt, score = _search_filter(mode)
+    order = (Organization.name, Organization.id) if score is None else (score.desc(), Organization.id)
+    return _stream_rows(organization_rows(stmt).order_by(*order), params, load_organizations)
 
 def _escape_like(value: str, *, escape: str = "\\") -> str:
     return (
@@ -81,10 +463,15 @@ async def list_buildings(session: AsyncSession) -> list[Building]:
     return list(res.scalars().all())
 
 
+# Reference point of the geo statements.
+_LAT = bindparam("lat", type_=Float)
+_LON = bindparam("lon", type_=Float)
+
+
 def _haversine_distance_m(
     *,
-    lat_deg: float,
-    lon_deg: float,
+    lat_deg: ColumnElement[float],
+    lon_deg: ColumnElement[float],
     building_lat_col: ColumnElement[float],
     building_lon_col: ColumnElement[float],
 ) -> ColumnElement[float]:
@@ -92,7 +479,6 @@ def _haversine_distance_m(
     """Returns SQL expression for great-circle distance in meters."""
 
     # https://en.wikipedia.org/wiki/Haversine_formula
-    earth_radius_m = 6371000.0
     lat1 = func.radians(lat_deg)
     lat2 = func.radians(building_lat_col)
     dlat = func.radians(building_lat_col - lat_deg)
@@ -100,13 +486,127 @@ def _haversine_distance_m(
 
     a = func.pow(func.sin(dlat / 2), 2) + func.cos(lat1) * func.cos(lat2) * func.pow(func.sin(dlon / 2), 2)
     c = 2 * func.atan2(func.sqrt(a), func.sqrt(1 - a))
-    return earth_radius_m * c
+    return EARTH_RADIUS_M * c
 
 
-async def list_organizations_by_geo(
+def _earth_radius_filter(
+    stmt: Select[tuple[Organization]], *, radius: bool
+) -> tuple[Select[tuple[Organization]], ColumnElement[float], ColumnElement[float]]:
+    """Radius filter around (``lat``, ``lon``) served by ix_buildings_earth (cube + earthdistance).
+
+    Returns ``(stmt, chord, distance_m)``. ``chord`` is the straight-line distance
+    between ll_to_earth() points (cube ``<->``, KNN-orderable by the GiST index) and
+    grows with the great-circle distance, so it is both the sort key and the exact
+    radius check. ``distance_m`` converts it to the haversine value on EARTH_RADIUS_M,
+    so responses do not depend on the backend. Without ``radius`` it only adds the
+    order; with it the bounds come from ``_earth_radius_params``.
+    """
+
+    center = func.ll_to_earth(_LAT, _LON)
+    point = func.ll_to_earth(Building.latitude, Building.longitude)
+    chord = point.op("<->", return_type=Float)(center)
+    earth = func.earth(type_=Float)  # earthdistance's sphere radius, the unit of ll_to_earth() coordinates
+
+    if radius:
+        stmt = (
+            # earth_box() takes a great-circle distance on earth()'s sphere; the box is a superset
+            stmt.where(func.earth_box(center, bindparam("angle", type_=Float) * earth).op("@>")(point))
+            .where(chord <= bindparam("max_chord", type_=Float) * earth)
+        )
+    distance = EARTH_RADIUS_M * 2 * func.asin(func.least(chord / (2 * earth), 1.0))
+    return stmt, chord, distance
+
+
+def _earth_radius_params(*, radius_m: float) -> dict[str, float]:
+    """Angle of ``radius_m`` and its chord, both on the unit sphere."""
+
+    angle = min(radius_m / EARTH_RADIUS_M, math.pi)
+    return {"angle": angle, "max_chord": 2 * math.sin(angle / 2)}
+
+
+def _building_candidates() -> Subquery:
+    """``(building_id, distance_m)`` rows of buildings resolved by the in-memory grid.
+
+    Shipped as two array params (``building_ids``, ``distances``; not a VALUES list),
+    so the statement does not change with the number of buildings.
+    """
+
+    return select(
+        func.unnest(bindparam("building_ids", type_=ARRAY(Integer))).label("building_id"),
+        func.unnest(bindparam("distances", type_=ARRAY(Float))).label("distance_m"),
+    ).subquery("candidates")
+
+
+GeoMode = Literal["radius", "bbox", "knn"]
+
+# Statement shapes of the geo search: the filter each backend / mode runs.
+GeoShape = Literal["memory_radius", "memory_bbox", "earth_radius", "earth_knn", "haversine_radius", "bbox"]
+
+# mode=knn without the earthdistance index: radius of the first ring and its growth per retry.
+KNN_START_RADIUS_M = 1_000.0
+KNN_RADIUS_GROWTH = 4.0
+# Half the circumference: a radius that covers the whole globe.
+_MAX_RADIUS_M = math.pi * EARTH_RADIUS_M
+
+
+async def _geo_backend(session: AsyncSession) -> str:
+    backend = get_settings().geo_backend
+    if backend == "earthdistance" and not await has_extension(session, "earthdistance"):
+        return "haversine"
+    return backend
+
+
+@lru_cache
+def _geo_statement(
+    shape: GeoShape,
+) -> tuple[Select[tuple[Organization]], str, ColumnElement[float] | None, ColumnElement[float] | None]:
+    """Returns ``(stmt, kind, sort_key, distance_m)`` of a geo shape.
+
+    ``sort_key`` / ``distance_m`` are None for bbox (ordered by id). For radius the sort
+    key is the distance computed by the in-memory grid, the earthdistance chord, or the
+    SQL haversine distance (``kind`` tells cursors of these orders apart).
+    """
+
+    # Select only Organization; Building is joined only for geo filtering.
+    base = select(Organization).join(Building, Building.id == Organization.building_id)
+    in_bbox = and_(
+        Building.latitude.between(bindparam("min_lat"), bindparam("max_lat")),
+        Building.longitude.between(bindparam("min_lon"), bindparam("max_lon")),
+    )
+
+    if shape == "memory_radius":
+        candidates = _building_candidates()
+        stmt = select(Organization).join(candidates, candidates.c.building_id == Organization.building_id)
+        return stmt, "memory", candidates.c.distance_m, candidates.c.distance_m
+
+    if shape in ("earth_radius", "earth_knn"):
+        stmt, chord, distance = _earth_radius_filter(base, radius=shape == "earth_radius")
+        return stmt, "earth", chord, distance
+
+    if shape == "haversine_radius":
+        distance = _haversine_distance_m(
+            lat_deg=_LAT,
+            lon_deg=_LON,
+            building_lat_col=Building.latitude,
+            building_lon_col=Building.longitude,
+        )
+        stmt = base.where(in_bbox).where(distance <= bindparam("radius_m", type_=Float))
+        return stmt, "distance", distance, distance
+
+    if shape == "memory_bbox":
+        building_ids = bindparam("building_ids", type_=ARRAY(Integer))
+        return select(Organization).where(Organization.building_id == any_(building_ids)), "id", None, None
+
+    if shape == "bbox":
+        return base.where(in_bbox), "id", None, None
+
+    raise ValueError("Unknown geo shape")
+
+
+async def _geo_filter(
     session: AsyncSession,
     *,
-    mode: Literal["radius", "bbox"],
+    mode: GeoMode,
     lat: float | None = None,
     lon: float | None = None,
     radius_m: float | None = None,
@@ -114,12 +614,10 @@ async def list_organizations_by_geo(
     max_lat: float | None = None,
     min_lon: float | None = None,
     max_lon: float | None = None,
-    limit: int = 200,
-) -> list[tuple[Organization, float | None]]:
-    """Returns organizations with optional distance (for radius mode)."""
+) -> tuple[GeoShape, dict[str, Any]]:
+    """Validates geo params; returns the statement shape (``settings.geo_backend``) and its bind params."""
 
-    # Select only Organization; Building is joined only for geo filtering.
-    base = _org_base_query().join(Building, Building.id == Organization.building_id)
+    backend = await _geo_backend(session)
 
     if mode == "radius":
         if lat is None or lon is None:
@@ -128,27 +626,33 @@ async def list_organizations_by_geo(
             raise ValueError("radius_m must be provided and > 0 for mode=radius")
 
         _validate_lat_lon(lat=lat, lon=lon)
-        min_lat, max_lat, min_lon, max_lon = _bbox_around(lat=lat, lon=lon, radius_m=radius_m)
-
-        distance = _haversine_distance_m(
-            lat_deg=lat,
-            lon_deg=lon,
-            building_lat_col=Building.latitude,
-            building_lon_col=Building.longitude,
-        )
 
-        stmt = (
-            base.add_columns(distance.label("distance_m"))
-            .where(Building.latitude.between(min_lat, max_lat))
-            .where(Building.longitude.between(min_lon, max_lon))
-            .where(distance <= radius_m)
-            .order_by(distance)
-            .limit(limit)
-        )
-        res = await session.execute(stmt)
-        return [(org, float(dist)) for org, dist in res.all()]
+        if backend == "memory":
+            grid = await get_building_grid(session)
+            matches = grid.within_radius(lat=lat, lon=lon, radius_m=radius_m)
+            return "memory_radius", {
+                "building_ids": [m[0] for m in matches],
+                "distances": [m[1] for m in matches],
+            }
+
+        if backend == "earthdistance":
+            return "earth_radius", {"lat": lat, "lon": lon, **_earth_radius_params(radius_m=radius_m)}
+
+        min_lat, max_lat, min_lon, max_lon = bbox_around(lat=lat, lon=lon, radius_m=radius_m)
+        return "haversine_radius", {
+            "lat": lat,
+            "lon": lon,
+            "radius_m": radius_m,
+            "min_lat": min_lat,
+            "max_lat": max_lat,
+            "min_lon": min_lon,
+            "max_lon": max_lon,
+        }
 
     if mode == "bbox":
+        # Bounding box filter
+        if min_lat is None or max_lat is None or min_lon is None or max_lon is None:
+            raise ValueError("min_lat, max_lat, min_lon, max_lon must be provided for mode=bbox")
         if min_lat > max_lat:
             raise ValueError("min_lat must be <= max_lat")
         if min_lon > max_lon:
@@ -157,22 +661,173 @@ async def list_organizations_by_geo(
         _validate_lat_lon(lat=min_lat, lon=min_lon)
         _validate_lat_lon(lat=max_lat, lon=max_lon)
 
-        # Bounding box filter
-        if None in (min_lat, max_lat, min_lon, max_lon):
-            raise ValueError("min_lat, max_lat, min_lon, max_lon must be provided for mode=bbox")
+        if backend == "memory":
+            grid = await get_building_grid(session)
+            ids = grid.within_bbox(min_lat=min_lat, max_lat=max_lat, min_lon=min_lon, max_lon=max_lon)
+            return "memory_bbox", {"building_ids": ids}
 
-        stmt = (
-            base.where(Building.latitude.between(min_lat, max_lat))
-            .where(Building.longitude.between(min_lon, max_lon))
-            .order_by(Organization.id)
-            .limit(limit)
-        )
-        res = await session.execute(stmt)
-        return [(org, None) for org in res.scalars().all()]
+        return "bbox", {"min_lat": min_lat, "max_lat": max_lat, "min_lon": min_lon, "max_lon": max_lon}
 
     raise ValueError("Unknown mode")
 
 
+@lru_cache
+def _geo_query(*, shape: GeoShape, raw_json: bool) -> _KeysetQuery:
+    stmt, kind, sort_key, distance = _geo_statement(shape)
+    if sort_key is None:
+        keys: tuple[ColumnElement[Any], ...] = (Organization.id,)
+        key_types: tuple[type, ...] = (int,)
+        distance = literal_column("NULL::float8")
+    else:
+        keys, key_types = (sort_key, Organization.id), (float, int)
+    return _keyset_query(stmt, kind=kind, keys=keys, key_types=key_types, raw_json=raw_json, distance_m=distance)
+
+
+async def _geo_page(
+    session: AsyncSession,
+    shape: GeoShape,
+    params: dict[str, Any],
+    *,
+    limit: int,
+    cursor: str | None,
+    raw_json: bool,
+) -> Page[tuple[OrganizationView, float | None]] | Page[str]:
+    query = _geo_query(shape=shape, raw_json=raw_json)
+    page = await _keyset_page(session, query, params=params, limit=limit, cursor=cursor)
+    if raw_json:
+        return Page(items=[row[0] for row in page.items], next_cursor=page.next_cursor)
+    items = [(row[0], None if row[-1] is None else float(row[-1])) for row in page.items]
+    return Page(items=items, next_cursor=page.next_cursor)
+
+
+async def _nearest_organizations(
+    session: AsyncSession, *, lat: float, lon: float, k: int, raw_json: bool
+) -> Page[tuple[OrganizationView, float | None]] | Page[str]:
+    """The ``k`` organizations nearest to the point, nearest first.
+
+    With the earthdistance index this is a single KNN-ordered query. Otherwise radius
+    searches over growing rings: once a ring holds ``k`` organizations they are the
+    nearest overall, since everything outside the ring is farther away.
+    """
+
+    if await _geo_backend(session) == "earthdistance":
+        page = await _geo_page(
+            session, "earth_knn", {"lat": lat, "lon": lon}, limit=k, cursor=None, raw_json=raw_json
+        )
+        return Page(items=page.items)
+
+    radius_m = KNN_START_RADIUS_M
+    while True:
+        shape, params = await _geo_filter(session, mode="radius", lat=lat, lon=lon, radius_m=radius_m)
+        page = await _geo_page(session, shape, params, limit=k, cursor=None, raw_json=raw_json)
+        if len(page.items) >= k or radius_m >= _MAX_RADIUS_M:
+            return Page(items=page.items)
+        radius_m = min(radius_m * KNN_RADIUS_GROWTH, _MAX_RADIUS_M)
+
+
+@single_flight
+async def list_organizations_by_geo(
+    session: AsyncSession,
+    *,
+    mode: GeoMode,
+    lat: float | None = None,
+    lon: float | None = None,
+    radius_m: float | None = None,
+    min_lat: float | None = None,
+    max_lat: float | None = None,
+    min_lon: float | None = None,
+    max_lon: float | None = None,
+    k: int | None = None,
+    limit: int = 200,
+    cursor: str | None = None,
+    raw_json: bool = False,
+) -> Page[tuple[OrganizationView, float | None]] | Page[str]:
+    """Returns organizations with optional distance (for radius / knn modes).
+
+    Radius pages are ordered by distance (then id), bbox pages by id.
+    knn returns the ``k`` nearest organizations as a single page (no cursor).
+    With ``raw_json`` items are documents that already include ``distance_m``.
+    """
+
+    if mode == "knn":
+        if lat is None or lon is None:
+            raise ValueError("lat and lon must be provided for mode=knn")
+        if k is None or k <= 0:
+            raise ValueError("k must be provided and > 0 for mode=knn")
+        if cursor is not None:
+            raise ValueError("cursor is not supported for mode=knn")
+        _validate_lat_lon(lat=lat, lon=lon)
+        return await _nearest_organizations(session, lat=lat, lon=lon, k=k, raw_json=raw_json)
+
+    shape, params = await _geo_filter(
+        session,
+        mode=mode,
+        lat=lat,
+        lon=lon,
+        radius_m=radius_m,
+        min_lat=min_lat,
+        max_lat=max_lat,
+        min_lon=min_lon,
+        max_lon=max_lon,
+    )
+    return await _geo_page(session, shape, params, limit=limit, cursor=cursor, raw_json=raw_json)
+
+
+async def _one_batch(items: list[T]) -> AsyncIterator[list[T]]:
+    yield items
+
+
+async def stream_organizations_by_geo(
+    session: AsyncSession,
+    *,
+    mode: GeoMode,
+    lat: float | None = None,
+    lon: float | None = None,
+    radius_m: float | None = None,
+    min_lat: float | None = None,
+    max_lat: float | None = None,
+    min_lon: float | None = None,
+    max_lon: float | None = None,
+    k: int | None = None,
+) -> AsyncIterator[list[tuple[OrganizationView, float | None]]]:
+    """Like list_organizations_by_geo, but streams every match in batches.
+
+    Params are validated here (raising ValueError), before the stream starts.
+    knn results are bounded by ``k``, so they are fetched here and sent as one batch.
+    """
+
+    if mode == "knn":
+        page = await list_organizations_by_geo(session, mode=mode, lat=lat, lon=lon, k=k)
+        return _one_batch(page.items)
+
+    shape, params = await _geo_filter(
+        session,
+        mode=mode,
+        lat=lat,
+        lon=lon,
+        radius_m=radius_m,
+        min_lat=min_lat,
+        max_lat=max_lat,
+        min_lon=min_lon,
+        max_lon=max_lon,
+    )
+    stmt, _, sort_key, distance = _geo_statement(shape)
+    if sort_key is None or distance is None:
+        stmt, distance = organization_rows(stmt).order_by(Organization.id), None
+    else:
+        stmt = organization_rows(stmt, distance.label("distance_m")).order_by(sort_key, Organization.id)
+
+    async def with_distance(
+        session: AsyncSession, rows: Sequence[Row[Any]]
+    ) -> list[tuple[OrganizationView, float | None]]:
+        views = await load_organizations(session, rows)
+        if distance is None:
+            return [(view, None) for view in views]
+        return [(view, float(row[EXTRA_COLUMNS_AT])) for view, row in zip(views, rows)]
+
+    return _stream_rows(stmt, params, with_distance)
+
+
 def _validate_lat_lon(*, lat: float | None, lon: float | None) -> None:
     if lat is None or lon is None:
         raise ValueError("lat/lon must be provided")
@@ -180,18 +835,3 @@ def _validate_lat_lon(*, lat: float | None, lon: float | None) -> None:
         raise ValueError("lat must be between -90 and 90")
     if not (-180.0 <= lon <= 180.0):
         raise ValueError("lon must be between -180 and 180")
-
-
-def _bbox_around(*, lat: float, lon: float, radius_m: float) -> tuple[float, float, float, float]:
-    deg_per_meter_lat = 1.0 / 111_320.0
-    lat_delta = radius_m * deg_per_meter_lat
-    lat_rad = math.radians(lat)
-    cos_lat = max(0.01, abs(math.cos(lat_rad)))
-    deg_per_meter_lon = 1.0 / (111_320.0 * cos_lat)
-    lon_delta = radius_m * deg_per_meter_lon
-    return (
-        max(-90.0, lat - lat_delta),
-        min(90.0, lat + lat_delta),
-        max(-180.0, lon - lon_delta),
-        min(180.0, lon + lon_delta),
-    )
\ No newline at end of file
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import base64
+import binascii
+from dataclasses import dataclass
+from typing import Any, Callable, Generic, TypeVar
+
+import orjson
+
+
+T = TypeVar("T")
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(kind: str, *key: Any) -> str:
+    """Opaque keyset cursor: base64url(JSON [kind, *key]).
+
+    ``kind`` names the sort order the key belongs to, so a cursor from one
+    endpoint / mode is rejected by another instead of silently skipping rows.
+    """
+
+    raw = orjson.dumps([kind, *key])
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str, kind: str, *types: type) -> tuple[Any, ...]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = orjson.loads(raw)
+    except (binascii.Error, ValueError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+    if not isinstance(payload, list) or len(payload) != len(types) + 1 or payload[0] != kind:
+        raise InvalidCursor("Invalid cursor")
+    key = tuple(payload[1:])
+    for value, expected in zip(key, types):
+        # JSON has no int/float distinction for whole numbers like 0.0
+        if expected is float and isinstance(value, int) and not isinstance(value, bool):
+            continue
+        if not isinstance(value, expected) or isinstance(value, bool):
+            raise InvalidCursor("Invalid cursor")
+    return key
+
+
+@dataclass(slots=True)
+class Page(Generic[T]):
+    items: list[T]
+    next_cursor: str | None = None
+
+    @classmethod
+    def from_rows(cls, rows: list[T], *, limit: int, cursor_for: Callable[[T], str]) -> Page[T]:
+        """Builds a page from ``limit + 1`` fetched rows; the extra row only signals a next page."""
+
+        if len(rows) <= limit:
+            return cls(items=rows)
+        rows = rows[:limit]
+        return cls(items=rows, next_cursor=cursor_for(rows[-1]))
@@ -0,0 +1,129 @@
+"""Read models: organizations assembled from column-only Core rows.
+
+The read endpoints only serialize what they load, so instead of ORM entities
+(identity map, instance state, relationship collections) they get frozen slots
+dataclasses. Attribute names match the response schemas, so the converters in
+app.schemas.serializers accept them as they accept ORM objects.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Sequence
+
+from sqlalchemy import Integer, Row, Select, any_, bindparam, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql import ColumnElement
+
+from app.db.models import Activity, Building, Organization, OrganizationPhone, organization_activity
+
+
+@dataclass(frozen=True, slots=True)
+class BuildingView:
+    id: int
+    address: str
+    latitude: float
+    longitude: float
+
+
+@dataclass(frozen=True, slots=True)
+class PhoneView:
+    id: int
+    phone: str
+
+
+@dataclass(frozen=True, slots=True)
+class ActivityView:
+    id: int
+    name: str
+    parent_id: int | None
+    level: int
+
+
+@dataclass(frozen=True, slots=True)
+class OrganizationView:
+    id: int
+    name: str
+    building: BuildingView
+    phones: tuple[PhoneView, ...]
+    activities: tuple[ActivityView, ...]
+
+
+# Own alias, so statements that already join buildings for filtering keep working.
+_building = aliased(Building, name="org_building")
+
+ORGANIZATION_COLUMNS = (
+    Organization.id,
+    Organization.name,
+    _building.id,
+    _building.address,
+    _building.latitude,
+    _building.longitude,
+)
+# Index of the first column after ORGANIZATION_COLUMNS in organization_rows() rows.
+EXTRA_COLUMNS_AT = len(ORGANIZATION_COLUMNS)
+
+
+def organization_rows(stmt: Select[Any], *extra: ColumnElement[Any]) -> Select[Any]:
+    """``stmt`` (a filtered ``select(Organization)``) selecting ORGANIZATION_COLUMNS, then ``extra``."""
+
+    # LEFT JOIN: the organization side may be NULL (parent row LEFT JOINed to organizations).
+    return stmt.with_only_columns(*ORGANIZATION_COLUMNS, *extra, maintain_column_froms=True).outerjoin(
+        _building, _building.id == Organization.building_id
+    )
+
+
+_IDS = bindparam("ids", type_=ARRAY(Integer))
+
+_PHONES = (
+    select(OrganizationPhone.organization_id, OrganizationPhone.id, OrganizationPhone.phone)
+    .where(OrganizationPhone.organization_id == any_(_IDS))
+    .order_by(OrganizationPhone.organization_id, OrganizationPhone.id)
+)
+
+_ACTIVITIES = (
+    select(organization_activity.c.organization_id, Activity.id, Activity.name, Activity.parent_id, Activity.level)
+    .join(Activity, Activity.id == organization_activity.c.activity_id)
+    .where(organization_activity.c.organization_id == any_(_IDS))
+    .order_by(organization_activity.c.organization_id, Activity.id)
+)
+
+
+async def load_organizations(session: AsyncSession, rows: Sequence[Row[Any]]) -> list[OrganizationView]:
+    """Builds one OrganizationView per row of an ``organization_rows()`` statement, in order.
+
+    Phones and activities of all rows take one query each. Buildings and activities
+    shared by several organizations are shared objects.
+    """
+
+    if not rows:
+        return []
+    ids = [row[0] for row in rows]
+
+    phones: defaultdict[int, list[PhoneView]] = defaultdict(list)
+    for org_id, phone_id, phone in await session.execute(_PHONES, {"ids": ids}):
+        phones[org_id].append(PhoneView(phone_id, phone))
+
+    activities: defaultdict[int, list[ActivityView]] = defaultdict(list)
+    activity_views: dict[int, ActivityView] = {}
+    for org_id, activity_id, name, parent_id, level in await session.execute(_ACTIVITIES, {"ids": ids}):
+        view = activity_views.get(activity_id)
+        if view is None:
+            view = activity_views[activity_id] = ActivityView(activity_id, name, parent_id, level)
+        activities[org_id].append(view)
+
+    buildings: dict[int, BuildingView] = {}
+    views = []
+    for row in rows:
+        org_id, name, building_id = row[0], row[1], row[2]
+        building = buildings.get(building_id)
+        if building is None:
+            building = buildings[building_id] = BuildingView(building_id, row[3], row[4], row[5])
+        views.append(
+            OrganizationView(
+                org_id, name, building, tuple(phones.get(org_id, ())), tuple(activities.get(org_id, ()))
+            )
+        )
+    return views
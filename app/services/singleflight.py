@@ -0,0 +1,124 @@
+"""Request coalescing: identical concurrent calls share one execution.
+
+The first caller for a key runs the call; callers arriving while it is in flight
+await the same result (or exception). Nothing is kept once the call completes,
+so this only collapses thundering herds, it is not a cache.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Hashable, Iterator, TypeVar
+
+from app.core.config import get_settings
+from app.db.replicas import replica_url
+
+
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class SingleFlightStats:
+    # Calls that ran (the leaders).
+    executed: int = 0
+    # Calls that joined an identical in-flight call instead of running.
+    shared: int = 0
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, asyncio.Future[Any]] = {}
+        self.stats = SingleFlightStats()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        while True:
+            future = self._calls.get(key)
+            if future is None:
+                break
+            self.stats.shared += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # The leader was cancelled (e.g. its client went away): run the call ourselves.
+                # If we were the ones cancelled, the future is still pending: re-raise.
+                if not future.cancelled():
+                    raise
+                self.stats.shared -= 1
+
+        future = asyncio.get_running_loop().create_future()
+        # Followers may not exist; retrieve the exception so asyncio does not log it as unhandled.
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._calls[key] = future
+        self.stats.executed += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+    def stats_snapshot(self) -> dict[str, int]:
+        return {**asdict(self.stats), "in_flight": self.in_flight}
+
+
+# Shared by the service functions decorated with @single_flight.
+service_flights = SingleFlight()
+
+_uncoalesced: ContextVar[bool] = ContextVar("single_flight_uncoalesced", default=False)
+
+
+@contextmanager
+def uncoalesced() -> Iterator[None]:
+    """@single_flight service calls made inside run on their own.
+
+    For callers that already coalesce on a key carrying the data versions (the
+    response cache): the service key has no versions, so a call started after a
+    write could otherwise join one started before it and get its pre-write result.
+    """
+
+    token = _uncoalesced.set(True)
+    try:
+        yield
+    finally:
+        _uncoalesced.reset(token)
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def single_flight(fn: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    """Coalesces concurrent calls of a ``(session, **kwargs)`` service function with equal kwargs.
+
+    Calls are shared only between sessions on the same database (the primary or one
+    replica), so a call never gets data from a source it would not have read. Followers
+    get the object the leader's call returned: results must be immutable values (read
+    models, bytes, tuples), never ORM entities bound to the leader's session.
+    """
+
+    name = f"{fn.__module__}.{fn.__qualname__}"
+
+    @functools.wraps(fn)
+    async def wrapper(session: Any, *args: Any, **kwargs: Any) -> T:
+        if args or _uncoalesced.get() or not get_settings().single_flight_enabled:
+            return await fn(session, *args, **kwargs)
+        key = (name, replica_url(session), tuple(sorted((k, _freeze(v)) for k, v in kwargs.items())))
+        return await service_flights.do(key, lambda: fn(session, **kwargs))
+
+    return wrapper
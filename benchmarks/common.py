@@ -0,0 +1,135 @@
+"""Shared pieces of the benchmark scripts: local-only guard, timing stats, result files."""
+from __future__ import annotations
+
+import os
+import platform
+import random
+import statistics
+import subprocess
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import orjson
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Activity, Building, Organization
+
+
+_LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1"}
+
+
+def require_local_database(database_url: str) -> str:
+    """Returns ``database_url`` if it points to a local Postgres; exits otherwise.
+
+    The generator writes (and may truncate) tables and the benchmarks put load on
+    the server, so they refuse anything that is not on this machine.
+    """
+
+    url = make_url(database_url)
+    host = url.host or url.query.get("host") or ""
+    if isinstance(host, tuple):
+        host = host[0]
+    if host and host not in _LOCAL_HOSTS and not host.startswith("/"):
+        raise SystemExit(f"Refusing to run against a non-local database host: {host!r}")
+    return database_url
+
+
+def use_database(database_url: str) -> None:
+    """Points the app settings at ``database_url`` (before the engine is created)."""
+
+    os.environ["DATABASE_URL"] = require_local_database(database_url)
+    from app.core.config import get_settings
+
+    get_settings.cache_clear()
+
+
+def summarize(samples_s: list[float]) -> dict[str, float]:
+    """Latency summary in milliseconds."""
+
+    ordered = sorted(samples_s)
+
+    def pct(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000
+
+    return {
+        "n": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": statistics.median(ordered) * 1000,
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+@dataclass(slots=True)
+class Sample:
+    """Ids and values of the benchmarked database, to build realistic requests from."""
+
+    org_ids: list[int]
+    building_ids: list[int]
+    root_activity_ids: list[int]
+    leaf_activity_ids: list[int]
+    search_terms: list[str]
+    points: list[tuple[float, float]]
+    counts: dict[str, int]
+
+    @classmethod
+    async def load(cls, session: AsyncSession, *, size: int = 1000, seed: int = 1) -> Sample:
+        # TABLESAMPLE would skew to the first pages on a freshly loaded table; random() is fine at this size.
+        org_ids = list((await session.scalars(select(Organization.id).order_by(func.random()).limit(size))).all())
+        if not org_ids:
+            raise SystemExit("The database has no organizations: run python -m benchmarks.generate first")
+        buildings = (
+            await session.execute(
+                select(Building.id, Building.latitude, Building.longitude).order_by(func.random()).limit(size)
+            )
+        ).all()
+        activities = (await session.execute(select(Activity.id, Activity.parent_id))).all()
+        parents = {parent_id for _, parent_id in activities if parent_id is not None}
+        names = (await session.scalars(select(Organization.name).where(Organization.id.in_(org_ids[:200])))).all()
+        # Words of real names, without legal forms and quotes.
+        words = sorted({w.strip('"«»') for n in names for w in n.split() if len(w.strip('"«»')) >= 4})
+        counts = {}
+        for table in ("buildings", "activities", "organizations", "organization_phones", "organization_activity"):
+            counts[table] = (await session.execute(text(f"SELECT count(*) FROM {table}"))).scalar_one()
+
+        rng = random.Random(seed)
+        rng.shuffle(words)
+        return cls(
+            org_ids=org_ids,
+            building_ids=[b.id for b in buildings],
+            root_activity_ids=[a for a, parent_id in activities if parent_id is None],
+            leaf_activity_ids=[a for a, _ in activities if a not in parents],
+            search_terms=words[:100] or ["ООО"],
+            points=[(b.latitude, b.longitude) for b in buildings],
+            counts=counts,
+        )
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, timeout=5
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def write_results(path: str, *, suite: str, params: dict[str, Any], dataset: dict[str, int], results: dict) -> None:
+    """Writes a machine-readable result file (compared by ``python -m benchmarks.compare``)."""
+
+    doc = {
+        "suite": suite,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "params": params,
+        "dataset": dataset,
+        "results": results,
+    }
+    Path(path).write_bytes(orjson.dumps(doc, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS))
@@ -0,0 +1,59 @@
+"""Compares two benchmark result files (benchmarks.services / benchmarks.load --json).
+
+Prints the change of --metric per case and exits with status 1 if any case got
+slower by more than --threshold percent (for rps: lower), so it can gate a CI job:
+
+    python -m benchmarks.compare results/base.json results/head.json --metric p95_ms --threshold 15
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+import orjson
+
+
+HIGHER_IS_BETTER = {"rps"}
+
+
+def _load(path: str) -> dict:
+    return orjson.loads(Path(path).read_bytes())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--metric", default="p50_ms", help="p50_ms, p95_ms, p99_ms, mean_ms, max_ms or rps (load)")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed regression, percent")
+    args = parser.parse_args()
+
+    base, head = _load(args.base), _load(args.head)
+    if base["suite"] != head["suite"]:
+        raise SystemExit(f"Different suites: {base['suite']} vs {head['suite']}")
+    if base["dataset"] != head["dataset"]:
+        print(f"warning: different data sets:\n  base {base['dataset']}\n  head {head['dataset']}", file=sys.stderr)
+
+    sign = -1 if args.metric in HIGHER_IS_BETTER else 1
+    regressions = []
+    print(f"{args.metric}: {base.get('git_commit')} -> {head.get('git_commit')}")
+    for name in sorted(base["results"].keys() | head["results"].keys()):
+        if name not in base["results"] or name not in head["results"]:
+            print(f"{name:<46} {'only in ' + ('head' if name in head['results'] else 'base'):>30}")
+            continue
+        before, after = base["results"][name][args.metric], head["results"][name][args.metric]
+        change = (after - before) / before * 100 if before else 0.0
+        flag = ""
+        if sign * change > args.threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<46} {before:10.2f} -> {after:10.2f}  {change:+7.1f}%{flag}")
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold}%", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Loading organizations: ORM entities with selectin loaders vs. read-model views.
+
+Both sides load the same rows (ordered by id) and serialize them with
+app.schemas.serializers, like a by-activity / geo response. Reports the median
+time, the peak of Python allocations (tracemalloc, a separate run) and the
+number of garbage collections during the runs. Needs a database with data:
+
+    python -m benchmarks.read_models --database-url postgresql+asyncpg://... --rows 500 --repeat 20
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import statistics
+import time
+import tracemalloc
+from typing import Awaitable, Callable
+
+import orjson
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import selectinload
+
+from app.db.models import Organization
+from app.schemas.serializers import organization_json
+from app.services.read_models import load_organizations, organization_rows
+from benchmarks.common import require_local_database
+
+
+async def load_entities(session: AsyncSession, rows: int) -> bytes:
+    stmt = (
+        select(Organization)
+        .options(
+            selectinload(Organization.building),
+            selectinload(Organization.phones),
+            selectinload(Organization.activities),
+        )
+        .order_by(Organization.id)
+        .limit(rows)
+    )
+    orgs = (await session.execute(stmt)).scalars().all()
+    return orjson.dumps([organization_json(o) for o in orgs])
+
+
+async def load_views(session: AsyncSession, rows: int) -> bytes:
+    stmt = organization_rows(select(Organization)).order_by(Organization.id).limit(rows)
+    views = await load_organizations(session, (await session.execute(stmt)).all())
+    return orjson.dumps([organization_json(v) for v in views])
+
+
+CASES: dict[str, Callable[[AsyncSession, int], Awaitable[bytes]]] = {
+    "orm entities": load_entities,
+    "read models": load_views,
+}
+
+
+async def _run(database_url: str, rows: int, repeat: int) -> None:
+    engine = create_async_engine(database_url)
+    try:
+        async with engine.connect() as conn:
+            print(f"{rows} organizations per call, median of {repeat} calls")
+            for name, load in CASES.items():
+                # A fresh session per call, like a request (the identity map starts empty).
+                size = len(await load(AsyncSession(bind=conn), rows))  # warm-up
+
+                collections = sum(s["collections"] for s in gc.get_stats())
+                samples = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    await load(AsyncSession(bind=conn), rows)
+                    samples.append(time.perf_counter() - started)
+                collections = sum(s["collections"] for s in gc.get_stats()) - collections
+
+                tracemalloc.start()
+                await load(AsyncSession(bind=conn), rows)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                seconds = statistics.median(samples)
+                print(
+                    f"{name:<14} {seconds * 1000:8.2f} ms  {seconds / rows * 1e6:6.2f} us/org  "
+                    f"peak {peak / 2**20:7.2f} MiB  {collections:4d} gc runs  {size} bytes"
+                )
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(_run(require_local_database(args.database_url), args.rows, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
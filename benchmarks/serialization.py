@@ -0,0 +1,73 @@
+"""Response serialization: Pydantic model_validate vs. app.schemas.serializers.
+
+No database needed: transient ORM objects stand in for loaded rows.
+
+    python -m benchmarks.serialization --orgs 2000 --repeat 20
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from typing import Callable
+
+import orjson
+
+from app.db.models import Activity, Building, Organization, OrganizationPhone
+from app.schemas.organization import OrganizationOut, OrganizationOutWithDistance
+from app.schemas.serializers import organization_json, organization_with_distance_json
+
+
+def make_orgs(n: int) -> list[Organization]:
+    buildings = [
+        Building(id=i, address=f"г. Москва, ул. Тестовая {i}", latitude=55.75 + i / 1000, longitude=37.61)
+        for i in range(1, 51)
+    ]
+    activities = [Activity(id=i, name=f"Деятельность {i}", parent_id=None, level=1) for i in range(1, 21)]
+    orgs = []
+    for i in range(1, n + 1):
+        org = Organization(id=i, name=f'ООО "Организация {i}"', building_id=buildings[i % 50].id)
+        org.building = buildings[i % 50]
+        org.phones = [OrganizationPhone(id=i * 10 + k, phone=f"8-800-{i:03d}-{k:02d}") for k in range(2)]
+        org.activities = [activities[i % 20], activities[(i + 7) % 20]]
+        orgs.append(org)
+    return orgs
+
+
+def _time(fn: Callable[[], bytes], repeat: int) -> tuple[float, int]:
+    size = len(fn())  # warm-up
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples), size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orgs", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    orgs = make_orgs(args.orgs)
+    cases: dict[str, Callable[[], bytes]] = {
+        "list / pydantic": lambda: orjson.dumps([OrganizationOut.model_validate(o).model_dump() for o in orgs]),
+        "list / serializers": lambda: orjson.dumps([organization_json(o) for o in orgs]),
+        "geo / pydantic": lambda: orjson.dumps(
+            [
+                OrganizationOutWithDistance.model_validate(o).model_copy(update={"distance_m": 1.0}).model_dump()
+                for o in orgs
+            ]
+        ),
+        "geo / serializers": lambda: orjson.dumps([organization_with_distance_json(o, 1.0) for o in orgs]),
+    }
+
+    print(f"{args.orgs} organizations, median of {args.repeat} runs")
+    for name, fn in cases.items():
+        seconds, size = _time(fn, args.repeat)
+        print(f"{name:<20} {seconds * 1000:9.2f} ms  {seconds / args.orgs * 1e6:7.2f} us/org  {size} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Per-request statement overhead of the organization endpoints.
+
+"build" rebuilds each query shape the way every request used to and generates its
+SQLAlchemy cache key (what Connection.execute does before the compiled-cache
+lookup); "reused" does the same for the statement built once per shape, whose
+key is memoized. No database needed for this part.
+
+With --database-url the service calls also run against a seeded database, on one
+connection with asyncpg's prepared statement cache off (parse + plan per call)
+and on (the default).
+
+    python -m benchmarks.statements --repeat 2000
+    python -m benchmarks.statements --database-url postgresql+asyncpg://... --queries 500
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.services import organizations as orgs
+from benchmarks.common import require_local_database
+
+
+_SHAPE_CACHES = (
+    orgs._by_building_query,
+    orgs._by_activity_query,
+    orgs._search_filter,
+    orgs._search_query,
+    orgs._geo_statement,
+    orgs._geo_query,
+)
+
+
+def _fresh(get: Callable[[], Select[Any]]) -> Callable[[], Select[Any]]:
+    def build() -> Select[Any]:
+        for cached in _SHAPE_CACHES:
+            cached.cache_clear()
+        return get()
+
+    return build
+
+
+def _keyset(get: Callable[[], Select[Any]]) -> tuple[Callable[[], Select[Any]], Callable[[], Select[Any]]]:
+    return _fresh(get), get
+
+
+# name -> (build from scratch, reuse): both return the statement a request executes.
+SHAPES: dict[str, tuple[Callable[[], Select[Any]], Callable[[], Select[Any]]]] = {
+    "get / views": (
+        lambda: orgs.organization_rows(orgs.select(orgs.Organization)).where(orgs.Organization.id == 1),
+        lambda: orgs._ORG_BY_ID,
+    ),
+    "get / db json": (
+        lambda: orgs.select(orgs.organization_json_doc()).where(orgs.Organization.id == 1),
+        lambda: orgs._ORG_DOC_BY_ID,
+    ),
+    "by-building / views": _keyset(lambda: orgs._by_building_query(raw_json=False).first),
+    "by-activity / db json": _keyset(
+        lambda: orgs._by_activity_query(include_descendants=True, raw_json=True).first
+    ),
+    "search substring / views": _keyset(lambda: orgs._search_query(mode="substring", raw_json=False).after),
+    "search fulltext / views": _keyset(lambda: orgs._search_query(mode="fulltext", raw_json=False).first),
+    "geo haversine / views": _keyset(lambda: orgs._geo_query(shape="haversine_radius", raw_json=False).first),
+    "geo memory / db json": _keyset(lambda: orgs._geo_query(shape="memory_radius", raw_json=True).first),
+}
+
+
+def _median_us(fn: Callable[[], object], repeat: int) -> float:
+    fn()  # warm-up (fills the lru caches of the "reused" side)
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1e6
+
+
+def bench_statements(repeat: int) -> None:
+    print(f"statement per request, median of {repeat} runs")
+    for name, (build, reuse) in SHAPES.items():
+        built = _median_us(lambda: build()._generate_cache_key(), repeat)
+        reused = _median_us(lambda: reuse()._generate_cache_key(), repeat)
+        print(f"{name:<24} build {built:9.1f} us   reused {reused:7.2f} us")
+
+
+# name -> service call; the seeded data set (app.db.seed) has these ids and names.
+CALLS: dict[str, Callable[[AsyncSession], Awaitable[object]]] = {
+    "get": lambda s: orgs.get_organization.__wrapped__(s, org_id=1),
+    "batch": lambda s: orgs.get_organizations_by_ids.__wrapped__(s, ids=[1, 2, 3]),
+    "by-building": lambda s: orgs.list_organizations_by_building.__wrapped__(s, building_id=1),
+    "by-activity": lambda s: orgs.list_organizations_by_activity.__wrapped__(s, activity_id=1),
+    "search": lambda s: orgs.search_organizations_by_name.__wrapped__(s, q="ООО"),
+    "geo radius": lambda s: orgs.list_organizations_by_geo.__wrapped__(
+        s, mode="radius", lat=55.75, lon=37.61, radius_m=5000
+    ),
+}
+
+
+async def _time_calls(database_url: str, cache_size: int, queries: int) -> dict[str, float]:
+    engine = create_async_engine(database_url, connect_args={"prepared_statement_cache_size": cache_size})
+    results = {}
+    try:
+        async with engine.connect() as conn:
+            session = AsyncSession(bind=conn)
+            for name, call in CALLS.items():
+                await call(session)  # warm-up
+                samples = []
+                for _ in range(queries):
+                    started = time.perf_counter()
+                    await call(session)
+                    samples.append(time.perf_counter() - started)
+                    session.expunge_all()
+                results[name] = statistics.median(samples) * 1e6
+            await session.close()
+    finally:
+        await engine.dispose()
+    return results
+
+
+def bench_database(database_url: str, queries: int) -> None:
+    unprepared = asyncio.run(_time_calls(database_url, 0, queries))
+    prepared = asyncio.run(_time_calls(database_url, 100, queries))
+    print(f"\nservice call on one connection, median of {queries} calls")
+    for name in CALLS:
+        print(f"{name:<24} unprepared {unprepared[name]:8.1f} us   prepared {prepared[name]:8.1f} us")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+    if args.database_url:
+        require_local_database(args.database_url)
+
+    bench_statements(args.repeat)
+    if args.database_url:
+        bench_database(args.database_url, args.queries)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,9 @@ import asyncio
 import os
 import re
 import sys
+from contextlib import AsyncExitStack, asynccontextmanager
 from pathlib import Path
-from typing import AsyncIterator
+from typing import AsyncIterator, Awaitable, Callable
 from urllib.parse import urlparse, urlunparse
 
 import asyncpg
@@ -105,11 +106,45 @@ def _prepare_db() -> None:
 
 
 
+class FakeClock:
+    """Manually advanced clock for code taking a ``clock`` callable."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
 @pytest.fixture()
-def app():
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+def _reset_settings() -> None:
+    """Drops the settings and the singletons built from them; the next use reads the environment again."""
+
+    from app.core.admission import get_admission_control
+    from app.core.api_keys import get_key_registry
     from app.core.config import get_settings
+    from app.core.profiling import get_profile_store
 
-    get_settings.cache_clear()
+    for cached in (get_settings, get_key_registry, get_admission_control, get_profile_store):
+        cached.cache_clear()
+
+
+@asynccontextmanager
+async def _client_for(app) -> AsyncIterator["httpx.AsyncClient"]:
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+
+
+@pytest.fixture()
+def app():
+    _reset_settings()
     from app.main import create_app
 
     return create_app()
@@ -122,13 +157,28 @@ def auth_headers() -> dict[str, str]:
 
 @pytest.fixture()
 async def client(app) -> AsyncIterator["httpx.AsyncClient"]:
-    import httpx
-
-    transport = httpx.ASGITransport(app=app)
-    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+    async with _client_for(app) as ac:
         yield ac
 
 
+@pytest.fixture()
+async def make_client(monkeypatch) -> AsyncIterator[Callable[..., Awaitable["httpx.AsyncClient"]]]:
+    """``await make_client(NAME="value", ...)``: a client of an app created with these settings (env vars)."""
+
+    async with AsyncExitStack() as stack:
+
+        async def make(**env: str) -> "httpx.AsyncClient":
+            for name, value in env.items():
+                monkeypatch.setenv(name, value)
+            _reset_settings()
+            from app.main import create_app
+
+            return await stack.enter_async_context(_client_for(create_app()))
+
+        yield make
+    _reset_settings()
+
+
 @pytest.fixture()
 async def db_session() -> AsyncIterator["AsyncSession"]:
     from app.db.session import get_sessionmaker
@@ -77,4 +77,62 @@ async def test_activity_db_constraints_depth_and_unique(db_session) -> None:
         await db_session.flush()
 
     assert "depth" in str(exc.value).lower() or "limit" in str(exc.value).lower()
-    await db_session.rollback()
\ No newline at end of file
+    await db_session.rollback()
+
+async def test_activity_closure_follows_inserts_and_moves(db_session) -> None:
+    """Closure-таблица поддерживается триггером при вставке и переносе поддерева."""
+    from app.db.models import Activity, activity_closure
+
+    async def ancestors(activity_id: int) -> dict[int, int]:
+        res = await db_session.execute(
+            select(activity_closure.c.ancestor_id, activity_closure.c.depth).where(
+                activity_closure.c.descendant_id == activity_id
+            )
+        )
+        return {a: d for a, d in res.all()}
+
+    a = Activity(name="__closure_a__")
+    d = Activity(name="__closure_d__")
+    db_session.add_all([a, d])
+    await db_session.flush()
+    b = Activity(name="__closure_b__", parent_id=a.id)
+    db_session.add(b)
+    await db_session.flush()
+    c = Activity(name="__closure_c__", parent_id=b.id)
+    db_session.add(c)
+    await db_session.flush()
+
+    assert await ancestors(c.id) == {c.id: 0, b.id: 1, a.id: 2}
+
+    # move subtree b -> under d
+    b.parent_id = d.id
+    await db_session.flush()
+    assert await ancestors(c.id) == {c.id: 0, b.id: 1, d.id: 2}
+    assert await ancestors(b.id) == {b.id: 0, d.id: 1}
+
+    # detach to root
+    b.parent_id = None
+    await db_session.flush()
+    assert await ancestors(c.id) == {c.id: 0, b.id: 1}
+    await db_session.rollback()
+
+
+async def test_activity_tree_root_and_max_depth(client, auth_headers) -> None:
+    full = (await client.get("/api/v1/activities/tree", headers=auth_headers)).json()
+    food = next(n for n in full if n["name"] == "Еда")
+
+    r = await client.get("/api/v1/activities/tree", params={"root_id": food["id"]}, headers=auth_headers)
+    assert r.status_code == 200
+    assert r.json() == [food]
+
+    r = await client.get("/api/v1/activities/tree", params={"root_id": food["id"], "max_depth": 2}, headers=auth_headers)
+    (node,) = r.json()
+    assert [c["id"] for c in node["children"]] == [c["id"] for c in food["children"]]
+    assert all(c["children"] == [] for c in node["children"])
+
+    r = await client.get("/api/v1/activities/tree", params={"max_depth": 1}, headers=auth_headers)
+    assert [n["id"] for n in r.json()] == [n["id"] for n in full]
+    assert all(n["children"] == [] for n in r.json())
+
+    r = await client.get("/api/v1/activities/tree", params={"root_id": 999999}, headers=auth_headers)
+    assert r.status_code == 404
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import asyncio
+
+from sqlalchemy import delete, select
+
+
+async def test_activity_index_reloads_after_activities_change(db_session) -> None:
+    from app.db.models import Activity
+    from app.services.activities import get_activity_index
+
+    food_id = await db_session.scalar(select(Activity.id).where(Activity.name == "Еда", Activity.parent_id.is_(None)))
+    before = await get_activity_index(db_session)
+    assert len(before.descendants[food_id]) == 5
+    assert await get_activity_index(db_session) is before  # same version -> cached object
+
+    probe = Activity(name="__index_probe__", parent_id=food_id)
+    db_session.add(probe)
+    await db_session.commit()
+    try:
+        after = await get_activity_index(db_session)
+        assert after.version > before.version
+        assert probe.id in after.descendants[food_id]
+        assert after.levels[probe.id] == 2
+    finally:
+        await db_session.execute(delete(Activity).where(Activity.id == probe.id))
+        await db_session.commit()
+
+
+async def test_data_versions_listener_receives_bumps(db_session) -> None:
+    from app.db.models import Activity
+    from app.db.versions import DataVersionTracker
+
+    tracker = DataVersionTracker()
+    await tracker.start()
+    try:
+        assert tracker.listening
+        before = await tracker.get(db_session, "activities")
+
+        await db_session.execute(delete(Activity).where(Activity.name == "__no_such_activity__"))
+        await db_session.commit()
+
+        for _ in range(50):
+            if await tracker.get(db_session, "activities") > before:
+                break
+            await asyncio.sleep(0.02)
+        assert await tracker.get(db_session, "activities") == before + 1
+    finally:
+        await tracker.stop()
+    assert not tracker.listening
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import pytest
+
+from app.core.admission import MemoryBackend
+
+
+async def test_token_bucket_refills_at_rate(clock) -> None:
+    backend = MemoryBackend(clock=clock)
+
+    assert [await backend.take("k", rate=2, burst=3) for _ in range(3)] == [0, 0, 0]
+    assert await backend.take("k", rate=2, burst=3) == pytest.approx(0.5)
+    clock.now = 0.5
+    assert await backend.take("k", rate=2, burst=3) == 0
+    # Other keys have their own bucket.
+    assert await backend.take("other", rate=2, burst=3) == 0
+
+
+async def test_refused_requests_keep_tokens_and_slots(clock) -> None:
+    from app.core.admission import AdmissionControl
+    from app.core.api_keys import ApiKey
+
+    backend = MemoryBackend(clock=clock)
+    control = AdmissionControl(backend, rps=1, burst=2, max_concurrent=1)
+    key = ApiKey("k", b"")
+
+    assert await control.admit(key) is None
+    assert (await control.admit(key)).status == 503  # the first one is in flight
+    await control.release(key)
+    # The 503 did not use up the second token.
+    assert await control.admit(key) is None
+    await control.release(key)
+    # A 429 gives its slot back.
+    assert (await control.admit(key)).status == 429
+    assert backend.in_flight("k") == 0
+
+
+@pytest.fixture()
+async def limited_client(make_client):
+    return await make_client(RATE_LIMIT_RPS="1", RATE_LIMIT_BURST="2", MAX_CONCURRENT_PER_KEY="1")
+
+
+async def test_requests_over_the_rate_get_429_with_retry_after(limited_client, auth_headers) -> None:
+    statuses = [(await limited_client.get("/api/v1/buildings", headers=auth_headers)).status_code for _ in range(3)]
+    assert statuses == [200, 200, 429]
+
+    r = await limited_client.get("/api/v1/buildings", headers=auth_headers)
+    assert r.status_code == 429
+    assert r.headers["Retry-After"] == "1"
+    assert r.json() == {"detail": "Rate limit exceeded"}
+
+    # Invalid keys are not limited here; auth rejects them.
+    r = await limited_client.get("/api/v1/buildings", headers={"X-API-Key": "wrong"})
+    assert r.status_code == 401
+
+
+async def test_requests_over_the_concurrency_cap_get_503(limited_client, auth_headers) -> None:
+    from app.core.admission import get_admission_control
+
+    backend = get_admission_control().backend
+    assert await backend.acquire_slot("default", limit=1)  # a request in flight
+    try:
+        r = await limited_client.get("/api/v1/buildings", headers=auth_headers)
+        assert r.status_code == 503
+        assert r.headers["Retry-After"] == "1"
+    finally:
+        await backend.release_slot("default")
+
+    r = await limited_client.get("/api/v1/buildings", headers=auth_headers)
+    assert r.status_code == 200
+    assert backend.in_flight("default") == 0
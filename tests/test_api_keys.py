@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import os
+
+import orjson
+
+from app.core.api_keys import ApiKey, KeyRegistry, hash_key
+
+
+def _write_keys(path, entries: dict[str, str], *, mtime_ns: int) -> None:
+    path.write_bytes(orjson.dumps([{"identity": i, "sha256": hash_key(k).hex()} for i, k in entries.items()]))
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_lookup_returns_identity_of_hashed_key(tmp_path) -> None:
+    keys_file = tmp_path / "keys.json"
+    _write_keys(keys_file, {f"client-{i}": f"key-{i}" for i in range(5000)}, mtime_ns=10**18)
+    registry = KeyRegistry(static={hash_key("static"): ApiKey("default", hash_key("static"))}, path=str(keys_file))
+
+    assert len(registry) == 5001
+    assert registry.lookup("key-4321") == ApiKey("client-4321", hash_key("key-4321"))
+    assert registry.lookup("static").identity == "default"
+    assert registry.lookup("key-5000") is None
+    assert registry.lookup("") is None
+    assert registry.lookup(None) is None
+
+
+def test_keys_file_is_reloaded_when_it_changes(tmp_path, clock) -> None:
+    keys_file = tmp_path / "keys.json"
+    _write_keys(keys_file, {"old": "old-key"}, mtime_ns=10**18)
+    registry = KeyRegistry(static={}, path=str(keys_file), reload_s=5, clock=clock)
+    assert registry.lookup("old-key").identity == "old"
+
+    _write_keys(keys_file, {"new": "new-key"}, mtime_ns=2 * 10**18)
+    clock.now = 1  # within reload_s: the file is not checked yet
+    assert registry.lookup("new-key") is None
+
+    clock.now = 6
+    assert registry.lookup("new-key").identity == "new"
+    assert registry.lookup("old-key") is None  # revoked
+    assert registry.reloads == 2
+
+
+def test_broken_keys_file_keeps_previous_keys(tmp_path, clock) -> None:
+    keys_file = tmp_path / "keys.json"
+    _write_keys(keys_file, {"a": "key-a"}, mtime_ns=10**18)
+    registry = KeyRegistry(static={}, path=str(keys_file), reload_s=1, clock=clock)
+
+    keys_file.write_bytes(b'[{"identity": "b", "sha256": "not-hex"}]')
+    clock.now = 2
+    assert registry.lookup("key-a").identity == "a"
+    assert registry.reload_errors == 1
+
+
+def test_removing_keys_file_revokes_its_keys(tmp_path, clock) -> None:
+    keys_file = tmp_path / "keys.json"
+    _write_keys(keys_file, {"a": "key-a"}, mtime_ns=10**18)
+    registry = KeyRegistry(
+        static={hash_key("static"): ApiKey("default", hash_key("static"))}, path=str(keys_file), reload_s=1, clock=clock
+    )
+    assert registry.lookup("key-a").identity == "a"
+
+    keys_file.unlink()
+    clock.now = 2
+    assert registry.lookup("key-a") is None
+    assert registry.lookup("static").identity == "default"
+    assert registry.reload_errors == 0
+
+
+def test_broken_keys_file_is_logged_once(tmp_path, monkeypatch, clock) -> None:
+    from app.core import api_keys
+
+    logged = []
+    monkeypatch.setattr(api_keys.logger, "exception", lambda *args: logged.append(args))
+    keys_file = tmp_path / "keys.json"
+    keys_file.write_bytes(b"not json")
+    registry = KeyRegistry(static={}, path=str(keys_file), reload_s=1, clock=clock)
+    for _ in range(3):
+        clock.now += 2
+        registry.lookup("key")
+    assert registry.reload_errors == 1
+    assert len(logged) == 1
+
+
+def test_key_limits_are_parsed_and_checked(tmp_path, clock) -> None:
+    keys_file = tmp_path / "keys.json"
+    entry = {"identity": "a", "sha256": hash_key("key-a").hex(), "rate_limit_rps": "2.5", "max_concurrent": "3"}
+    keys_file.write_bytes(orjson.dumps([entry]))
+    os.utime(keys_file, ns=(10**18, 10**18))
+    registry = KeyRegistry(static={}, path=str(keys_file), reload_s=1, clock=clock)
+    key = registry.lookup("key-a")
+    assert (key.rate_limit_rps, key.rate_limit_burst, key.max_concurrent) == (2.5, None, 3)
+
+    for bad in ({"max_concurrent": -1}, {"rate_limit_rps": "fast"}):
+        keys_file.write_bytes(orjson.dumps([{**entry, **bad}]))
+        clock.now += 2
+        assert registry.lookup("key-a") == key
+    assert registry.reload_errors == 2
+
+
+async def test_identity_is_counted_per_api_key(client, auth_headers) -> None:
+    r = await client.get("/api/v1/buildings", headers=auth_headers)
+    assert r.status_code == 200
+
+    r = await client.get("/metrics")
+    assert 'http_requests_by_api_key_total{identity="default"}' in r.text
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from sqlalchemy import delete
+
+
+def test_building_grid_rebuilds_only_changed_cells() -> None:
+    from app.services.building_index import BuildingGrid
+
+    rows = [(1, 55.7558, 37.6176), (2, 55.7560, 37.6180), (3, 55.7963, 49.1088)]
+    grid, rebuilt = BuildingGrid.build(1, rows)
+    assert rebuilt == 2
+
+    moved, rebuilt = BuildingGrid.build(2, [*rows[:2], (3, 55.7964, 49.1089), (4, 59.9386, 30.3141)], previous=grid)
+    assert rebuilt == 2  # Kazan cell of building 3 and the new St. Petersburg cell
+    moscow = next(iter(grid.cells))
+    assert moved.cells[moscow] is grid.cells[moscow]
+
+    assert [b for b, _ in moved.within_radius(lat=55.7558, lon=37.6176, radius_m=100)] == [1, 2]
+    assert moved.within_bbox(min_lat=55.0, max_lat=60.0, min_lon=30.0, max_lon=40.0) == [1, 2, 4]
+
+
+async def test_building_grid_refreshes_after_buildings_change(db_session) -> None:
+    from app.db.models import Building
+    from app.services.building_index import building_index_stats, get_building_grid
+
+    before = await get_building_grid(db_session)
+    assert await get_building_grid(db_session) is before
+    assert building_index_stats()["hits"] >= 1
+
+    probe = Building(address="__grid_probe__", latitude=10.5, longitude=20.5)
+    db_session.add(probe)
+    await db_session.commit()
+    try:
+        after = await get_building_grid(db_session)
+        assert after.version > before.version
+        assert after.within_bbox(min_lat=10.0, max_lat=11.0, min_lon=20.0, max_lon=21.0) == [probe.id]
+    finally:
+        await db_session.execute(delete(Building).where(Building.id == probe.id))
+        await db_session.commit()
+    assert probe.id not in (await get_building_grid(db_session)).points
+
+
+async def test_concurrent_lookups_after_a_write_reload_once(db_session) -> None:
+    import asyncio
+
+    from app.db.models import Building
+    from app.db.session import get_sessionmaker
+    from app.services.building_index import building_index_stats, get_building_grid
+
+    await get_building_grid(db_session)
+    probe = Building(address="__grid_probe__", latitude=10.5, longitude=20.5)
+    db_session.add(probe)
+    await db_session.commit()
+    try:
+        builds = building_index_stats()["builds"]
+        sessions = [get_sessionmaker()() for _ in range(5)]
+        try:
+            grids = await asyncio.gather(*(get_building_grid(s) for s in sessions))
+        finally:
+            for s in sessions:
+                await s.close()
+        assert building_index_stats()["builds"] == builds + 1
+        assert all(g is grids[0] for g in grids)
+    finally:
+        await db_session.execute(delete(Building).where(Building.id == probe.id))
+        await db_session.commit()
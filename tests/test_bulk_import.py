@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import os
+from typing import AsyncIterator
+
+import asyncpg
+import orjson
+import pytest
+
+from app.db.bulk_import import BulkImportError, Source, import_sources
+
+
+ADMIN_KEY = "admin-test-key"
+
+
+async def _chunks(data: bytes, size: int = 7) -> AsyncIterator[bytes]:
+    # Small chunks: lines and quoted CSV fields are split across them.
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+def _ndjson(*records: dict) -> bytes:
+    return b"\n".join(orjson.dumps(r) for r in records) + b"\n"
+
+
+@pytest.fixture()
+async def conn() -> AsyncIterator[asyncpg.Connection]:
+    """A connection in a transaction that is rolled back: the shared test data stays as seeded."""
+
+    conn = await asyncpg.connect(os.environ["DATABASE_URL"].replace("postgresql+asyncpg://", "postgresql://", 1))
+    tx = conn.transaction()
+    await tx.start()
+    try:
+        yield conn
+    finally:
+        await tx.rollback()
+        await conn.close()
+
+
+def _tables(report) -> dict[str, dict]:
+    return {t["table"]: t for t in report.as_dict()["tables"]}
+
+
+async def test_import_all_kinds(conn) -> None:
+    buildings = (
+        b"id,address,latitude,longitude\n"
+        b'9001,"Test city, ""Quoted"" street\n1",55.1,37.1\n'
+        b"9002,Second street 2,55.2,37.2\n"
+    )
+    # Children before their parents: inserted level by level anyway.
+    activities = _ndjson(
+        {"id": 9103, "name": "Leaf", "parent_id": 9102},
+        {"id": 9102, "name": "Middle", "parent_id": 9101},
+        {"id": 9101, "name": "Root", "parent_id": None},
+    )
+    organizations = _ndjson(
+        {"id": 9201, "name": "First", "building_id": 9001, "phones": ["1-111", "1-112"], "activity_ids": [9103]},
+        {"id": 9202, "name": "Second", "building_id": 9002, "phones": [], "activity_ids": [9101]},
+        {"id": 9202, "name": "Second, renamed", "building_id": 9002},
+    )
+    phones = b"organization_id,phone\n9202,2-222\n9201,1-111\n"
+
+    report = await import_sources(
+        conn,
+        [
+            Source("organizations", _chunks(organizations), "ndjson"),
+            Source("buildings", _chunks(buildings), "csv"),
+            Source("activities", _chunks(activities), "ndjson"),
+            Source("phones", _chunks(phones), "csv"),
+        ],
+        batch_size=2,
+        progress=lambda *args: None,
+        analyze=False,
+    )
+
+    assert report.records == 2 + 3 + 3 + 2
+    tables = _tables(report)
+    assert tables["buildings"]["inserted"] == 2
+    assert tables["activities"]["inserted"] == 3
+    assert tables["organizations"] == {**tables["organizations"], "rows": 2, "inserted": 2}
+    assert tables["organization_phones"]["inserted"] == 3
+    assert tables["organization_activity"]["inserted"] == 2
+
+    address = await conn.fetchval("SELECT address FROM buildings WHERE id = 9001")
+    assert address == 'Test city, "Quoted" street\n1'
+    assert await conn.fetchval("SELECT level FROM activities WHERE id = 9103") == 3
+    assert await conn.fetchval("SELECT count(*) FROM activity_closure WHERE descendant_id = 9103") == 3
+    assert await conn.fetchval("SELECT name FROM organizations WHERE id = 9202") == "Second, renamed"
+
+    # The same input again changes nothing.
+    again = await import_sources(
+        conn, [Source("buildings", _chunks(buildings), "csv")], progress=lambda *args: None, analyze=False
+    )
+    assert _tables(again)["buildings"] == {**_tables(again)["buildings"], "rows": 2, "inserted": 0, "updated": 0}
+
+
+async def test_import_rejects_missing_references(conn) -> None:
+    organizations = _ndjson({"id": 9301, "name": "Nowhere", "building_id": 999_999})
+    with pytest.raises(BulkImportError, match="missing building_id: 999999"):
+        await import_sources(
+            conn, [Source("organizations", _chunks(organizations), "ndjson")], progress=lambda *args: None
+        )
+    assert await conn.fetchval("SELECT count(*) FROM organizations WHERE id = 9301") == 0
+
+
+async def test_import_rejects_activity_cycles_and_bad_records(conn) -> None:
+    cycle = _ndjson({"id": 9401, "name": "A", "parent_id": 9402}, {"id": 9402, "name": "B", "parent_id": 9401})
+    with pytest.raises(BulkImportError, match="cycle"):
+        await import_sources(conn, [Source("activities", _chunks(cycle), "ndjson")], progress=lambda *args: None)
+
+    bad = b"id,address,latitude,longitude\n9501,Somewhere,north,37.0\n"
+    with pytest.raises(BulkImportError, match="record 1: bad latitude"):
+        await import_sources(conn, [Source("buildings", _chunks(bad), "csv")], progress=lambda *args: None)
+
+
+async def test_import_rejects_malformed_input(conn) -> None:
+    latin1 = b"id,address,latitude,longitude\n9701,Ok,55.0,37.0\n9702,Caf\xe9,55.0,37.0\n"
+    with pytest.raises(BulkImportError, match="line 3: not valid UTF-8"):
+        await import_sources(conn, [Source("buildings", _chunks(latin1), "csv")], progress=lambda *args: None)
+
+    huge = b'id,address,latitude,longitude\n9703,"' + b"x" * 200_000 + b'",55.0,37.0\n'
+    with pytest.raises(BulkImportError, match="record 1: invalid CSV"):
+        await import_sources(conn, [Source("buildings", _chunks(huge, 4096), "csv")], progress=lambda *args: None)
+
+    nul = _ndjson({"id": 9704, "name": "Nul", "building_id": 1, "phones": ["1-\x00"]})
+    with pytest.raises(BulkImportError, match="record 1: bad phones: contains a NUL"):
+        await import_sources(conn, [Source("organizations", _chunks(nul), "ndjson")], progress=lambda *args: None)
+
+
+@pytest.fixture()
+async def admin_client(make_client):
+    return await make_client(ADMIN_API_KEY=ADMIN_KEY)
+
+
+async def test_import_endpoint(admin_client, auth_headers) -> None:
+    r = await admin_client.get("/api/v1/buildings", headers=auth_headers)
+    assert r.status_code == 200
+    building = r.json()[0]
+    # An existing building with the same values: a no-op import, the shared data stays as seeded.
+    body = _ndjson({k: building[k] for k in ("id", "address", "latitude", "longitude")})
+
+    r = await admin_client.post("/admin/import/buildings", content=body, headers={"X-Admin-Key": ADMIN_KEY})
+    assert r.status_code == 200
+    report = r.json()
+    assert report["records"] == 1
+    assert report["tables"][0] | {"seconds": 0} == {
+        "table": "buildings", "rows": 1, "inserted": 0, "updated": 0, "unchanged": 1, "seconds": 0
+    }
+
+    r = await admin_client.post(
+        "/admin/import/organizations",
+        params={"format": "csv"},
+        content=b"id,name,building_id\n9601,Nowhere,999999\n",
+        headers={"X-Admin-Key": ADMIN_KEY},
+    )
+    assert r.status_code == 422
+    assert "building_id" in r.json()["detail"]
+
+    r = await admin_client.post(
+        "/admin/import/buildings", content=b'{"address": "\xff"}\n', headers={"X-Admin-Key": ADMIN_KEY}
+    )
+    assert r.status_code == 422
+    assert "UTF-8" in r.json()["detail"]
+
+    r = await admin_client.post("/admin/import/buildings", content=body)
+    assert r.status_code == 403
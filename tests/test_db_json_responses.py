@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import pytest
+
+
+@pytest.fixture()
+async def db_json_client(make_client):
+    return await make_client(DB_JSON_RESPONSES="true")
+
+
+def _normalized(orgs: list[dict]) -> list[dict]:
+    # ORM relationship collections have no defined order; DB documents are ordered by id
+    return [
+        {**o, "phones": sorted(o["phones"], key=lambda p: p["id"]), "activities": sorted(o["activities"], key=lambda a: a["id"])}
+        for o in orgs
+    ]
+
+
+@pytest.mark.parametrize(
+    "url, params",
+    [
+        ("/api/v1/organizations/search", {"q": "ООО", "limit": 2}),
+        ("/api/v1/organizations/search", {"q": "рога", "mode": "fulltext"}),
+        ("/api/v1/organizations/geo", {"mode": "radius", "lat": 55.7558, "lon": 37.6176, "radius_m": 5_000_000}),
+        ("/api/v1/organizations/geo", {"mode": "bbox", "min_lat": 55.7, "max_lat": 55.9, "min_lon": 49.0, "max_lon": 49.2}),
+    ],
+)
+async def test_db_json_matches_python_serialization(client, db_json_client, auth_headers, url, params) -> None:
+    expected = await client.get(url, params=params, headers=auth_headers)
+    actual = await db_json_client.get(url, params=params, headers=auth_headers)
+    assert actual.status_code == expected.status_code == 200
+    assert actual.headers.get("X-Next-Cursor") == expected.headers.get("X-Next-Cursor")
+    assert _normalized(actual.json()) == _normalized(expected.json())
+
+
+async def test_db_json_single_org_buildings_and_not_found(client, db_json_client, auth_headers) -> None:
+    buildings = await db_json_client.get("/api/v1/buildings", headers=auth_headers)
+    assert buildings.json() == (await client.get("/api/v1/buildings", headers=auth_headers)).json()
+
+    building_id = buildings.json()[0]["id"]
+    url = f"/api/v1/organizations/by-building/{building_id}"
+    listed = (await db_json_client.get(url, headers=auth_headers)).json()
+    assert _normalized(listed) == _normalized((await client.get(url, headers=auth_headers)).json())
+
+    org_id = listed[0]["id"]
+    r = await db_json_client.get(f"/api/v1/organizations/{org_id}", headers=auth_headers)
+    assert _normalized([r.json()]) == _normalized([(await client.get(f"/api/v1/organizations/{org_id}", headers=auth_headers)).json()])
+
+    r = await db_json_client.get("/api/v1/organizations/999999", headers=auth_headers)
+    assert r.status_code == 404
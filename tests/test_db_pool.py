@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import exc, text
+
+
+async def test_instrumented_pool_records_checkouts_and_timeouts() -> None:
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from app.core.config import get_settings
+    from app.db.session import InstrumentedPool, _pool_stats
+
+    engine = create_async_engine(
+        get_settings().database_url, poolclass=InstrumentedPool, pool_size=1, max_overflow=0, pool_timeout=0.05
+    )
+    before_checkouts, before_timeouts = _pool_stats.checkouts, _pool_stats.timeouts
+    try:
+        async with engine.connect() as conn:
+            assert await conn.scalar(text("SELECT 1")) == 1
+            assert engine.pool.checkedout() == 1
+            with pytest.raises(exc.TimeoutError):
+                async with engine.connect():
+                    pass
+    finally:
+        await engine.dispose()
+
+    assert _pool_stats.checkouts == before_checkouts + 2
+    assert _pool_stats.timeouts == before_timeouts + 1
+    assert _pool_stats.max_wait_s >= 0.05
+
+
+async def test_pool_stats_endpoint_is_public(client) -> None:
+    r = await client.get("/health/pool")
+    assert r.status_code == 200
+    assert {"checkouts", "total_wait_s", "max_wait_s", "timeouts"} <= r.json().keys()
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import pytest
+
 
 async def test_geo_radius_requires_radius_m(client, auth_headers) -> None:
     r = await client.get(
@@ -45,4 +47,63 @@ async def test_geo_bbox_kazan_returns_two(client, auth_headers) -> None:
     items = r.json()
     assert len(items) == 2
     assert all("Казань" in o["building"]["address"] for o in items)
-    assert all(o["distance_m"] is None for o in items)
\ No newline at end of file
+    assert all(o["distance_m"] is None for o in items)
+
+
+@pytest.mark.parametrize("backend", ["memory", "earthdistance"])
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"mode": "radius", "lat": 55.7558, "lon": 37.6176, "radius_m": 1_000_000},
+        {"mode": "radius", "lat": 55.7558, "lon": 37.6176, "radius_m": 50, "limit": 1},
+        {"mode": "bbox", "min_lat": 50.0, "max_lat": 60.0, "min_lon": 30.0, "max_lon": 50.0},
+        {"mode": "knn", "lat": 55.7558, "lon": 37.6176, "k": 4},
+    ],
+)
+async def test_geo_backends_match_haversine(client, auth_headers, db_session, monkeypatch, backend, params) -> None:
+    from app.core.config import get_settings
+    from app.db.extensions import has_extension
+
+    if backend == "earthdistance" and not await has_extension(db_session, "earthdistance"):
+        pytest.skip("cube/earthdistance are not installed")
+
+    async def fetch(geo_backend: str):
+        monkeypatch.setenv("GEO_BACKEND", geo_backend)
+        get_settings.cache_clear()
+        try:
+            return await client.get("/api/v1/organizations/geo", params=params, headers=auth_headers)
+        finally:
+            get_settings.cache_clear()
+
+    indexed, haversine = await fetch(backend), await fetch("haversine")
+    assert indexed.status_code == haversine.status_code == 200
+    assert indexed.json()
+    assert [o["id"] for o in indexed.json()] == [o["id"] for o in haversine.json()]
+    assert ("X-Next-Cursor" in indexed.headers) == ("X-Next-Cursor" in haversine.headers)
+    for a, b in zip(indexed.json(), haversine.json()):
+        assert a["distance_m"] == pytest.approx(b["distance_m"], abs=1e-3)
+
+
+async def test_geo_knn_returns_k_nearest_sorted(client, auth_headers) -> None:
+    url = "/api/v1/organizations/geo"
+    everything = await client.get(
+        url, params={"mode": "radius", "lat": 55.7558, "lon": 37.6176, "radius_m": 20_000_000}, headers=auth_headers
+    )
+    assert everything.status_code == 200
+    expected = [o["id"] for o in everything.json()]
+    assert len(expected) > 3
+
+    # Kazan organizations are ~700 km away: the search has to widen several rings to reach them
+    for k in (1, 3, len(expected), len(expected) + 5):
+        r = await client.get(url, params={"mode": "knn", "lat": 55.7558, "lon": 37.6176, "k": k}, headers=auth_headers)
+        assert r.status_code == 200
+        items = r.json()
+        assert [o["id"] for o in items] == expected[:k]
+        assert "X-Next-Cursor" not in r.headers
+
+
+async def test_geo_knn_requires_k(client, auth_headers) -> None:
+    r = await client.get(
+        "/api/v1/organizations/geo", params={"mode": "knn", "lat": 55.7558, "lon": 37.6176}, headers=auth_headers
+    )
+    assert r.status_code == 422
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import re
+
+from app.core.metrics import Histogram
+
+
+def _sample(text: str, name: str, **labels: str) -> float:
+    for line in text.splitlines():
+        if not line.startswith(name + "{") and not line.startswith(name + " "):
+            continue
+        if all(f'{k}="{v}"' in line for k, v in labels.items()):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{name} {labels} not found")
+
+
+def test_histogram_renders_cumulative_buckets() -> None:
+    h = Histogram("t_seconds", "Test.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        h.observe(value, "/x")
+
+    lines = list(h.render())
+    assert lines[:2] == ["# HELP t_seconds Test.", "# TYPE t_seconds histogram"]
+    assert lines[2:] == [
+        't_seconds_bucket{route="/x",le="0.1"} 2',
+        't_seconds_bucket{route="/x",le="1.0"} 3',
+        't_seconds_bucket{route="/x",le="+Inf"} 4',
+        't_seconds_sum{route="/x"} 3.65',
+        't_seconds_count{route="/x"} 4',
+    ]
+
+
+async def test_metrics_endpoint_is_public_and_times_requests_per_route(client, auth_headers) -> None:
+    r = await client.get("/api/v1/organizations/1", headers=auth_headers)
+    assert r.status_code == 200
+    await client.get("/no-such-path")
+    await client.request("FOOBAR", "/no-such-path")
+
+    r = await client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = r.text
+
+    route = "/api/v1/organizations/{org_id}"
+    assert _sample(text, "http_request_duration_seconds_count", method="GET", route=route, status="200") >= 1
+    assert _sample(text, "http_request_duration_seconds_count", route="<unmatched>", status="404") >= 1
+    assert _sample(text, "http_request_duration_seconds_count", method="OTHER", route="<unmatched>") >= 1
+    assert 'method="FOOBAR"' not in text
+    # The engine events ran in the request's context.
+    assert _sample(text, "http_request_db_queries_sum", route=route) >= 1
+    assert _sample(text, "db_query_duration_seconds_count", operation="SELECT") >= 1
+    assert _sample(text, "db_pool_checkouts_total") >= 0
+    assert _sample(text, "single_flight_executed_total", scope="service") >= 0
+    # One HELP/TYPE per family.
+    families = re.findall(r"^# TYPE (\S+)", text, flags=re.MULTILINE)
+    assert len(families) == len(set(families))
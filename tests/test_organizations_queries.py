@@ -57,4 +57,71 @@ async def test_orgs_by_activity_include_descendants_behavior(client, auth_header
     )
     assert r_direct.status_code == 200
     direct_orgs = r_direct.json()
-    assert len(direct_orgs) == 1  # only org directly tagged with "Еда"
\ No newline at end of file
+    assert len(direct_orgs) == 1  # only org directly tagged with "Еда"
+
+async def test_search_prefix_mode_matches_only_name_start(client, auth_headers) -> None:
+    r = await client.get("/api/v1/organizations/search", params={"q": "Кафе", "mode": "prefix"}, headers=auth_headers)
+    assert r.status_code == 200
+    assert [o["name"] for o in r.json()] == ['Кафе "У дома"']
+
+    r = await client.get("/api/v1/organizations/search", params={"q": "дома", "mode": "prefix"}, headers=auth_headers)
+    assert r.status_code == 200
+    assert r.json() == []
+
+
+async def test_search_fulltext_mode_matches_words(client, auth_headers) -> None:
+    r = await client.get(
+        "/api/v1/organizations/search", params={"q": "рога копыта", "mode": "fulltext"}, headers=auth_headers
+    )
+    assert r.status_code == 200
+    assert [o["name"] for o in r.json()] == ['ООО "Рога и Копыта"']
+
+
+async def test_search_fuzzy_mode_tolerates_typos(client, auth_headers, db_session) -> None:
+    import pytest
+
+    from app.db.extensions import has_extension
+
+    if not await has_extension(db_session, "pg_trgm"):
+        r = await client.get("/api/v1/organizations/search", params={"q": "x", "mode": "fuzzy"}, headers=auth_headers)
+        assert r.status_code == 422
+        pytest.skip("pg_trgm is not installed")
+
+    r = await client.get(
+        "/api/v1/organizations/search", params={"q": "Запчасти плус", "mode": "fuzzy"}, headers=auth_headers
+    )
+    assert r.status_code == 200
+    assert r.json()[0]["name"] == 'ООО "Запчасти плюс"'
+
+
+async def test_missing_parent_and_empty_page_take_one_query(client, auth_headers) -> None:
+    from sqlalchemy import event
+
+    from app.db.session import get_engine
+
+    rt = await client.get("/api/v1/activities/tree", headers=auth_headers)
+    cars_id = _find_activity_id(rt.json(), "Автомобили")  # seeded: no organizations tagged directly
+
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany) -> None:
+        if "data_versions" not in statement:
+            statements.append(statement)
+
+    engine = get_engine().sync_engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        r_empty = await client.get(
+            f"/api/v1/organizations/by-activity/{cars_id}",
+            params={"include_descendants": False, "limit": 17},
+            headers=auth_headers,
+        )
+        r_activity = await client.get("/api/v1/organizations/by-activity/999999", headers=auth_headers)
+        r_building = await client.get("/api/v1/organizations/by-building/999999", headers=auth_headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert (r_empty.status_code, r_empty.json()) == (200, [])
+    assert r_activity.status_code == 404
+    assert r_building.status_code == 404
+    assert len(statements) == 3
@@ -1,6 +1,11 @@
 from __future__ import annotations
 
 
+def _by_id(items: list[dict]) -> list[dict]:
+    # ORM relationship collections have no defined order
+    return sorted(items, key=lambda x: x["id"])
+
+
 async def test_read_organization_includes_nested_objects(client, auth_headers) -> None:
     r = await client.get("/api/v1/organizations/search", params={"q": "Молочный мир"}, headers=auth_headers)
     assert r.status_code == 200
@@ -27,4 +32,57 @@ async def test_read_organization_includes_nested_objects(client, auth_headers) -
 
 async def test_read_organization_not_found(client, auth_headers) -> None:
     r = await client.get("/api/v1/organizations/999999", headers=auth_headers)
-    assert r.status_code == 404
\ No newline at end of file
+    assert r.status_code == 404
+
+async def test_batch_keeps_order_and_reports_missing(client, auth_headers) -> None:
+    from sqlalchemy import event
+
+    from app.db.session import get_engine
+
+    r = await client.get("/api/v1/organizations/search", params={"q": "ООО"}, headers=auth_headers)
+    ids = [o["id"] for o in r.json()][:3]
+    assert len(ids) == 3
+    requested = [ids[2], 999999, ids[0], ids[2], ids[1]]
+
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany) -> None:
+        if "data_versions" not in statement:
+            statements.append(statement)
+
+    engine = get_engine().sync_engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        r = await client.get(
+            "/api/v1/organizations/batch", params={"ids": ",".join(map(str, requested))}, headers=auth_headers
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert r.status_code == 200
+    data = r.json()
+    assert [o["id"] for o in data["items"]] == [ids[2], ids[0], ids[1]]
+    assert data["missing"] == [999999]
+    single = (await client.get(f"/api/v1/organizations/{ids[0]}", headers=auth_headers)).json()
+    assert {**data["items"][1], "activities": _by_id(data["items"][1]["activities"])} == {
+        **single,
+        "activities": _by_id(single["activities"]),
+    }
+    assert len(statements) == 3  # organizations with buildings, phones, activities
+
+
+async def test_batch_validates_ids(client, auth_headers, monkeypatch) -> None:
+    from app.core.config import get_settings
+
+    r = await client.get("/api/v1/organizations/batch", params={"ids": "1,x"}, headers=auth_headers)
+    assert r.status_code == 422
+
+    monkeypatch.setenv("ORGANIZATIONS_BATCH_MAX_IDS", "2")
+    get_settings.cache_clear()
+    try:
+        r = await client.get("/api/v1/organizations/batch", params={"ids": "1,2,3"}, headers=auth_headers)
+        assert r.status_code == 422
+        r = await client.get("/api/v1/organizations/batch", params={"ids": "1,2,2,1"}, headers=auth_headers)
+        assert r.status_code == 200
+    finally:
+        get_settings.cache_clear()
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+
+async def _walk(client, url: str, params: dict, headers: dict) -> list[dict]:
+    items: list[dict] = []
+    cursor = None
+    for _ in range(50):
+        r = await client.get(url, params={**params, **({"cursor": cursor} if cursor else {})}, headers=headers)
+        assert r.status_code == 200
+        items.extend(r.json())
+        cursor = r.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return items
+    raise AssertionError("pagination did not terminate")
+
+
+async def test_by_activity_pages_concatenate_to_full_result(client, auth_headers) -> None:
+    rt = await client.get("/api/v1/activities/tree", headers=auth_headers)
+    food_id = next(n["id"] for n in rt.json() if n["name"] == "Еда")
+    url = f"/api/v1/organizations/by-activity/{food_id}"
+
+    full = await client.get(url, headers=auth_headers)
+    assert "X-Next-Cursor" not in full.headers
+
+    paged = await _walk(client, url, {"limit": 1}, auth_headers)
+    assert [o["id"] for o in paged] == [o["id"] for o in full.json()]
+    assert len(paged) == 4
+
+
+async def test_search_pages_follow_name_order(client, auth_headers) -> None:
+    paged = await _walk(client, "/api/v1/organizations/search", {"q": "ООО", "limit": 2}, auth_headers)
+    names = [o["name"] for o in paged]
+    assert len(names) == 5
+    assert len({o["id"] for o in paged}) == 5
+
+    full = await client.get("/api/v1/organizations/search", params={"q": "ООО"}, headers=auth_headers)
+    assert names == [o["name"] for o in full.json()]
+
+
+async def test_geo_radius_pages_keep_distance_order(client, auth_headers) -> None:
+    params = {"mode": "radius", "lat": 55.7558, "lon": 37.6176, "radius_m": 5_000_000, "limit": 2}
+    paged = await _walk(client, "/api/v1/organizations/geo", params, auth_headers)
+    assert len(paged) == 7
+    dists = [o["distance_m"] for o in paged]
+    assert dists == sorted(dists)
+
+
+async def test_invalid_or_foreign_cursor_is_rejected(client, auth_headers) -> None:
+    r = await client.get("/api/v1/organizations/search", params={"q": "ООО", "cursor": "garbage"}, headers=auth_headers)
+    assert r.status_code == 422
+
+    r = await client.get("/api/v1/organizations/search", params={"q": "ООО", "limit": 1}, headers=auth_headers)
+    name_cursor = r.headers["X-Next-Cursor"]
+    rb = await client.get("/api/v1/buildings", headers=auth_headers)
+    building_id = rb.json()[0]["id"]
+    r = await client.get(
+        f"/api/v1/organizations/by-building/{building_id}", params={"cursor": name_cursor}, headers=auth_headers
+    )
+    assert r.status_code == 422
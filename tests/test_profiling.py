@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import sys
+import time
+
+import pytest
+
+from app.core.profiling import Sampler
+
+
+ADMIN_KEY = "admin-test-key"
+
+
+@pytest.fixture()
+async def profiling_client(make_client, tmp_path):
+    from app.db.session import dispose_engine
+
+    # The engine picks up the SQL log events when it is created.
+    await dispose_engine()
+    # Other tests may have cached the responses.
+    yield await make_client(
+        PROFILING_ENABLED="true", ADMIN_API_KEY=ADMIN_KEY, PROFILING_DIR=str(tmp_path), RESPONSE_CACHE_ENABLED="false"
+    )
+    await dispose_engine()
+
+
+def _busy(n: int) -> int:
+    return sum(i * i for i in range(n))
+
+
+def test_sampler_keeps_only_stacks_above_its_root() -> None:
+    sampler = Sampler(sys._getframe(), interval_s=0.0005)
+    sampler.start()
+    deadline = time.perf_counter() + 0.1
+    while time.perf_counter() < deadline:
+        _busy(10_000)
+    sampler.stop()
+
+    assert sampler.samples > 0
+    stacks = sampler.folded().splitlines()
+    assert all(line.startswith("test_sampler_keeps_only_stacks_above_its_root (") for line in stacks)
+    assert any("_busy" in line for line in stacks)
+
+
+async def test_profiled_request_returns_report_with_sql_log(profiling_client, auth_headers, tmp_path) -> None:
+    r = await profiling_client.get(
+        "/api/v1/organizations/1", headers={**auth_headers, "X-Profile": "1", "X-Admin-Key": ADMIN_KEY}
+    )
+    assert r.status_code == 200
+    profile_id = r.headers["X-Profile-Id"]
+
+    r = await profiling_client.get(f"/debug/profiles/{profile_id}", headers={"X-Admin-Key": ADMIN_KEY})
+    assert r.status_code == 200
+    report = r.json()
+    assert report["path"] == "/api/v1/organizations/1"
+    assert report["status"] == 200
+    assert report["sql_count"] == len(report["sql"]) >= 1
+    assert any("organizations" in q["statement"] for q in report["sql"])
+    assert (tmp_path / f"{profile_id}.json").is_file()
+
+    r = await profiling_client.get(
+        f"/debug/profiles/{profile_id}", params={"format": "folded"}, headers={"X-Admin-Key": ADMIN_KEY}
+    )
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+
+
+async def test_profiling_requires_admin_key(profiling_client, auth_headers) -> None:
+    # Served as usual, just not profiled.
+    r = await profiling_client.get("/api/v1/buildings", headers={**auth_headers, "X-Profile": "1"})
+    assert r.status_code == 200
+    assert "X-Profile-Id" not in r.headers
+
+    r = await profiling_client.get("/api/v1/buildings", headers=auth_headers)
+    assert r.status_code == 200
+    assert "X-Profile-Id" not in r.headers
+
+    r = await profiling_client.get("/debug/profiles", headers={"X-Admin-Key": "wrong"})
+    assert r.status_code == 403
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+
+def _by_id(items: list[dict]) -> list[dict]:
+    # ORM relationship collections have no defined order
+    return sorted(items, key=lambda x: x["id"])
+
+
+async def test_views_match_orm_entities(db_session) -> None:
+    from app.db.models import Organization
+    from app.schemas.organization import OrganizationOut
+    from app.schemas.serializers import organization_json
+    from app.services.read_models import load_organizations, organization_rows
+
+    entities = (
+        await db_session.execute(
+            select(Organization)
+            .options(
+                selectinload(Organization.building),
+                selectinload(Organization.phones),
+                selectinload(Organization.activities),
+            )
+            .order_by(Organization.id)
+        )
+    ).scalars().all()
+    rows = (await db_session.execute(organization_rows(select(Organization)).order_by(Organization.id))).all()
+    views = await load_organizations(db_session, rows)
+
+    assert [v.id for v in views] == [o.id for o in entities]
+    for view, org in zip(views, entities):
+        expected = organization_json(org)
+        expected["phones"], expected["activities"] = _by_id(expected["phones"]), _by_id(expected["activities"])
+        assert organization_json(view) == expected
+        assert OrganizationOut.model_validate(view).model_dump() == expected
+
+    # Rows of the same building share one BuildingView
+    first_by_building = {}
+    for view in views:
+        assert first_by_building.setdefault(view.building.id, view.building) is view.building
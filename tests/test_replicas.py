@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from sqlalchemy import text
+
+
+def _router(urls: list[str], **kwargs):
+    from app.db.replicas import Replica, ReplicaRouter
+
+    return ReplicaRouter([Replica.connect(u, connect_timeout_s=1.0) for u in urls], **kwargs)
+
+
+def _dead_url(url: str) -> str:
+    from sqlalchemy.engine import make_url
+
+    return make_url(url).set(port=1).render_as_string(hide_password=False)
+
+
+async def test_router_skips_and_ejects_unreachable_replica() -> None:
+    from app.core.config import get_settings
+
+    live = get_settings().database_url
+    router = _router([_dead_url(live), live])
+    try:
+        for _ in range(3):
+            async with router.session() as session:
+                assert await session.scalar(text("SELECT 1")) == 1
+                assert session.bind is router.replicas[1].engine
+        stats = router.stats()
+        assert [r["ejected"] for r in stats["replicas"]] == [True, False]
+        assert stats["primary_fallbacks"] == 0
+        assert router.replicas[1].in_flight == 0
+    finally:
+        await router.dispose()
+
+
+async def test_router_falls_back_to_primary_on_lag() -> None:
+    from app.core.config import get_settings
+    from app.db.session import get_engine
+
+    # A primary reports 0 lag, so a negative limit makes every replica "lagging"
+    router = _router([get_settings().database_url], max_lag_s=-1.0)
+    try:
+        async with router.session() as session:
+            assert session.bind is get_engine()
+        assert router.stats()["primary_fallbacks"] == 1
+        assert router.stats()["replicas"][0]["ejected"]
+    finally:
+        await router.dispose()
+
+
+async def test_least_connections_prefers_idle_replica() -> None:
+    from app.core.config import get_settings
+
+    url = get_settings().database_url
+    router = _router([url, url], balancing="least_connections")
+    try:
+        async with router.session() as first:
+            async with router.session() as second:
+                assert first.bind is router.replicas[0].engine
+                assert second.bind is router.replicas[1].engine
+    finally:
+        await router.dispose()
+
+
+async def test_replica_sessions_read_their_own_data_versions(db_session) -> None:
+    from app.core.config import get_settings
+    from app.db.versions import DataVersionTracker
+
+    router = _router([get_settings().database_url])
+    tracker = DataVersionTracker()
+    await tracker.start()
+    try:
+        replayed = await tracker.get(db_session, "activities")
+        # The primary's NOTIFYs are ahead of what the replica has replayed.
+        tracker._set("activities", replayed + 10)
+        assert await tracker.get(db_session, "activities") == replayed + 10
+
+        async with router.session() as session:
+            assert await tracker.get(session, "activities") == replayed
+            assert await tracker.get_many(session, ("activities",)) == (replayed,)
+    finally:
+        await tracker.stop()
+        await router.dispose()
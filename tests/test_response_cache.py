@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from sqlalchemy import delete
+
+
+async def test_memory_cache_lru_and_ttl() -> None:
+    from app.api.response_cache import MemoryCache
+
+    now = [0.0]
+    cache = MemoryCache(max_entries=2, clock=lambda: now[0])
+    await cache.set("a", b"1", 10)
+    await cache.set("b", b"2", 10)
+    assert await cache.get("a") == b"1"  # "a" becomes most recently used
+    await cache.set("c", b"3", 10)
+    assert await cache.get("b") is None
+    assert await cache.get("a") == b"1"
+
+    now[0] = 10.0
+    assert await cache.get("a") is None
+    assert len(cache) == 1
+
+
+async def test_etag_conditional_get_and_invalidation(client, auth_headers, db_session) -> None:
+    from app.db.models import OrganizationPhone
+
+    org = (await client.get("/api/v1/organizations/search", params={"q": "Рога"}, headers=auth_headers)).json()[0]
+    url = f"/api/v1/organizations/{org['id']}"
+
+    first = await client.get(url, headers=auth_headers)
+    etag = first.headers["ETag"]
+    second = await client.get(url, headers=auth_headers)
+    assert second.headers["ETag"] == etag
+    assert second.content == first.content
+
+    not_modified = await client.get(url, headers={**auth_headers, "If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+    phone = OrganizationPhone(organization_id=org["id"], phone="0-000-000")
+    db_session.add(phone)
+    await db_session.commit()
+    try:
+        changed = await client.get(url, headers={**auth_headers, "If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["ETag"] != etag
+        assert "0-000-000" in [p["phone"] for p in changed.json()["phones"]]
+    finally:
+        await db_session.execute(delete(OrganizationPhone).where(OrganizationPhone.id == phone.id))
+        await db_session.commit()
+
+
+async def test_errors_are_not_cached(client, auth_headers) -> None:
+    r = await client.get("/api/v1/organizations/999999", headers=auth_headers)
+    assert r.status_code == 404
+    assert "ETag" not in r.headers
+
+
+async def test_if_none_match_star_does_not_hide_errors(client, auth_headers) -> None:
+    r = await client.get("/api/v1/organizations/999999", headers={**auth_headers, "If-None-Match": "*"})
+    assert r.status_code == 404
+
+
+async def test_cache_key_escapes_query_values(client, auth_headers) -> None:
+    org = (await client.get("/api/v1/organizations/search", params={"q": "Рога"}, headers=auth_headers)).json()[0]
+    url = f"/api/v1/organizations/{org['id']}"
+
+    packed = await client.get(f"{url}?a=1%26b%3D2", headers=auth_headers)
+    split = await client.get(f"{url}?a=1&b=2", headers=auth_headers)
+    assert packed.headers["ETag"] != split.headers["ETag"]
+
+
+async def test_write_between_overlapping_requests_is_not_cached_under_new_version(monkeypatch) -> None:
+    import asyncio
+    from types import SimpleNamespace
+
+    from fastapi import Request, Response
+
+    from app.api import response_cache
+    from app.services.singleflight import single_flight
+
+    versions = [1]
+    data = {"value": "before"}
+    release = asyncio.Event()
+
+    class Versions:
+        async def get_many(self, session, tables):
+            return tuple(versions)
+
+    monkeypatch.setattr(response_cache, "get_data_versions", lambda: Versions())
+
+    @single_flight
+    async def load(session, *, org_id: int) -> str:
+        value = data["value"]  # read before the write commits
+        await release.wait()
+        return value
+
+    def request() -> Request:
+        return Request({"type": "http", "method": "GET", "path": "/test-overlap", "query_string": b"", "headers": []})
+
+    async def serve() -> Response:
+        session = SimpleNamespace(info={})
+
+        async def build() -> Response:
+            return Response((await load(session, org_id=1)).encode())
+
+        return await response_cache.cached_response(request(), session, tables=("organizations",), build=build)
+
+    before = asyncio.create_task(serve())
+    await asyncio.sleep(0)
+    data["value"], versions[0] = "after", 2  # a write commits and bumps the version
+    after = asyncio.create_task(serve())
+    await asyncio.sleep(0)
+    release.set()
+
+    assert (await before).body == b"before"
+    assert (await after).body == b"after"
+    assert (await serve()).body == b"after"  # served from the version-2 entry
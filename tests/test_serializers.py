@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+
+async def test_fast_serializers_match_pydantic_schemas(db_session) -> None:
+    from app.db.models import Building, Organization
+    from app.schemas.building import BuildingOut
+    from app.schemas.organization import OrganizationOut, OrganizationOutWithDistance
+    from app.schemas.serializers import building_json, organization_json, organization_with_distance_json
+
+    res = await db_session.execute(
+        select(Organization).options(
+            selectinload(Organization.building),
+            selectinload(Organization.phones),
+            selectinload(Organization.activities),
+        )
+    )
+    orgs = list(res.scalars().all())
+    assert orgs
+    for org in orgs:
+        assert organization_json(org) == OrganizationOut.model_validate(org).model_dump()
+        expected = OrganizationOutWithDistance.model_validate(org).model_copy(update={"distance_m": 1.5}).model_dump()
+        assert organization_with_distance_json(org, 1.5) == expected
+
+    buildings = (await db_session.execute(select(Building))).scalars().all()
+    for b in buildings:
+        assert building_json(b) == BuildingOut.model_validate(b).model_dump()
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+
+async def test_concurrent_calls_share_one_execution() -> None:
+    from app.services.singleflight import SingleFlight
+
+    flights = SingleFlight()
+    calls = 0
+    release = asyncio.Event()
+
+    async def load() -> list[int]:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return [1, 2, 3]
+
+    tasks = [asyncio.create_task(flights.do("k", load)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert calls == 1
+    assert all(r is results[0] for r in results)
+    assert flights.stats_snapshot() == {"executed": 1, "shared": 4, "in_flight": 0}
+
+    # Completed calls are not cached
+    await flights.do("k", load)
+    assert calls == 2
+
+
+async def test_errors_are_shared_and_cancelled_leader_hands_over() -> None:
+    from app.services.singleflight import SingleFlight
+
+    flights = SingleFlight()
+    started = asyncio.Event()
+
+    async def fail() -> None:
+        started.set()
+        await asyncio.sleep(0.01)
+        raise LookupError("boom")
+
+    tasks = [asyncio.create_task(flights.do("err", fail)) for _ in range(3)]
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    assert all(isinstance(r, LookupError) for r in results)
+
+    async def slow() -> str:
+        await asyncio.sleep(0.05)
+        return "done"
+
+    leader = asyncio.create_task(flights.do("slow", slow))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flights.do("slow", slow))
+    await asyncio.sleep(0)
+    leader.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    assert await follower == "done"
+
+
+async def test_service_calls_are_coalesced_across_sessions() -> None:
+    from app.db.session import get_sessionmaker
+    from app.services.organizations import search_organizations_by_name
+    from app.services.singleflight import service_flights
+
+    before = service_flights.stats_snapshot()
+    async with get_sessionmaker()() as s1, get_sessionmaker()() as s2:
+        p1, p2 = await asyncio.gather(
+            search_organizations_by_name(s1, q="ООО", limit=3),
+            search_organizations_by_name(s2, q="ООО", limit=3),
+        )
+    after = service_flights.stats_snapshot()
+
+    assert p1 is p2
+    assert after["executed"] == before["executed"] + 1
+    assert after["shared"] == before["shared"] + 1
+
+
+async def test_service_calls_are_not_shared_across_databases() -> None:
+    from app.core.config import get_settings
+    from app.db.replicas import Replica
+    from app.db.session import get_sessionmaker
+    from app.services.organizations import search_organizations_by_name
+
+    replica = Replica.connect(get_settings().database_url, connect_timeout_s=1.0)
+    try:
+        async with get_sessionmaker()() as primary, replica.sessionmaker() as on_replica:
+            p1, p2 = await asyncio.gather(
+                search_organizations_by_name(primary, q="ООО", limit=3),
+                search_organizations_by_name(on_replica, q="ООО", limit=3),
+            )
+        assert p1 is not p2
+        assert p1 == p2
+    finally:
+        await replica.engine.dispose()
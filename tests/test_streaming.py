@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import orjson
+
+NDJSON = {"Accept": "application/x-ndjson"}
+
+
+async def test_by_activity_ndjson_stream_matches_list(client, auth_headers) -> None:
+    rt = await client.get("/api/v1/activities/tree", headers=auth_headers)
+    food_id = next(n["id"] for n in rt.json() if n["name"] == "Еда")
+    url = f"/api/v1/organizations/by-activity/{food_id}"
+
+    listed = (await client.get(url, headers=auth_headers)).json()
+    r = await client.get(url, headers={**auth_headers, **NDJSON})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    lines = [orjson.loads(line) for line in r.content.splitlines()]
+    assert lines == listed
+
+
+async def test_search_stream_flag_returns_json_array(client, auth_headers) -> None:
+    listed = (await client.get("/api/v1/organizations/search", params={"q": "ООО"}, headers=auth_headers)).json()
+    r = await client.get("/api/v1/organizations/search", params={"q": "ООО", "stream": True}, headers=auth_headers)
+    assert r.status_code == 200
+    assert r.json() == listed
+
+    r = await client.get("/api/v1/organizations/search", params={"q": "нет такого", "stream": True}, headers=auth_headers)
+    assert r.status_code == 200
+    assert r.json() == []
+
+
+async def test_geo_stream_includes_distance(client, auth_headers) -> None:
+    params = {"mode": "radius", "lat": 55.7558, "lon": 37.6176, "radius_m": 50}
+    r = await client.get("/api/v1/organizations/geo", params=params, headers={**auth_headers, **NDJSON})
+    assert r.status_code == 200
+    items = [orjson.loads(line) for line in r.content.splitlines()]
+    assert len(items) == 2
+    assert all(o["distance_m"] is not None for o in items)
+
+
+async def test_stream_validates_before_streaming(client, auth_headers) -> None:
+    r = await client.get("/api/v1/organizations/by-building/999999", params={"stream": True}, headers=auth_headers)
+    assert r.status_code == 404
+    r = await client.get("/api/v1/organizations/by-activity/999999", params={"stream": True}, headers=auth_headers)
+    assert r.status_code == 404
+
+    r = await client.get(
+        "/api/v1/organizations/geo",
+        params={"mode": "radius", "lat": 95, "lon": 0, "radius_m": 10},
+        headers={**auth_headers, **NDJSON},
+    )
+    assert r.status_code == 422